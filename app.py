@@ -1,14 +1,21 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime
+import functools
 import time
 
 # Import custom utilities
-from utils.data_fetcher import StockDataFetcher
-from utils.chart_generator import ChartGenerator
+from utils.data_fetcher import StockDataFetcher, QUOTE_TTL
+from utils.chart_generator import ChartGenerator, PRICE_OVERLAYS, DEFAULT_OVERLAYS
+from utils.downsampling import DEFAULT_MAX_POINTS
 from utils.helpers import DataFormatter
-from utils.investment_analysis import InvestmentAnalysis
+from utils.indicators import TechnicalIndicators
+from utils import exports, tracing
+from utils.cache import registered_caches
+from ui.investment_analysis import InvestmentAnalysisView
+from ui.tables import history_column_config
 
 # Page configuration
 st.set_page_config(
@@ -272,6 +279,674 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Auto-refresh intervals offered in the sidebar (minutes)
+REFRESH_INTERVALS = [1, 5, 15, 30]
+
+# Timer ticks may fire slightly early, refresh if the interval has nearly elapsed (seconds)
+REFRESH_SLACK = 5
+
+# Dashboard sections, only the selected one is rendered
+SECTIONS = ["📈 Charts", "📊 Financial Metrics", "💡 Investment Analysis", "📋 Detailed Data", "📥 Export"]
+
+# Finished runs kept per session for the performance panel
+PERF_TRACE_HISTORY = 20
+
+def traced(name):
+    """
+    Trace a render function: its own run when it reruns alone (fragment timers and
+    widgets), a stage of the enclosing run otherwise
+    
+    Finished runs are kept in the session for the performance panel.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            is_run = tracing.current_trace() is None
+            with tracing.run(name) as trace:
+                result = fn(*args, **kwargs)
+            if is_run:
+                st.session_state.setdefault("perf_traces", deque(maxlen=PERF_TRACE_HISTORY)).append(trace)
+            return result
+        return wrapper
+    return decorator
+
+@st.fragment
+@traced("charts")
+def render_charts(symbol, period, historical_data, snapshot):
+    """Price, volume and financial ratio charts"""
+    financial_metrics = snapshot.metrics
+    
+    if historical_data is not None and not historical_data.empty:
+        # Chart options only rerun this section
+        col1, col2, col3 = st.columns([2, 4, 1])
+        
+        with col1:
+            chart_type = st.radio(
+                "📊 Chart Type",
+                options=["line", "candlestick"],
+                format_func=lambda x: "Line Chart" if x == "line" else "Candlestick Chart",
+                horizontal=True,
+                key="chart_type"
+            )
+        
+        with col2:
+            overlays = st.multiselect(
+                "📐 Indicators",
+                options=list(PRICE_OVERLAYS),
+                help="Moving averages and technical indicators drawn over the price",
+                key="overlays"
+            )
+        
+        with col3:
+            # Only offered when the price chart is actually decimated
+            full_resolution = len(historical_data) > DEFAULT_MAX_POINTS and st.toggle(
+                "🔍 Full resolution",
+                help="Plot every bar instead of a downsampled view; long line charts are drawn with WebGL",
+                key="full_resolution"
+            )
+        
+        # Indicators are computed once over the full history and cached until the next bar
+        indicators = TechnicalIndicators.get_indicators(symbol, StockDataFetcher.get_full_history(symbol))
+        
+        # Figures are rebuilt only when the data or the chart options change
+        data_stamp = ChartGenerator.data_stamp(historical_data)
+        
+        def build_price_chart():
+            chart_data = historical_data
+            
+            # Add the selected indicator overlays (the period is always the tail of the full history)
+            overlay_columns = [
+                column
+                for overlay in overlays
+                for column, _, _ in PRICE_OVERLAYS[overlay]
+                if indicators is not None and column in indicators.columns
+            ]
+            if overlay_columns:
+                overlay_data = indicators[overlay_columns].iloc[-len(chart_data):]
+                # Shallow copy: the new columns are added without copying the shared bars
+                chart_data = chart_data.copy(deep=False)
+                for column in overlay_columns:
+                    chart_data[column] = overlay_data[column].to_numpy()
+            return ChartGenerator.create_price_chart(
+                chart_data, symbol, chart_type, overlays,
+                max_points=None if full_resolution else DEFAULT_MAX_POINTS
+            )
+        
+        # Price chart
+        st.subheader(f"📈 {symbol} Price Chart")
+        price_chart = ChartGenerator.get_figure(
+            (symbol, 'price', period, chart_type, tuple(overlays), full_resolution), data_stamp, build_price_chart
+        )
+        with tracing.stage('render.price_chart'):
+            st.plotly_chart(price_chart, use_container_width=True)
+        
+        # Volume chart
+        st.subheader(f"📊 {symbol} Trading Volume")
+        volume_chart = ChartGenerator.get_figure(
+            (symbol, 'volume', period), data_stamp,
+            lambda: ChartGenerator.create_volume_chart(historical_data, symbol)
+        )
+        with tracing.stage('render.volume_chart'):
+            st.plotly_chart(volume_chart, use_container_width=True)
+        
+        # Financial ratios chart
+        if financial_metrics is not None:
+            st.subheader("📊 Key Financial Ratios")
+            ratios_chart = ChartGenerator.get_figure(
+                (symbol, 'ratios'), snapshot.fetched_at,
+                lambda: ChartGenerator.create_financial_metrics_chart(financial_metrics)
+            )
+            if ratios_chart.data:
+                with tracing.stage('render.ratios_chart'):
+                    st.plotly_chart(ratios_chart, use_container_width=True)
+            else:
+                st.info("No numeric financial ratios available for visualization")
+    else:
+        error = StockDataFetcher.get_history_error(symbol)
+        st.error(f"Error fetching historical data for {symbol}: {error}" if error
+                 else "No historical data available for the selected period")
+
+@st.fragment
+@traced("financial_metrics")
+def render_financial_metrics(financial_metrics):
+    """Financial metrics tables"""
+    st.subheader("📊 Financial Metrics")
+    
+    if financial_metrics is not None:
+        # Create metrics DataFrame
+        metrics_df = DataFormatter.create_metrics_dataframe(financial_metrics)
+        
+        # Display metrics in organized sections
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("#### 💰 Price Information")
+            price_metrics = metrics_df[metrics_df['Metric'].isin([
+                'Current Price', 'Previous Close', 'Open', 'Day High', 'Day Low',
+                '52 Week High', '52 Week Low'
+            ])]
+            st.dataframe(price_metrics, hide_index=True, use_container_width=True)
+            
+            st.markdown("#### 📈 Valuation Ratios")
+            valuation_metrics = metrics_df[metrics_df['Metric'].isin([
+                'P/E Ratio', 'Forward P/E', 'PEG Ratio', 'Price to Book', 'Price to Sales'
+            ])]
+            st.dataframe(valuation_metrics, hide_index=True, use_container_width=True)
+        
+        with col2:
+            st.markdown("#### 📊 Market Data")
+            market_metrics = metrics_df[metrics_df['Metric'].isin([
+                'Market Cap', 'Enterprise Value', 'Volume', 'Average Volume', 'Beta'
+            ])]
+            st.dataframe(market_metrics, hide_index=True, use_container_width=True)
+            
+            st.markdown("#### 💼 Financial Health")
+            health_metrics = metrics_df[metrics_df['Metric'].isin([
+                'Debt to Equity', 'Return on Equity', 'Return on Assets',
+                'Dividend Yield', 'Dividend Rate', 'Payout Ratio'
+            ])]
+            st.dataframe(health_metrics, hide_index=True, use_container_width=True)
+        
+        # Company info
+        st.markdown("#### 🏢 Company Information")
+        company_info = metrics_df[metrics_df['Metric'].isin([
+            'Company Name', 'Symbol', 'Sector', 'Industry'
+        ])]
+        st.dataframe(company_info, hide_index=True, use_container_width=True)
+    else:
+        st.error("No financial metrics available")
+
+@st.fragment
+@traced("investment_analysis")
+def render_investment_analysis(symbol, historical_data, financial_metrics):
+    """Investment analysis widgets"""
+    st.subheader("💡 Análisis de Inversión")
+    
+    if financial_metrics is not None:
+        indicators = TechnicalIndicators.get_indicators(symbol, StockDataFetcher.get_full_history(symbol))
+        current_price = financial_metrics.get('current_price')
+        if current_price is None:
+            st.error("No se puede obtener el precio actual para el análisis")
+        else:
+            day_low = financial_metrics.get('day_low', current_price * 0.98)
+            day_high = financial_metrics.get('day_high', current_price * 1.02)
+            week52_low = financial_metrics.get('week_52_low', current_price * 0.8)
+            week52_high = financial_metrics.get('week_52_high', current_price * 1.2)
+            
+            # Create layout
+            col1, col2 = st.columns([2, 1])
+            
+            with col1:
+                # Price ranges
+                InvestmentAnalysisView.create_price_range_widget(
+                    symbol, current_price, day_low, day_high, week52_low, week52_high
+                )
+                
+                # Technical analysis gauge
+                last_close = None
+                if historical_data is not None and not historical_data.empty:
+                    last_close = float(historical_data['Close'].iloc[-1])
+                InvestmentAnalysisView.create_technical_analysis_gauge(symbol, indicators, last_close)
+                
+                # Analyst opinion
+                InvestmentAnalysisView.create_analyst_opinion_widget(symbol, current_price)
+            
+            with col2:
+                # Investment summary card
+                InvestmentAnalysisView.create_investment_summary_card(symbol, current_price, financial_metrics)
+                
+                # Company health card
+                InvestmentAnalysisView.create_company_health_card(symbol, financial_metrics)
+                
+                # Market sentiment
+                InvestmentAnalysisView.create_sentiment_widget(symbol)
+    else:
+        st.error("No hay datos financieros disponibles para el análisis de inversión")
+
+@st.fragment
+@traced("detailed_data")
+def render_detailed_data(historical_data):
+    """Historical data summary and table"""
+    st.subheader("📋 Datos Históricos")
+    
+    if historical_data is not None and not historical_data.empty:
+        # Display data summary
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric(
+                label="Total Records",
+                value=len(historical_data)
+            )
+        
+        with col2:
+            st.metric(
+                label="Date Range",
+                value=f"{historical_data['Date'].min().strftime('%Y-%m-%d')} to {historical_data['Date'].max().strftime('%Y-%m-%d')}"
+            )
+        
+        with col3:
+            avg_volume = historical_data['Volume'].mean() if 'Volume' in historical_data.columns else 0
+            st.metric(
+                label="Avg Volume",
+                value=DataFormatter.format_number(avg_volume)
+            )
+        
+        with col4:
+            price_range = historical_data['High'].max() - historical_data['Low'].min()
+            st.metric(
+                label="Price Range",
+                value=f"${price_range:.2f}"
+            )
+        
+        # Display full data table
+        st.markdown("#### 📊 Complete Historical Data")
+        
+        # Formats are applied by the browser, the shared history is displayed as-is
+        with tracing.stage('render.history_table'):
+            st.dataframe(
+                historical_data,
+                column_config=history_column_config(historical_data),
+                hide_index=True,
+                use_container_width=True,
+                height=400
+            )
+    else:
+        st.error("No historical data available")
+
+def watchlist_export_frames(symbols, period):
+    """
+    History of every watchlist symbol, then their metrics table, one frame at a time
+    
+    Consumed by the bundle export, so each period slice can be released once written.
+    The full histories are loaded together, with multi-ticker downloads for the
+    symbols that are not cached yet.
+    """
+    histories = StockDataFetcher.get_full_histories(symbols)
+    for watch_symbol in symbols:
+        history = histories.get(watch_symbol.strip().upper())
+        if history is not None and not history.empty:
+            yield f"{watch_symbol}_historical_data", StockDataFetcher.slice_period(history, period)
+    
+    metrics_table = StockDataFetcher.get_metrics_table(symbols)
+    if not metrics_table.empty:
+        yield "financial_metrics", metrics_table.reset_index()
+
+def prepared_download(slot, key, build, label, disabled=False, **kwargs):
+    """
+    Download button whose file is built only after an explicit "prepare" click
+    
+    The pinned Streamlit needs the file contents up front, so building them on
+    every rerun would export on every interaction. The file built for a slot is
+    kept in the session only until it is downloaded or its key (data, format,
+    ...) changes; Streamlit keeps serving the bytes it was given for the click.
+    
+    Args:
+        slot: Name of the download (one prepared file is kept per slot)
+        key: Hashable description of the file contents
+        build: Function returning the file bytes
+        label: Download button label
+        disabled: Disable the prepare button
+        **kwargs: Passed to st.download_button (file_name, mime, help)
+    """
+    prepared = st.session_state.setdefault("prepared_exports", {})
+    prepared_key, data = prepared.get(slot, (None, None))
+    
+    if prepared_key != key:
+        # Stale bytes (older data or another format) are released right away
+        prepared.pop(slot, None)
+        if not st.button(f"⚙️ Prepare: {label}", key=f"prepare_{slot}", disabled=disabled):
+            return
+        with st.spinner("Preparing file..."):
+            data = build()
+        prepared[slot] = (key, data)
+    
+    st.download_button(
+        label=label,
+        data=data,
+        key=f"download_{slot}",
+        on_click=lambda: prepared.pop(slot, None),
+        **kwargs
+    )
+
+@st.fragment
+@traced("export")
+def render_export(symbol, period, historical_data, financial_metrics):
+    """Downloads of the history, the financial metrics and watchlist bundles, generated on request"""
+    st.subheader("📥 Export Data")
+    
+    export_format = st.selectbox(
+        "Format",
+        options=list(exports.EXPORT_FORMATS),
+        format_func=lambda fmt: exports.EXPORT_FORMATS[fmt].label,
+        key="export_format",
+        help="Parquet and Feather keep the column types and are much smaller than CSV"
+    )
+    file_format = exports.EXPORT_FORMATS[export_format]
+    today = datetime.now().strftime('%Y%m%d')
+    
+    # Files are only built when their prepare button is clicked, not on every rerun
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### 📊 Export Historical Data")
+        if historical_data is not None and not historical_data.empty:
+            prepared_download(
+                "history",
+                (symbol, period, export_format, len(historical_data), historical_data['Date'].iloc[-1]),
+                lambda: exports.export_frame(historical_data, export_format),
+                label=f"📈 Download Historical Data ({file_format.label})",
+                file_name=exports.file_name(f"{symbol}_historical_data_{today}", export_format),
+                mime=file_format.mime,
+                help="Download complete historical price and volume data"
+            )
+        else:
+            st.info("No historical data available for export")
+    
+    with col2:
+        st.markdown("#### 📋 Export Financial Metrics")
+        if financial_metrics is not None:
+            prepared_download(
+                "metrics",
+                (symbol, export_format, financial_metrics.to_array().tobytes()),
+                lambda: exports.export_frame(
+                    DataFormatter.create_metrics_dataframe(financial_metrics), export_format
+                ),
+                label=f"📊 Download Financial Metrics ({file_format.label})",
+                file_name=exports.file_name(f"{symbol}_financial_metrics_{today}", export_format),
+                mime=file_format.mime,
+                help="Download all financial metrics and ratios"
+            )
+        else:
+            st.info("No financial metrics available for export")
+    
+    # Watchlist bundle
+    st.markdown("#### 📦 Watchlist Bundle")
+    watchlist_options = list(dict.fromkeys([symbol] + DataFormatter.get_popular_symbols()))
+    watchlist = st.multiselect(
+        "Watchlist",
+        options=watchlist_options,
+        default=[symbol],
+        key="export_watchlist",
+        help="History and metrics of every symbol, zipped into one download"
+    )
+    prepared_download(
+        "bundle",
+        (tuple(watchlist), period, export_format, today),
+        lambda: exports.export_bundle(watchlist_export_frames(watchlist, period), export_format),
+        label=f"📦 Download Bundle (ZIP, {file_format.label})",
+        file_name=f"watchlist_{period}_{today}.zip",
+        mime=exports.BUNDLE_MIME,
+        disabled=not watchlist,
+        help=f"One {file_format.label} file per symbol with its {period} history, plus a table of their financial metrics"
+    )
+    
+    # Export instructions
+    st.markdown("---")
+    st.markdown("#### 📄 Export Information")
+    st.info("""
+    **Historical Data includes:**
+    - Date, Open, High, Low, Close, Volume
+    - Moving averages (if calculated)
+    
+    **Financial Metrics include:**
+    - All available financial ratios and metrics
+    - Company information
+    - Market data and valuation ratios
+    
+    **Watchlist Bundle includes:**
+    - The history of each selected symbol for the selected period
+    - One table with the raw financial metrics of every symbol
+    """)
+
+@st.fragment
+@traced("sections")
+def render_sections(symbol, period, historical_data, snapshot, financial_metrics):
+    """
+    Render the selected dashboard section
+    
+    Unlike tabs, which compute every section on each run, only the visible section
+    is built; switching sections or changing a section's widgets reruns this
+    fragment (or the section's own) instead of the whole script.
+    """
+    # Keep the section widgets' values while another section is displayed
+    st.session_state.setdefault("section", SECTIONS[0])
+    st.session_state.setdefault("chart_type", "line")
+    st.session_state.setdefault("overlays", DEFAULT_OVERLAYS)
+    for key in ("chart_type", "overlays"):
+        st.session_state[key] = st.session_state[key]
+    
+    section = st.segmented_control(
+        "Section",
+        options=SECTIONS,
+        key="section",
+        label_visibility="collapsed"
+    ) or SECTIONS[0]
+    
+    if section == "📈 Charts":
+        render_charts(symbol, period, historical_data, snapshot)
+    elif section == "📊 Financial Metrics":
+        render_financial_metrics(financial_metrics)
+    elif section == "💡 Investment Analysis":
+        render_investment_analysis(symbol, historical_data, financial_metrics)
+    elif section == "📋 Detailed Data":
+        render_detailed_data(historical_data)
+    else:
+        render_export(symbol, period, historical_data, financial_metrics)
+
+@traced("quote")
+def render_quote(symbol):
+    """Current price, daily change and quote time"""
+    quote = StockDataFetcher.get_quote(symbol)
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        current_price = quote.price if quote.price is not None else 'N/A'
+        previous_close = quote.previous_close if quote.previous_close is not None else 'N/A'
+        
+        if current_price != 'N/A' and previous_close != 'N/A':
+            change_data = ChartGenerator.create_price_change_indicator(current_price, previous_close)
+            
+            st.markdown(f"### ${current_price:.2f}")
+            if change_data['change'] != 'N/A':
+                change_symbol = "+" if change_data['change'] >= 0 else ""
+                # Show price change with appropriate styling
+                change_text = f"{change_symbol}{change_data['change']} ({change_symbol}{change_data['change_percent']}%)"
+                if change_data['change'] >= 0:
+                    st.success(f"🟢 {change_text}")
+                else:
+                    st.error(f"🔴 {change_text}")
+        else:
+            st.markdown("### Price: N/A")
+    
+    with col2:
+        st.markdown(f"**Last Updated:**")
+        st.markdown(f"{datetime.fromtimestamp(quote.fetched_at).strftime('%H:%M:%S')}")
+        if quote.stale:
+            st.caption("⚠️ Último precio conocido, Yahoo Finance no responde")
+
+@traced("dashboard")
+def render_dashboard(symbol, period, refresh_interval):
+    """
+    Load a symbol and render its header and sections
+    
+    Wrapped in a fragment with run_every=refresh_interval, so auto-refresh costs
+    nothing between ticks and only reruns this part of the page.
+    """
+    # Timer ticks fetch a fresh quote and new bars unless another session (or the refresh-ahead
+    # worker) already did within the interval; any other rerun uses the cached data
+    st.session_state.setdefault("last_refresh", time.time())
+    if refresh_interval and time.time() - st.session_state.last_refresh >= refresh_interval - REFRESH_SLACK:
+        StockDataFetcher.refresh_symbol(symbol, max_age=refresh_interval - REFRESH_SLACK)
+        st.session_state.last_refresh = time.time()
+    
+    # Snapshot, quote and history download concurrently; each part renders as soon as it arrives
+    fetch = StockDataFetcher.fetch_symbol(symbol)
+    
+    # Loading spinner
+    with st.spinner(f"Loading data for {symbol}..."):
+        # One snapshot holds validity, info and metrics of the symbol
+        with tracing.stage('wait.snapshot'):
+            snapshot = fetch['snapshot'].result()
+        
+        # Validate symbol
+        if snapshot.error:
+            st.error(f"❌ Could not fetch data for {symbol}: {snapshot.error}")
+            return
+        if not snapshot.is_valid:
+            st.error(f"❌ Invalid stock symbol: {symbol}")
+            st.info("Please enter a valid stock ticker symbol (e.g., AAPL, GOOGL, MSFT)")
+            return
+        
+        # Viewed symbols are kept warm by the shared refresh-ahead worker (typos are not tracked)
+        StockDataFetcher.track_symbol(symbol)
+        
+        if snapshot.stale:
+            fetched = datetime.fromtimestamp(snapshot.fetched_at).strftime('%Y-%m-%d %H:%M')
+            st.warning(f"⚠️ Yahoo Finance is unavailable, showing data from {fetched}")
+        
+        # Fundamentals live for hours, the price comes from the short-lived quote
+        stock_info = snapshot.info
+        with tracing.stage('wait.quote'):
+            quote = fetch['quote'].result()
+        financial_metrics = snapshot.metrics.with_quote(quote) if snapshot.metrics is not None else None
+    
+    if not stock_info or financial_metrics is None:
+        st.error(f"❌ Could not fetch data for {symbol}")
+        return
+    
+    # Company information header
+    col1, col2 = st.columns([2, 3])
+    
+    with col1:
+        st.markdown(f"### {financial_metrics.company_name or symbol}")
+        st.markdown(f"**{financial_metrics.symbol}** | {financial_metrics.sector or 'N/A'}")
+    
+    with col2:
+        # With auto-refresh the price alone is polled every QUOTE_TTL seconds
+        quote_header = st.fragment(run_every=QUOTE_TTL if refresh_interval else None)(render_quote)
+        quote_header(symbol)
+    
+    st.markdown("---")
+    
+    # The header is already on screen while the history finishes loading
+    with st.spinner(f"Loading price history for {symbol}..."):
+        with tracing.stage('wait.history'):
+            fetch['history'].result()
+        historical_data = StockDataFetcher.get_stock_history(symbol, period)
+        
+        # Add moving averages (shown in the charts, the data table and the export)
+        if historical_data is not None and not historical_data.empty:
+            historical_data = StockDataFetcher.get_moving_averages(symbol, historical_data)
+    
+    # Main content sections
+    render_sections(symbol, period, historical_data, snapshot, financial_metrics)
+
+def render_perf_panel():
+    """Sidebar panel with the stage timings and cache lookups of this run and the recent ones"""
+    trace = tracing.current_trace()
+    
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        if trace is not None:
+            st.metric("This run", f"{trace.elapsed_ms:.0f} ms")
+            
+            if trace.stages:
+                # Stages are recorded when they end, list them in start order as a tree
+                stages = sorted(trace.stages, key=lambda s: s['at_ms'])
+                st.dataframe(
+                    pd.DataFrame({
+                        'Stage': ["  " * s['depth'] + s['stage'] for s in stages],
+                        'ms': [s['ms'] for s in stages]
+                    }),
+                    column_config={'ms': st.column_config.NumberColumn(format="%.1f")},
+                    hide_index=True,
+                    use_container_width=True
+                )
+            
+            if trace.cache:
+                lookups = pd.DataFrame(trace.cache)
+                st.markdown("**Cache**")
+                st.dataframe(
+                    lookups.groupby('cache')['hit'].agg(hits='sum', lookups='count').reset_index(),
+                    hide_index=True,
+                    use_container_width=True
+                )
+        
+        # Fragments rerunning alone (section widgets, timers) show up on the next full run
+        runs = [t for t in st.session_state.get("perf_traces", []) if t is not trace]
+        if runs:
+            st.markdown("**Recent runs**")
+            st.dataframe(
+                pd.DataFrame({
+                    'Run': [t.name for t in reversed(runs)],
+                    'At': [datetime.fromtimestamp(t.started_at).strftime('%H:%M:%S') for t in reversed(runs)],
+                    'ms': [t.total_ms for t in reversed(runs)],
+                    'Misses': [sum(not c['hit'] for c in t.cache) for t in reversed(runs)]
+                }),
+                column_config={'ms': st.column_config.NumberColumn(format="%.1f")},
+                hide_index=True,
+                use_container_width=True
+            )
+        
+        provider_stats = StockDataFetcher.get_provider_stats()
+        if provider_stats:
+            st.markdown("**Market data source**")
+            st.json(provider_stats, expanded=False)
+        
+        st.caption(
+            f"JSON run log: `{tracing.TRACE_LOG_ENV}` · Prometheus text file: `{tracing.METRICS_FILE_ENV}`"
+        )
+
+def render_cache_admin():
+    """Sidebar view of the process-wide caches: size, budget, hit rate, evictions and resident entries"""
+    caches = {cache.name: cache for cache in registered_caches()}
+    
+    with st.sidebar.expander("🗄️ Caches", expanded=True):
+        stats = pd.DataFrame([cache.stats() for cache in caches.values()])
+        st.dataframe(
+            pd.DataFrame({
+                'Cache': stats['name'],
+                'Entries': stats['entries'],
+                'MB': stats['bytes'] / 1024 ** 2,
+                'Budget MB': stats['max_bytes'] / 1024 ** 2,
+                'Hit rate': stats['hit_rate'] * 100,
+                'Evictions': stats['evictions']
+            }),
+            column_config={
+                'MB': st.column_config.NumberColumn(format="%.1f"),
+                'Budget MB': st.column_config.NumberColumn(format="%.0f"),
+                'Hit rate': st.column_config.NumberColumn(format="%.0f%%")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        st.caption(f"Total resident: {stats['bytes'].sum() / 1024 ** 2:.1f} MB (estimated)")
+        
+        name = st.selectbox("Resident entries", options=list(caches), key="cache_admin_name")
+        if name:
+            entries = caches[name].resident()
+            if entries:
+                st.dataframe(
+                    pd.DataFrame({
+                        'Key': [str(entry['key']) for entry in entries],
+                        'KB': [entry['bytes'] / 1024 for entry in entries],
+                        'Expires in (s)': [entry['expires_in'] for entry in entries]
+                    }),
+                    column_config={
+                        'KB': st.column_config.NumberColumn(format="%.1f"),
+                        'Expires in (s)': st.column_config.NumberColumn(format="%.0f")
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+            else:
+                st.caption("No resident entries")
+            
+            if st.button(f"Clear {name}", key="cache_admin_clear"):
+                caches[name].invalidate()
+                st.rerun()
+
+@traced("app")
 def main():
     """Main application function"""
     
@@ -314,7 +989,7 @@ def main():
         st.markdown("**📅 Time Period:**")
         period = st.selectbox(
             "Select time period",
-            options=["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y"],
+            options=["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"],
             index=5,  # Default to 1y
             format_func=lambda x: {
                 "1d": "1 Day",
@@ -324,309 +999,34 @@ def main():
                 "6mo": "6 Months",
                 "1y": "1 Year",
                 "2y": "2 Years",
-                "5y": "5 Years"
+                "5y": "5 Years",
+                "10y": "10 Years",
+                "max": "All"
             }[x]
         )
         
-        # Chart type selection
-        st.markdown("**📊 Chart Type:**")
-        chart_type = st.radio(
-            "Select chart type",
-            options=["line", "candlestick"],
-            format_func=lambda x: "Line Chart" if x == "line" else "Candlestick Chart"
-        )
-        
         # Auto-refresh option
         st.markdown("---")
-        auto_refresh = st.checkbox("🔄 Auto-refresh (5 min)", value=False)
+        auto_refresh = st.checkbox("🔄 Auto-refresh", value=False)
+        refresh_minutes = st.selectbox(
+            "Refresh interval",
+            options=REFRESH_INTERVALS,
+            index=REFRESH_INTERVALS.index(5),
+            format_func=lambda x: f"{x} min",
+            disabled=not auto_refresh
+        )
         
-        if auto_refresh:
-            # Auto-refresh every 5 minutes
-            time.sleep(1)
-            st.rerun()
+        # Performance panel (drawn at the end of the run, once every stage is timed)
+        st.markdown("---")
+        show_perf_panel = st.checkbox("⏱️ Performance panel", value=False, key="perf_panel")
+        show_cache_admin = st.checkbox("🗄️ Cache admin", value=False, key="cache_admin")
     
     # Main content
     if symbol:
-        # Validate symbol
-        if not StockDataFetcher.validate_symbol(symbol):
-            st.error(f"❌ Invalid stock symbol: {symbol}")
-            st.info("Please enter a valid stock ticker symbol (e.g., AAPL, GOOGL, MSFT)")
-            return
-        
-        # Loading spinner
-        with st.spinner(f"Loading data for {symbol}..."):
-            # Fetch data
-            stock_info = StockDataFetcher.get_stock_info(symbol)
-            historical_data = StockDataFetcher.get_stock_history(symbol, period)
-            financial_metrics = StockDataFetcher.get_financial_metrics(symbol)
-        
-        if not stock_info or not financial_metrics:
-            st.error(f"❌ Could not fetch data for {symbol}")
-            return
-        
-        # Company information header
-        col1, col2, col3 = st.columns([2, 2, 1])
-        
-        with col1:
-            st.markdown(f"### {financial_metrics.get('Company Name', symbol)}")
-            st.markdown(f"**{financial_metrics.get('Symbol', symbol)}** | {financial_metrics.get('Sector', 'N/A')}")
-        
-        with col2:
-            current_price = financial_metrics.get('Current Price', 'N/A')
-            previous_close = financial_metrics.get('Previous Close', 'N/A')
-            
-            if current_price != 'N/A' and previous_close != 'N/A':
-                change_data = ChartGenerator.create_price_change_indicator(current_price, previous_close)
-                
-                st.markdown(f"### ${current_price:.2f}")
-                if change_data['change'] != 'N/A':
-                    change_symbol = "+" if change_data['change'] >= 0 else ""
-                    # Show price change with appropriate styling
-                    change_text = f"{change_symbol}{change_data['change']} ({change_symbol}{change_data['change_percent']}%)"
-                    if change_data['change'] >= 0:
-                        st.success(f"🟢 {change_text}")
-                    else:
-                        st.error(f"🔴 {change_text}")
-            else:
-                st.markdown("### Price: N/A")
-        
-        with col3:
-            st.markdown(f"**Last Updated:**")
-            st.markdown(f"{datetime.now().strftime('%H:%M:%S')}")
-        
-        st.markdown("---")
-        
-        # Main content tabs
-        tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Charts", "📊 Financial Metrics", "💡 Investment Analysis", "📋 Detailed Data", "📥 Export"])
-        
-        with tab1:
-            if historical_data is not None and not historical_data.empty:
-                # Add moving averages
-                historical_data = StockDataFetcher.calculate_moving_averages(historical_data)
-                
-                # Price chart
-                st.subheader(f"📈 {symbol} Price Chart")
-                price_chart = ChartGenerator.create_price_chart(historical_data, symbol, chart_type)
-                st.plotly_chart(price_chart, use_container_width=True)
-                
-                # Volume chart
-                st.subheader(f"📊 {symbol} Trading Volume")
-                volume_chart = ChartGenerator.create_volume_chart(historical_data, symbol)
-                st.plotly_chart(volume_chart, use_container_width=True)
-                
-                # Financial ratios chart
-                if financial_metrics:
-                    st.subheader("📊 Key Financial Ratios")
-                    ratios_chart = ChartGenerator.create_financial_metrics_chart(financial_metrics)
-                    if ratios_chart.data:
-                        st.plotly_chart(ratios_chart, use_container_width=True)
-                    else:
-                        st.info("No numeric financial ratios available for visualization")
-            else:
-                st.error("No historical data available for the selected period")
-        
-        with tab2:
-            st.subheader("📊 Financial Metrics")
-            
-            if financial_metrics:
-                # Create metrics DataFrame
-                metrics_df = DataFormatter.create_metrics_dataframe(financial_metrics)
-                
-                # Display metrics in organized sections
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("#### 💰 Price Information")
-                    price_metrics = metrics_df[metrics_df['Metric'].isin([
-                        'Current Price', 'Previous Close', 'Open', 'Day High', 'Day Low',
-                        '52 Week High', '52 Week Low'
-                    ])]
-                    st.dataframe(price_metrics, hide_index=True, use_container_width=True)
-                    
-                    st.markdown("#### 📈 Valuation Ratios")
-                    valuation_metrics = metrics_df[metrics_df['Metric'].isin([
-                        'P/E Ratio', 'Forward P/E', 'PEG Ratio', 'Price to Book', 'Price to Sales'
-                    ])]
-                    st.dataframe(valuation_metrics, hide_index=True, use_container_width=True)
-                
-                with col2:
-                    st.markdown("#### 📊 Market Data")
-                    market_metrics = metrics_df[metrics_df['Metric'].isin([
-                        'Market Cap', 'Enterprise Value', 'Volume', 'Average Volume', 'Beta'
-                    ])]
-                    st.dataframe(market_metrics, hide_index=True, use_container_width=True)
-                    
-                    st.markdown("#### 💼 Financial Health")
-                    health_metrics = metrics_df[metrics_df['Metric'].isin([
-                        'Debt to Equity', 'Return on Equity', 'Return on Assets',
-                        'Dividend Yield', 'Dividend Rate', 'Payout Ratio'
-                    ])]
-                    st.dataframe(health_metrics, hide_index=True, use_container_width=True)
-                
-                # Company info
-                st.markdown("#### 🏢 Company Information")
-                company_info = metrics_df[metrics_df['Metric'].isin([
-                    'Company Name', 'Symbol', 'Sector', 'Industry'
-                ])]
-                st.dataframe(company_info, hide_index=True, use_container_width=True)
-            else:
-                st.error("No financial metrics available")
-        
-        with tab3:
-            st.subheader("💡 Análisis de Inversión")
-            
-            if financial_metrics:
-                current_price = financial_metrics.get('Current Price', 0)
-                if current_price == 'N/A' or current_price is None:
-                    st.error("No se puede obtener el precio actual para el análisis")
-                else:
-                    day_low = financial_metrics.get('Day Low', current_price * 0.98)
-                    day_high = financial_metrics.get('Day High', current_price * 1.02)
-                    week52_low = financial_metrics.get('52 Week Low', current_price * 0.8)
-                    week52_high = financial_metrics.get('52 Week High', current_price * 1.2)
-                    
-                    # Convert to float if needed
-                    try:
-                        current_price = float(current_price)
-                        day_low = float(day_low) if day_low != 'N/A' else current_price * 0.98
-                        day_high = float(day_high) if day_high != 'N/A' else current_price * 1.02
-                        week52_low = float(week52_low) if week52_low != 'N/A' else current_price * 0.8
-                        week52_high = float(week52_high) if week52_high != 'N/A' else current_price * 1.2
-                        
-                        # Create layout
-                        col1, col2 = st.columns([2, 1])
-                        
-                        with col1:
-                            # Price ranges
-                            InvestmentAnalysis.create_price_range_widget(
-                                symbol, current_price, day_low, day_high, week52_low, week52_high
-                            )
-                            
-                            # Technical analysis gauge
-                            InvestmentAnalysis.create_technical_analysis_gauge(symbol)
-                            
-                            # Analyst opinion
-                            InvestmentAnalysis.create_analyst_opinion_widget(symbol, current_price)
-                        
-                        with col2:
-                            # Investment summary card
-                            InvestmentAnalysis.create_investment_summary_card(symbol, current_price, financial_metrics)
-                            
-                            # Company health card
-                            InvestmentAnalysis.create_company_health_card(symbol, financial_metrics)
-                            
-                            # Market sentiment
-                            InvestmentAnalysis.create_sentiment_widget(symbol)
-                    except (ValueError, TypeError) as e:
-                        st.error(f"Error procesando datos de precio: {e}")
-            else:
-                st.error("No hay datos financieros disponibles para el análisis de inversión")
-        
-        with tab4:
-            st.subheader("📋 Datos Históricos")
-            
-            if historical_data is not None and not historical_data.empty:
-                # Display data summary
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric(
-                        label="Total Records",
-                        value=len(historical_data)
-                    )
-                
-                with col2:
-                    st.metric(
-                        label="Date Range",
-                        value=f"{historical_data['Date'].min().strftime('%Y-%m-%d')} to {historical_data['Date'].max().strftime('%Y-%m-%d')}"
-                    )
-                
-                with col3:
-                    avg_volume = historical_data['Volume'].mean() if 'Volume' in historical_data.columns else 0
-                    st.metric(
-                        label="Avg Volume",
-                        value=DataFormatter.format_number(avg_volume)
-                    )
-                
-                with col4:
-                    price_range = historical_data['High'].max() - historical_data['Low'].min()
-                    st.metric(
-                        label="Price Range",
-                        value=f"${price_range:.2f}"
-                    )
-                
-                # Display full data table
-                st.markdown("#### 📊 Complete Historical Data")
-                
-                # Format data for display
-                display_data = historical_data.copy()
-                display_data['Date'] = display_data['Date'].dt.strftime('%Y-%m-%d')
-                
-                # Round numeric columns
-                numeric_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-                for col in numeric_columns:
-                    if col in display_data.columns:
-                        if col == 'Volume':
-                            display_data[col] = display_data[col].apply(DataFormatter.format_number)
-                        else:
-                            display_data[col] = display_data[col].round(2)
-                
-                st.dataframe(
-                    display_data,
-                    hide_index=True,
-                    use_container_width=True,
-                    height=400
-                )
-            else:
-                st.error("No historical data available")
-        
-        with tab5:
-            st.subheader("📥 Export Data")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("#### 📊 Export Historical Data")
-                if historical_data is not None and not historical_data.empty:
-                    csv_data = DataFormatter.export_to_csv(historical_data, f"{symbol}_historical_data.csv")
-                    st.download_button(
-                        label="📈 Download Historical Data (CSV)",
-                        data=csv_data,
-                        file_name=f"{symbol}_historical_data_{datetime.now().strftime('%Y%m%d')}.csv",
-                        mime="text/csv",
-                        help="Download complete historical price and volume data"
-                    )
-                else:
-                    st.info("No historical data available for export")
-            
-            with col2:
-                st.markdown("#### 📋 Export Financial Metrics")
-                if financial_metrics:
-                    metrics_df = DataFormatter.create_metrics_dataframe(financial_metrics)
-                    csv_metrics = DataFormatter.export_to_csv(metrics_df, f"{symbol}_financial_metrics.csv")
-                    st.download_button(
-                        label="📊 Download Financial Metrics (CSV)",
-                        data=csv_metrics,
-                        file_name=f"{symbol}_financial_metrics_{datetime.now().strftime('%Y%m%d')}.csv",
-                        mime="text/csv",
-                        help="Download all financial metrics and ratios"
-                    )
-                else:
-                    st.info("No financial metrics available for export")
-            
-            # Export instructions
-            st.markdown("---")
-            st.markdown("#### 📄 Export Information")
-            st.info("""
-            **Historical Data CSV includes:**
-            - Date, Open, High, Low, Close, Volume
-            - Moving averages (if calculated)
-            
-            **Financial Metrics CSV includes:**
-            - All available financial ratios and metrics
-            - Company information
-            - Market data and valuation ratios
-            """)
+        # Quote, charts and sections refresh on a client-side timer instead of rerunning the script
+        refresh_interval = refresh_minutes * 60 if auto_refresh else None
+        dashboard = st.fragment(run_every=refresh_interval)(render_dashboard)
+        dashboard(symbol, period, refresh_interval)
     
     else:
         # Welcome screen
@@ -643,7 +1043,7 @@ def main():
         ### 🚀 Getting Started
         1. Enter a stock symbol in the sidebar (e.g., AAPL, GOOGL, MSFT)
         2. Select your preferred time period and chart type
-        3. Explore the data across different tabs
+        3. Explore the data across the different sections
         4. Export data for further analysis
         
         ### 📊 Features
@@ -664,16 +1064,11 @@ def main():
                 if st.button(pop_symbol, key=f"pop_{pop_symbol}"):
                     st.session_state.selected_symbol = pop_symbol
                     st.rerun()
-
-# Auto-refresh mechanism
-if 'last_refresh' not in st.session_state:
-    st.session_state.last_refresh = datetime.now()
-
-# Check if we need to refresh
-if datetime.now() - st.session_state.last_refresh > timedelta(minutes=5):
-    st.session_state.last_refresh = datetime.now()
-    if st.session_state.get('auto_refresh', False):
-        st.rerun()
+    
+    if show_perf_panel:
+        render_perf_panel()
+    if show_cache_admin:
+        render_cache_admin()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1 @@
+"""Benchmark suite for the dashboard hot paths (run with `python -m benchmarks`)"""
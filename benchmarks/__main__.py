@@ -0,0 +1,60 @@
+"""
+Command-line entry point of the benchmark suite
+
+Usage:
+    python -m benchmarks                         # every benchmark, default sizes
+    python -m benchmarks --sizes 250,10000 --only price_chart_line,volume_chart
+    python -m benchmarks --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import sys
+
+from benchmarks.harness import DEFAULT_SIZES, DEFAULT_WARMUP, compare, get_benchmarks, run, save_results
+
+
+def _parse_list(value: str) -> list:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmark the dashboard hot paths')
+    parser.add_argument('--sizes', type=lambda v: [int(x) for x in _parse_list(v)], default=DEFAULT_SIZES,
+                        help='comma-separated row counts (default: %(default)s)')
+    parser.add_argument('--only', type=_parse_list, default=None, help='comma-separated benchmark names')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per measurement (default: %(default)s)')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP,
+                        help='untimed runs before the timed ones (default: %(default)s)')
+    parser.add_argument('--output', default=None, help='result file (default: benchmarks/results/<timestamp>_<commit>.json)')
+    parser.add_argument('--compare', default=None, help='baseline result file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='median time ratio reported as a regression (default: %(default)s)')
+    parser.add_argument('--list', action='store_true', help='list the available benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    import benchmarks.cases  # noqa: F401  (registers the benchmarks)
+
+    benchmarks = get_benchmarks()
+    if args.list:
+        for name, bench in benchmarks.items():
+            print(f'{name:<28} {bench.description}')
+        return 0
+
+    names = args.only or list(benchmarks)
+    unknown = [name for name in names if name not in benchmarks]
+    if unknown:
+        parser.error(f'unknown benchmark(s): {", ".join(unknown)}')
+
+    results = run(names, args.sizes, args.repeat, warmup=args.warmup)
+    path = save_results(results, args.output)
+    print(f'\nResults written to {path}')
+
+    if args.compare:
+        lines = compare(results, args.compare, args.threshold)
+        print('\n'.join(lines))
+        if any(line.startswith('REGRESSION') for line in lines):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
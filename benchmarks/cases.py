@@ -0,0 +1,279 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+import pyarrow as pa
+import yfinance as yf
+
+from benchmarks.harness import benchmark, synthetic_history, DAILY_BARS_LIMIT
+from utils import exports
+from utils.chart_generator import ChartGenerator
+from utils.data_fetcher import StockDataFetcher
+from utils.financial_metrics import FinancialMetrics
+from utils.helpers import DataFormatter
+from utils.investment_analysis import InvestmentAnalysis
+from utils.providers import ReplayProvider, SyntheticProvider, YFinanceProvider
+from utils.rolling import MovingAverageState
+
+
+def _use_synthetic_provider(size: int) -> str:
+    """
+    Point StockDataFetcher at a synthetic provider and an empty temporary history store
+
+    Args:
+        size (int): Number of bars in the synthetic full history
+
+    Returns:
+        Path of the temporary store directory
+    """
+    store_dir = tempfile.mkdtemp(prefix='stock-bench-')
+    atexit.register(shutil.rmtree, store_dir, True)
+    os.environ['STOCK_HISTORY_DIR'] = store_dir
+    freq = 'B' if size <= DAILY_BARS_LIMIT else 'min'
+    StockDataFetcher.set_provider(SyntheticProvider(bars=size, end='2024-12-31', freq=freq))
+    return store_dir
+
+
+@benchmark('fetch_history_cold', description='get_stock_history with an empty store and cache (synthetic provider)')
+def fetch_history_cold(size):
+    store_dir = _use_synthetic_provider(size)
+
+    def run():
+        shutil.rmtree(store_dir, ignore_errors=True)
+        StockDataFetcher.refresh_symbol('BENCH')
+        return StockDataFetcher.get_stock_history('BENCH', 'max')
+    return run
+
+
+@benchmark('fetch_history_warm', description='get_stock_history answered from the cached full history')
+def fetch_history_warm(size):
+    _use_synthetic_provider(size)
+    StockDataFetcher.get_stock_history('BENCH', 'max')
+    return lambda: StockDataFetcher.get_stock_history('BENCH', '1y')
+
+
+# Simulated round trip of every provider call in the first-paint benchmarks (seconds)
+FIRST_PAINT_LATENCY = 0.1
+
+
+def _cold_symbol_loader(size: int):
+    """
+    Build a function resetting every cache and the history store before a cold symbol load
+
+    Args:
+        size (int): Number of bars in the synthetic full history
+
+    Returns:
+        Function to call at the start of each run
+    """
+    store_dir = _use_synthetic_provider(size)
+    freq = 'B' if size <= DAILY_BARS_LIMIT else 'min'
+    provider = SyntheticProvider(bars=size, end='2024-12-31', freq=freq, latency=FIRST_PAINT_LATENCY)
+
+    def reset():
+        shutil.rmtree(store_dir, ignore_errors=True)
+        StockDataFetcher.set_provider(provider)
+    return reset
+
+
+@benchmark('first_paint_sequential',
+           description=f'Cold load until the header can render, fetching one after another ({FIRST_PAINT_LATENCY}s per call)')
+def first_paint_sequential(size):
+    reset = _cold_symbol_loader(size)
+
+    def run():
+        # Previous app order: the header waited for the snapshot, the history and then the price
+        snapshot = StockDataFetcher.get_symbol_snapshot('BENCH')
+        StockDataFetcher.get_stock_history('BENCH', '1y')
+        return snapshot, StockDataFetcher.get_quote('BENCH')
+    run.before = reset
+    return run
+
+
+@benchmark('first_paint_concurrent',
+           description=f'Cold load until the header can render, with StockDataFetcher.fetch_symbol ({FIRST_PAINT_LATENCY}s per call)')
+def first_paint_concurrent(size):
+    reset = _cold_symbol_loader(size)
+    pending = []
+
+    def before():
+        # Let the previous run's history finish so runs don't overlap
+        for future in pending:
+            future.result()
+        reset()
+
+    def run():
+        fetch = StockDataFetcher.fetch_symbol('BENCH')
+        pending[:] = [fetch['history']]
+        return fetch['snapshot'].result(), fetch['quote'].result()
+    run.before = before
+    return run
+
+
+class _ReplayedYFinanceProvider(YFinanceProvider):
+    """YFinanceProvider resolving its Ticker for every call, with replay fixtures answering instead of the network"""
+
+    def __init__(self, replay: ReplayProvider, pooled: bool):
+        super().__init__()
+        self.replay = replay
+        self.pooled = pooled
+
+    def _resolve(self, symbol: str, shared: bool = True) -> yf.Ticker:
+        # Previous behaviour: a fresh Ticker (and HTTP session) per call
+        if not self.pooled:
+            return yf.Ticker(symbol)
+        return self.ticker(symbol) if shared else self.unshared_ticker(symbol)
+
+    def get_info(self, symbol):
+        self._resolve(symbol, shared=False)
+        return self.replay.get_info(symbol)
+
+    def get_quote(self, symbol):
+        self._resolve(symbol, shared=False)
+        return self.replay.get_quote(symbol)
+
+    def get_history(self, symbol, period=None, start=None):
+        self._resolve(symbol)
+        return self.replay.get_history(symbol, period=period, start=start)
+
+
+def _warm_path(size: int, pooled: bool):
+    _use_synthetic_provider(size)
+    fixtures = tempfile.mkdtemp(prefix='stock-bench-replay-')
+    atexit.register(shutil.rmtree, fixtures, True)
+    freq = 'B' if size <= DAILY_BARS_LIMIT else 'min'
+    ReplayProvider.record(SyntheticProvider(bars=size, end='2024-12-31', freq=freq), ['BENCH'], fixtures)
+    StockDataFetcher.set_provider(_ReplayedYFinanceProvider(ReplayProvider(fixtures), pooled))
+    StockDataFetcher.get_symbol_snapshot('BENCH')
+    StockDataFetcher.get_stock_history('BENCH', '1y')
+
+    def run():
+        # Auto-refresh tick: new quote and incremental history sync of an already stored symbol
+        StockDataFetcher.refresh_symbol('BENCH')
+        return StockDataFetcher.get_quote('BENCH'), StockDataFetcher.get_stock_history('BENCH', '1y')
+    return run
+
+
+@benchmark('warm_path_fresh_tickers', description='Refresh of a stored symbol, new yf.Ticker per call (replay fixtures as network)')
+def warm_path_fresh_tickers(size):
+    return _warm_path(size, pooled=False)
+
+
+@benchmark('warm_path_pooled', description='Refresh of a stored symbol, pooled session and shared Ticker (replay fixtures as network)')
+def warm_path_pooled(size):
+    return _warm_path(size, pooled=True)
+
+
+@benchmark('moving_averages', description='StockDataFetcher.calculate_moving_averages (stateless)')
+def moving_averages(size):
+    df = synthetic_history(size)
+    return lambda: StockDataFetcher.calculate_moving_averages(df)
+
+
+@benchmark('moving_averages_incremental', description='MovingAverageState.sync after one new bar')
+def moving_averages_incremental(size):
+    df = synthetic_history(size)
+    dates, closes = df['Date'], df['Close'].to_numpy()
+    state = MovingAverageState([20, 50, 200])
+    seeded = max(size - 100, 1)
+    state.sync(dates.iloc[:seeded], closes[:seeded])
+    runs = iter(range(seeded + 1, size + 1))
+
+    def run():
+        end = next(runs, size)
+        state.sync(dates.iloc[:end], closes[:end])
+        return state.tail(min(end, 250))
+    return run
+
+
+@benchmark('price_chart_line', description='ChartGenerator.create_price_chart (line, MA 20/50/200)')
+def price_chart_line(size):
+    df = StockDataFetcher.calculate_moving_averages(synthetic_history(size))
+    return lambda: ChartGenerator.create_price_chart(df, 'BENCH', 'line')
+
+
+@benchmark('price_chart_candlestick', description='ChartGenerator.create_price_chart (candlestick, MA 20/50/200)')
+def price_chart_candlestick(size):
+    df = StockDataFetcher.calculate_moving_averages(synthetic_history(size))
+    return lambda: ChartGenerator.create_price_chart(df, 'BENCH', 'candlestick')
+
+
+@benchmark('price_chart_cached', description='ChartGenerator.get_figure for unchanged data (rerun without new bars)')
+def price_chart_cached(size):
+    df = StockDataFetcher.calculate_moving_averages(synthetic_history(size))
+
+    def run():
+        return ChartGenerator.get_figure(
+            ('BENCH', 'price', 'line'), ChartGenerator.data_stamp(df),
+            lambda: ChartGenerator.create_price_chart(df, 'BENCH', 'line')
+        )
+    return run
+
+
+@benchmark('volume_chart', description='ChartGenerator.create_volume_chart')
+def volume_chart(size):
+    df = synthetic_history(size)
+    return lambda: ChartGenerator.create_volume_chart(df, 'BENCH')
+
+
+@benchmark('metrics_dataframe', sized=False, description='DataFormatter.create_metrics_dataframe for one symbol')
+def metrics_dataframe(size):
+    info = SyntheticProvider().get_info('BENCH')
+    metrics = StockDataFetcher.extract_financial_metrics('BENCH', info)
+    return lambda: DataFormatter.create_metrics_dataframe(metrics)
+
+
+@benchmark('metrics_table', description='Health scores and display formatting of a stacked metrics table (size = symbols)')
+def metrics_table(size):
+    provider = SyntheticProvider()
+    records = [
+        FinancialMetrics.from_info(f'S{i}', provider.get_info(f'S{i}'))
+        for i in range(size)
+    ]
+    table = FinancialMetrics.stack(records)
+
+    def run():
+        InvestmentAnalysis.calculate_health_scores(table)
+        return DataFormatter.format_metrics_table(table)
+    return run
+
+
+@benchmark('format_columns', description='DataFormatter column formatters (Volume with suffixes, Close as currency)')
+def format_columns(size):
+    df = synthetic_history(size)
+
+    def run():
+        DataFormatter.format_number_column(df['Volume'])
+        return DataFormatter.format_currency_column(df['Close'])
+    return run
+
+
+@benchmark('display_table', description='Detailed data tab payload (Arrow table of the history, formats applied client-side)')
+def display_table(size):
+    df = synthetic_history(size)
+    return lambda: pa.Table.from_pandas(df, preserve_index=False)
+
+
+@benchmark('app_rerun', description='Full dashboard rerun without new data (Streamlit AppTest, synthetic provider, 5y period)')
+def app_rerun(size):
+    from streamlit.testing.v1 import AppTest
+
+    _use_synthetic_provider(size)
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py'),
+                            default_timeout=600)
+    app.run()
+    app.selectbox[1].set_value('5y').run()
+    return app.run
+
+
+@benchmark('export_csv', description='DataFormatter.export_to_csv of the history')
+def export_csv(size):
+    df = synthetic_history(size)
+    return lambda: DataFormatter.export_to_csv(df, 'BENCH_historical_data.csv')
+
+
+@benchmark('export_parquet', description='exports.export_frame of the history as Parquet')
+def export_parquet(size):
+    df = synthetic_history(size)
+    return lambda: exports.export_frame(df, 'parquet')
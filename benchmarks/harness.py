@@ -0,0 +1,284 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.providers import SyntheticProvider
+
+# Row counts used when no --sizes are given
+DEFAULT_SIZES = [250, 1_000, 10_000, 100_000, 1_000_000]
+
+# Directory where result files are written by default
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Untimed runs before the timed ones (imports, lazy initialization, first-touch caches)
+DEFAULT_WARMUP = 1
+
+# Beyond this many rows the synthetic data switches from business days to minute bars
+DAILY_BARS_LIMIT = 50_000
+
+
+@dataclass
+class Benchmark:
+    """A named benchmark; setup(size) prepares the inputs and returns the callable to time"""
+
+    name: str
+    setup: Callable[[int], Callable[[], object]]
+    sized: bool = True
+    description: str = ''
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing and memory figures of one benchmark at one input size"""
+
+    name: str
+    size: Optional[int]
+    repeat: int
+    warmup: int = 0
+    wall_ms: Dict[str, float] = field(default_factory=dict)
+    peak_bytes: int = 0
+    allocated_bytes: int = 0
+    allocated_blocks: int = 0
+
+
+_registry: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, sized: bool = True, description: str = '') -> Callable:
+    """
+    Register a benchmark setup function
+
+    Args:
+        name (str): Benchmark name used on the command line and in result files
+        sized (bool): False for benchmarks whose input does not depend on the row count
+        description (str): One-line description shown by --list
+
+    Returns:
+        Decorator registering the setup function
+    """
+    def decorator(setup: Callable[[int], Callable[[], object]]) -> Callable[[int], Callable[[], object]]:
+        _registry[name] = Benchmark(name=name, setup=setup, sized=sized, description=description)
+        return setup
+    return decorator
+
+
+def get_benchmarks() -> Dict[str, Benchmark]:
+    """
+    Get every registered benchmark
+
+    Returns:
+        Dictionary of name -> Benchmark
+    """
+    return dict(_registry)
+
+
+def synthetic_history(size: int, seed: int = 42, symbol: str = 'BENCH') -> pd.DataFrame:
+    """
+    Build a deterministic OHLCV frame shaped like StockDataFetcher.get_stock_history output
+
+    Args:
+        size (int): Number of rows
+        seed (int): Random seed
+        symbol (str): Symbol used to derive the random stream
+
+    Returns:
+        DataFrame with a 'Date' column and the OHLCV columns
+    """
+    freq = 'B' if size <= DAILY_BARS_LIMIT else 'min'
+    provider = SyntheticProvider(seed=seed, bars=size, end='2024-12-31', freq=freq)
+    return provider.generate(symbol).reset_index()
+
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = DEFAULT_WARMUP) -> BenchmarkResult:
+    """
+    Time a callable and record its memory footprint
+
+    Warm-up runs come first and are discarded, so one-off costs (lazy imports,
+    first use of a library or a cache) don't land in the timings. Wall times come
+    from untraced runs; peak memory and allocations come from one extra run under
+    tracemalloc, which would otherwise skew the timings. If fn has a `before`
+    attribute, it is called untimed before every run (e.g. to reset caches or
+    wait for background work of the previous run).
+
+    Args:
+        fn (callable): Function to benchmark
+        repeat (int): Number of timed runs
+        warmup (int): Number of untimed runs before them
+
+    Returns:
+        BenchmarkResult without name/size filled in
+    """
+    before_run = getattr(fn, 'before', None) or (lambda: None)
+
+    for _ in range(warmup):
+        before_run()
+        fn()
+
+    timings = []
+    for _ in range(repeat):
+        before_run()
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    before_run()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        del result
+    finally:
+        tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    return BenchmarkResult(
+        name='',
+        size=None,
+        repeat=repeat,
+        warmup=warmup,
+        wall_ms={
+            'min': min(timings),
+            'median': statistics.median(timings),
+            'mean': statistics.fmean(timings),
+            'max': max(timings)
+        },
+        peak_bytes=max(peak - baseline, 0),
+        allocated_bytes=sum(stat.size_diff for stat in stats if stat.size_diff > 0),
+        allocated_blocks=sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    )
+
+
+def run(names: List[str], sizes: List[int], repeat: int, progress: Callable[[str], None] = print,
+        warmup: int = DEFAULT_WARMUP) -> List[BenchmarkResult]:
+    """
+    Run benchmarks over a set of input sizes
+
+    Args:
+        names (list): Benchmark names
+        sizes (list): Row counts for sized benchmarks
+        repeat (int): Timed runs per benchmark and size
+        warmup (int): Untimed runs per benchmark and size before the timed ones
+        progress (callable): Function receiving one line per finished measurement
+
+    Returns:
+        List of BenchmarkResult
+    """
+    results = []
+    for name in names:
+        bench = _registry[name]
+        for size in (sizes if bench.sized else [None]):
+            fn = bench.setup(size)
+            result = measure(fn, repeat, warmup)
+            result.name = name
+            result.size = size
+            results.append(result)
+            progress(format_result(result))
+            del fn
+            gc.collect()
+    return results
+
+
+def format_result(result: BenchmarkResult) -> str:
+    """
+    Format one result as a table row
+
+    Args:
+        result (BenchmarkResult): Result to format
+
+    Returns:
+        Human readable line
+    """
+    size = f'{result.size:>9,}' if result.size is not None else f'{"-":>9}'
+    return (f'{result.name:<28} {size}  median {result.wall_ms["median"]:>10.2f} ms  '
+            f'peak {result.peak_bytes / 1e6:>9.2f} MB  blocks {result.allocated_blocks:>9,}')
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(results: List[BenchmarkResult], output: Optional[str] = None) -> str:
+    """
+    Write results and run metadata as JSON
+
+    Args:
+        results (list): BenchmarkResult list
+        output (str): File path (defaults to benchmarks/results/<timestamp>_<commit>.json)
+
+    Returns:
+        Path of the written file
+    """
+    commit = _git_commit()
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f'{stamp}_{commit or "nogit"}.json')
+
+    payload = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__
+        },
+        'results': [asdict(result) for result in results]
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+    return output
+
+
+def compare(results: List[BenchmarkResult], baseline_path: str, threshold: float) -> List[str]:
+    """
+    Compare results against a saved baseline
+
+    Args:
+        results (list): Current BenchmarkResult list
+        baseline_path (str): JSON file written by save_results
+        threshold (float): Median-time ratio above which a result counts as a regression
+
+    Returns:
+        List of report lines; lines of regressions start with 'REGRESSION'
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {
+            (entry['name'], entry['size']): entry
+            for entry in json.load(f)['results']
+        }
+
+    lines = []
+    for result in results:
+        previous = baseline.get((result.name, result.size))
+        if previous is None:
+            continue
+        ratio = result.wall_ms['median'] / max(previous['wall_ms']['median'], 1e-9)
+        peak_ratio = result.peak_bytes / max(previous['peak_bytes'], 1)
+        tag = 'REGRESSION' if ratio > threshold else 'ok'
+        lines.append(f'{tag:<10} {result.name:<28} {str(result.size):>9}  time x{ratio:.2f}  peak x{peak_ratio:.2f}')
+    return lines
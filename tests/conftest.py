@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from utils import cache
+from utils.data_fetcher import StockDataFetcher
+from utils.providers import SyntheticProvider
+
+# Last bar of the synthetic histories, fixed so every run sees the same dates
+SYNTHETIC_END = '2024-12-31'
+
+
+class GrowingProvider(SyntheticProvider):
+    """
+    Synthetic provider whose market "moves on": only the first `visible` bars exist yet,
+    prices can be re-adjusted, and every history request is recorded
+    """
+
+    def __init__(self, visible: int, bars: int = 600):
+        super().__init__(bars=bars, end=SYNTHETIC_END)
+        self.visible = visible
+        self.adjustment = 1.0
+        self.history_calls = []
+
+    def generate(self, symbol: str) -> pd.DataFrame:
+        bars = super().generate(symbol).iloc[:self.visible].copy()
+        bars[['Open', 'High', 'Low', 'Close']] *= self.adjustment
+        return bars
+
+    def get_history(self, symbol, period=None, start=None):
+        self.history_calls.append({'period': period, 'start': start})
+        return super().get_history(symbol, period=period, start=start)
+
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    """GrowingProvider installed as the fetcher's provider, with an empty store and caches"""
+    monkeypatch.setenv('STOCK_HISTORY_DIR', str(tmp_path / 'history'))
+    monkeypatch.delenv('STOCK_CACHE_BACKEND', raising=False)
+    cache.set_backend(None)
+
+    growing = GrowingProvider(visible=500)
+    StockDataFetcher.set_provider(growing)
+    yield growing
+    # The next use creates the provider from the environment again
+    StockDataFetcher.set_provider(None)
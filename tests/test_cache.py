@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.cache import TTLCache
+
+
+def test_entries_expire_after_their_ttl():
+    cache = TTLCache(ttl=0.05)
+    cache.put('a', 1)
+
+    assert cache.get('a') == 1
+    time.sleep(0.06)
+    assert cache.get('a') is None
+    # Expired entries stay available as last known good data
+    assert cache.peek('a') == 1
+
+
+def test_age_counts_from_the_last_store():
+    cache = TTLCache(ttl=60)
+    cache.put('a', 1)
+    time.sleep(0.05)
+
+    assert cache.age('a') >= 0.05
+    cache.put('a', 2)
+    assert cache.age('a') < 0.05
+    assert cache.age('missing') is None
+
+
+def test_ttl_for_overrides_the_default_ttl():
+    cache = TTLCache(ttl=60, ttl_for=lambda value: 0 if value is None else 60)
+    cache.put('missing', None)
+    cache.put('found', 1)
+
+    assert cache.get('missing', 'expired') == 'expired'
+    assert cache.get('found') == 1
+
+
+def test_least_recently_used_entry_is_evicted_beyond_max_entries():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')  # 'b' is now the least recently used
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+
+def test_entries_are_evicted_beyond_the_memory_budget():
+    cache = TTLCache(ttl=60, max_bytes=250, size_of=lambda value: 100)
+    for key in 'abc':
+        cache.put(key, key)
+
+    assert cache.peek('a') is None
+    assert cache.get('b') == 'b'
+    assert cache.get('c') == 'c'
+    assert cache.bytes == 200
+
+
+def test_an_entry_larger_than_the_budget_is_still_kept():
+    cache = TTLCache(ttl=60, max_bytes=10, size_of=lambda value: 100)
+    cache.put('a', 'a')
+    cache.put('b', 'b')
+
+    assert cache.peek('a') is None
+    assert cache.get('b') == 'b'
+
+
+def test_concurrent_misses_compute_once():
+    cache = TTLCache(ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(threading.current_thread().name)
+        release.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(cache.get_or_compute, 'key', compute) for _ in range(8)]
+        # Let every caller reach the cache before the first computation ends
+        time.sleep(0.1)
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.get_or_compute('key', compute) is results[0]
+    assert len(calls) == 1
+
+
+def test_concurrent_misses_share_the_error():
+    cache = TTLCache(ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        raise RuntimeError('upstream down')
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(cache.get_or_compute, 'key', compute) for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match='upstream down'):
+                future.result(timeout=5)
+
+    assert len(calls) == 1
+    # Failures are not cached
+    assert cache.get_or_compute('key', lambda: 'recovered') == 'recovered'
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.downsampling import downsample_line, resample_ohlc
+from utils.providers import SyntheticProvider
+
+from tests.conftest import SYNTHETIC_END
+
+
+@pytest.fixture
+def daily():
+    return SyntheticProvider(bars=3000, end=SYNTHETIC_END).generate('AAPL').reset_index()
+
+
+def test_downsample_line_fits_the_budget_and_keeps_the_ends(daily):
+    x, y = downsample_line(daily['Date'], daily['Close'], 500)
+
+    assert len(x) == len(y) == 500
+    assert x[0] == daily['Date'].iloc[0] and x[-1] == daily['Date'].iloc[-1]
+    assert y[0] == daily['Close'].iloc[0] and y[-1] == daily['Close'].iloc[-1]
+    assert x.is_monotonic_increasing
+
+
+def test_downsample_line_keeps_only_original_points(daily):
+    x, y = downsample_line(daily['Date'], daily['Close'], 500)
+
+    original = pd.Series(daily['Close'].to_numpy(), index=pd.DatetimeIndex(daily['Date']))
+    np.testing.assert_array_equal(original.loc[x].to_numpy(), y)
+
+
+def test_downsample_line_keeps_spikes(daily):
+    closes = daily['Close'].copy()
+    closes.iloc[1234] *= 3
+
+    x, y = downsample_line(daily['Date'], closes, 500)
+
+    assert daily['Date'].iloc[1234] in x
+    assert y.max() == closes.iloc[1234]
+
+
+def test_downsample_line_drops_missing_values(daily):
+    averages = daily['Close'].rolling(200).mean()
+
+    x, y = downsample_line(daily['Date'], averages, 5000)
+
+    assert len(y) == len(daily) - 199
+    assert not np.isnan(y).any()
+    assert x[0] == daily['Date'].iloc[199]
+
+
+def test_short_lines_are_not_downsampled(daily):
+    x, y = downsample_line(daily['Date'], daily['Close'], len(daily))
+
+    assert len(x) == len(daily)
+    np.testing.assert_array_equal(y, daily['Close'].to_numpy())
+
+
+def test_resample_ohlc_aggregates_candles(daily):
+    resampled = resample_ohlc(daily, 1000, rule='W')
+
+    expected = daily.resample('W', on='Date').agg(
+        {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+    ).dropna(subset=['Close'])
+    assert resampled['Date'].tolist() == expected.index.tolist()
+    for column in ('Open', 'High', 'Low', 'Close', 'Volume'):
+        np.testing.assert_allclose(resampled[column], expected[column])
+
+
+def test_resample_ohlc_fits_the_budget(daily):
+    resampled = resample_ohlc(daily, 200)
+
+    assert 0 < len(resampled) <= 200
+    assert resampled['High'].max() == daily['High'].max()
+    assert resampled['Low'].min() == daily['Low'].min()
+    assert resampled['Volume'].sum() == daily['Volume'].sum()
+    assert resampled['Close'].iloc[-1] == daily['Close'].iloc[-1]
+
+
+def test_resample_ohlc_keeps_the_last_value_of_other_columns(daily):
+    with_average = daily.assign(MA_20=daily['Close'].rolling(20).mean())
+
+    resampled = resample_ohlc(with_average, 1000, rule='W')
+
+    last = with_average.resample('W', on='Date')['MA_20'].last()
+    np.testing.assert_allclose(resampled['MA_20'], last.loc[resampled['Date']].to_numpy())
+
+
+def test_bars_within_the_budget_are_returned_as_is(daily):
+    assert resample_ohlc(daily, len(daily)) is daily
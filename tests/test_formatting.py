@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.financial_metrics import NUMERIC_FIELDS, FinancialMetrics
+from utils.helpers import DataFormatter
+
+# Outputs of the original scalar formatters
+BASELINE = {
+    'currency': [
+        (0, '$0.00'), (2.675, '$2.67'), (999.994, '$999.99'), (999.995, '$1000.00'), (1234.5, '$1.23K'),
+        (1e6, '$1.00M'), (2.5e9, '$2.50B'), (3.1e12, '$3.10T'), (-42.1, '$-42.10'),
+        (-5e9, '$-5000000000.00'), ('12.5', '$12.50'), (None, 'N/A'), ('N/A', 'N/A'), ('abc', 'abc'),
+    ],
+    'number': [
+        (0, '0.00'), (1.005, '1.00'), (999.5, '999.50'), (-1234567.891, '-1,234,567.89'), (45678, '45.68K'),
+        (12_345_678, '12.35M'), (7.25e9, '7.25B'), (1.5e12, '1.50T'), ('1e3', '1.00K'), (None, 'N/A'),
+    ],
+    'percentage': [
+        (0.1234, '12.34%'), (1, '100.00%'), (1.5, '1.50%'), (45.678, '45.68%'), (-0.05, '-5.00%'),
+        (0, '0.00%'), ('0.2', '20.00%'), (None, 'N/A'),
+    ],
+    'ratio': [
+        (0, '0.00'), (1.234, '1.23'), (-3.456, '-3.46'), (2.675, '2.67'), (1234.5678, '1234.57'),
+        ('7', '7.00'), (None, 'N/A'), ('N/A', 'N/A'),
+    ],
+}
+
+KINDS = list(BASELINE)
+
+
+@pytest.mark.parametrize('kind, value, expected', [
+    (kind, value, expected) for kind, cases in BASELINE.items() for value, expected in cases
+])
+def test_scalar_formatters_match_the_baseline(kind, value, expected):
+    assert getattr(DataFormatter, f'format_{kind}')(value) == expected
+
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_column_formatters_match_the_baseline(kind):
+    numeric = [(value, expected) for value, expected in BASELINE[kind]
+               if value is not None and value not in ('N/A', 'abc')]
+    values = pd.Series([float(value) for value, _ in numeric], index=[f'row{i}' for i in range(len(numeric))])
+
+    formatted = getattr(DataFormatter, f'format_{kind}_column')(values)
+
+    assert formatted.tolist() == [expected for _, expected in numeric]
+    assert formatted.index.equals(values.index)
+
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_column_formatters_match_the_scalar_formatters(kind):
+    rng = np.random.default_rng(7)
+    values = rng.standard_normal(5000) * 10.0 ** rng.integers(-4, 14, 5000)
+
+    formatted = getattr(DataFormatter, f'format_{kind}_column')(values)
+
+    scalar = getattr(DataFormatter, f'format_{kind}')
+    assert formatted.tolist() == [scalar(value) for value in values]
+
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_column_formatters_round_like_the_scalar_formatters(kind):
+    # Half hundredths that are not exact in binary, negative zeros and values beyond exact hundredths
+    values = [0.125, 0.375, 2.675, 1.005, 0.015, 12.345, 999.995, -999.995, -1234.565,
+              -0.001, -0.0, 5e-324, 2.0 ** 51 / 100 + 0.5, -1e15, 1e300, -1e300]
+
+    formatted = getattr(DataFormatter, f'format_{kind}_column')(values)
+
+    scalar = getattr(DataFormatter, f'format_{kind}')
+    assert formatted.tolist() == [scalar(value) for value in values]
+
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_missing_values_are_not_available(kind):
+    formatted = getattr(DataFormatter, f'format_{kind}_column')([np.nan, np.inf, None, 'x', 1.0])
+
+    assert formatted.tolist()[:4] == ['N/A'] * 4
+    assert getattr(DataFormatter, f'format_{kind}')(np.nan) == 'N/A'
+
+
+def test_metrics_dataframe_formats_every_field_like_the_scalar_formatters():
+    rng = np.random.default_rng(3)
+    metrics = FinancialMetrics(
+        symbol='AAPL', company_name='Apple Inc.', sector='Technology', industry=None,
+        **{field.attr: float(rng.random() * 10.0 ** rng.integers(0, 12)) for field in NUMERIC_FIELDS}
+    )
+
+    table = DataFormatter.create_metrics_dataframe(metrics)
+
+    values = dict(zip(table['Metric'], table['Value']))
+    assert values['Company Name'] == 'Apple Inc.'
+    assert values['Industry'] == 'N/A'
+    for field in NUMERIC_FIELDS:
+        expected = getattr(DataFormatter, f'format_{field.kind}')(getattr(metrics, field.attr))
+        assert values[field.label] == expected
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_fetcher import StockDataFetcher
+from utils.history_store import HistoryStore
+
+
+def bars(dates, closes):
+    return pd.DataFrame({
+        'Date': pd.DatetimeIndex(dates, tz='America/New_York'),
+        'Close': np.asarray(closes, dtype=np.float64)
+    })
+
+
+def test_merge_keeps_fresh_bars_on_duplicate_dates():
+    stored = bars(['2024-01-02', '2024-01-03', '2024-01-04'], [1.0, 2.0, 3.0])
+    fresh = bars(['2024-01-04', '2024-01-05'], [3.5, 4.0])
+
+    merged = HistoryStore.merge(stored, fresh)
+
+    assert merged['Close'].tolist() == [1.0, 2.0, 3.5, 4.0]
+    assert merged.index.tolist() == [0, 1, 2, 3]
+
+
+def test_merge_sorts_by_date():
+    stored = bars(['2024-01-03', '2024-01-05'], [2.0, 4.0])
+    fresh = bars(['2024-01-02', '2024-01-04'], [1.0, 3.0])
+
+    merged = HistoryStore.merge(stored, fresh)
+
+    assert merged['Date'].is_monotonic_increasing
+    assert merged['Close'].tolist() == [1.0, 2.0, 3.0, 4.0]
+
+
+@pytest.mark.parametrize('stored, fresh', [
+    (None, None),
+    (None, bars([], [])),
+    (bars([], []), None),
+])
+def test_merge_without_bars(stored, fresh):
+    assert HistoryStore.merge(stored, fresh) is None
+
+
+def test_merge_with_one_side_missing():
+    only = bars(['2024-01-02', '2024-01-03'], [1.0, 2.0])
+
+    assert HistoryStore.merge(None, only)['Close'].tolist() == [1.0, 2.0]
+    assert HistoryStore.merge(only, bars([], []))['Close'].tolist() == [1.0, 2.0]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    store = HistoryStore(root=str(tmp_path))
+    df = bars(['2024-01-02', '2024-01-03'], [1.0, 2.0])
+    covered_from = pd.Timestamp('2023-12-01', tz='America/New_York')
+
+    store.save('AAPL', df, covered_from)
+    loaded, loaded_from = store.load('AAPL')
+
+    pd.testing.assert_frame_equal(loaded, df)
+    assert loaded_from == covered_from
+    assert store.load('MSFT') == (None, None)
+
+
+def test_first_sync_downloads_the_full_history(provider):
+    history = StockDataFetcher.sync_history('AAPL')
+
+    assert provider.history_calls == [{'period': 'max', 'start': None}]
+    assert len(history) == provider.visible
+    np.testing.assert_allclose(history['Close'], provider.generate('AAPL')['Close'])
+
+
+def test_sync_downloads_only_new_bars(provider):
+    StockDataFetcher.sync_history('AAPL')
+    stored_dates = StockDataFetcher.get_history_store().load('AAPL')[0]['Date']
+    provider.visible += 5
+    provider.history_calls.clear()
+
+    history = StockDataFetcher.sync_history('AAPL')
+
+    # One incremental request starting at the settled bar before the last stored one
+    assert len(provider.history_calls) == 1
+    call = provider.history_calls[0]
+    assert call['period'] is None
+    assert pd.Timestamp(call['start']).date() == stored_dates.iloc[-2].date()
+
+    expected = provider.generate('AAPL')
+    assert len(history) == provider.visible
+    np.testing.assert_allclose(history['Close'], expected['Close'])
+    assert (history['Date'].to_numpy() == expected.index.to_numpy()).all()
+
+    # The new bars were persisted
+    stored, covered_from = StockDataFetcher.get_history_store().load('AAPL')
+    assert len(stored) == provider.visible
+    assert covered_from is None
+
+
+def test_sync_without_new_bars_keeps_the_history(provider):
+    first = StockDataFetcher.sync_history('AAPL')
+    provider.history_calls.clear()
+
+    second = StockDataFetcher.sync_history('AAPL')
+
+    assert len(provider.history_calls) == 1
+    pd.testing.assert_frame_equal(second, first)
+
+
+def test_sync_redownloads_readjusted_history(provider):
+    StockDataFetcher.sync_history('AAPL')
+    # A split re-bases every past price upstream
+    provider.adjustment = 0.5
+    provider.visible += 1
+    provider.history_calls.clear()
+
+    history = StockDataFetcher.sync_history('AAPL')
+
+    assert provider.history_calls[-1] == {'period': 'max', 'start': None}
+    np.testing.assert_allclose(history['Close'], provider.generate('AAPL')['Close'])
+
+
+def test_full_histories_are_synced_together_and_cached(provider):
+    for symbol in ('AAPL', 'MSFT'):
+        StockDataFetcher.refresh_symbol(symbol)
+    StockDataFetcher.sync_history('AAPL')
+    provider.visible += 3
+    provider.history_calls.clear()
+
+    histories = StockDataFetcher.get_full_histories(['aapl', 'MSFT'])
+
+    # MSFT is new and downloaded in full, AAPL only needs its newest bars
+    assert sorted(call['period'] for call in provider.history_calls if call['period']) == ['max']
+    assert len(provider.history_calls) == 2
+    for symbol in ('AAPL', 'MSFT'):
+        np.testing.assert_allclose(histories[symbol]['Close'], provider.generate(symbol)['Close'])
+
+    provider.history_calls.clear()
+    assert StockDataFetcher.get_full_histories(['AAPL'])['AAPL'] is histories['AAPL']
+    assert provider.history_calls == []
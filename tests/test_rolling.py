@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.providers import SyntheticProvider
+from utils.rolling import MovingAverageState
+
+from tests.conftest import SYNTHETIC_END
+
+PERIODS = [5, 20, 200]
+
+
+@pytest.fixture
+def history():
+    return SyntheticProvider(bars=1000, end=SYNTHETIC_END).generate('AAPL').reset_index()
+
+
+def assert_matches_full_recompute(state, dates, closes):
+    averages = state.tail(len(dates))
+    for period in PERIODS:
+        expected = pd.Series(closes).rolling(period).mean().to_numpy()
+        np.testing.assert_allclose(averages[period], expected, rtol=1e-9, equal_nan=True)
+
+
+def test_sync_in_one_go_matches_a_full_recompute(history):
+    state = MovingAverageState(PERIODS)
+    closes = history['Close'].to_numpy()
+
+    state.sync(history['Date'], closes)
+
+    assert state.count == len(history)
+    assert_matches_full_recompute(state, history['Date'], closes)
+
+
+def test_incremental_sync_matches_a_full_recompute(history):
+    state = MovingAverageState(PERIODS)
+    closes = history['Close'].to_numpy()
+
+    for end in [150, 151, 400, 999, 1000]:
+        state.sync(history['Date'].iloc[:end], closes[:end])
+
+    assert_matches_full_recompute(state, history['Date'], closes)
+
+
+def test_revised_last_bar_matches_a_full_recompute(history):
+    state = MovingAverageState(PERIODS)
+    closes = history['Close'].to_numpy().copy()
+    state.sync(history['Date'], closes)
+
+    # The last bar was captured mid-session and closed elsewhere
+    closes[-1] *= 1.05
+    state.sync(history['Date'], closes)
+
+    assert state.last_close == closes[-1]
+    assert_matches_full_recompute(state, history['Date'], closes)
+
+
+def test_rewritten_history_starts_over(history):
+    state = MovingAverageState(PERIODS)
+    closes = history['Close'].to_numpy()
+    state.sync(history['Date'].iloc[:800], closes[:800])
+
+    # Re-adjusted after a split: same dates, every price re-based
+    adjusted = closes * 0.5
+    state.sync(history['Date'], adjusted)
+
+    assert state.first_close == adjusted[0]
+    assert_matches_full_recompute(state, history['Date'], adjusted)
+
+
+def test_tail_and_covers_follow_the_synced_history(history):
+    state = MovingAverageState(PERIODS)
+    state.sync(history['Date'], history['Close'].to_numpy())
+
+    assert state.covers(history['Date'].iloc[-250:]) == 250
+    assert state.covers(history['Date'].iloc[:250]) is None
+    assert len(state.tail(250)[20]) == 250
@@ -0,0 +1 @@
+# Streamlit renderers on top of the UI-free utils package
@@ -0,0 +1,221 @@
+import streamlit as st
+import pandas as pd
+from typing import Optional
+
+from utils import tracing
+from utils.chart_generator import ChartGenerator
+from utils.financial_metrics import FinancialMetrics
+from utils.investment_analysis import InvestmentAnalysis
+
+# Streamlit callout used for each recommendation
+_RECOMMENDATION_STYLES = {
+    "Compra fuerte": (st.success, "🟢"),
+    "Compra": (st.success, "🟢"),
+    "Mantener": (st.warning, "🟡"),
+}
+
+class InvestmentAnalysisView:
+    """Class rendering the investment analysis components with Streamlit"""
+    
+    @staticmethod
+    def _recommendation(recommendation: str) -> None:
+        """Show a recommendation as a green, yellow or red callout"""
+        callout, icon = _RECOMMENDATION_STYLES.get(recommendation, (st.error, "🔴"))
+        callout(f"{icon} **{recommendation}**")
+    
+    @staticmethod
+    @tracing.timed('analysis.price_range')
+    def create_price_range_widget(symbol: str, current_price: float, day_low: float, day_high: float,
+                                week52_low: float, week52_high: float) -> None:
+        """
+        Create price range indicators similar to the image
+        
+        Args:
+            symbol: Stock symbol
+            current_price: Current price
+            day_low: Day's low price
+            day_high: Day's high price
+            week52_low: 52-week low
+            week52_high: 52-week high
+        """
+        st.markdown("#### 📊 Rangos de Precio")
+        
+        for title, low, high in (("Rango diario", day_low, day_high), ("52 semanas", week52_low, week52_high)):
+            st.markdown(f"**{title}**")
+            
+            col1, col2, col3 = st.columns([1, 3, 1])
+            with col1:
+                st.write(f"${low:.2f}")
+            with col2:
+                st.progress(InvestmentAnalysis.range_position(current_price, low, high))
+            with col3:
+                st.write(f"${high:.2f}")
+    
+    @staticmethod
+    @tracing.timed('analysis.analyst_opinion')
+    def create_analyst_opinion_widget(symbol: str, current_price: float) -> None:
+        """
+        Create analyst opinion widget
+        
+        Args:
+            symbol: Stock symbol
+            current_price: Current stock price
+        """
+        opinion = InvestmentAnalysis.simulate_analyst_opinion(current_price)
+        
+        st.markdown("#### 📈 Opinión de los Analistas")
+        
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            InvestmentAnalysisView._recommendation(opinion['recommendation'])
+        
+        st.markdown("**Precio objetivo**")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Precio objetivo", f"${opinion['target_price']:.2f}")
+        with col2:
+            st.metric("Al alza", f"+{opinion['upside']:.2f}%", delta=f"+{opinion['upside']:.1f}%")
+    
+    @staticmethod
+    @tracing.timed('analysis.technical_gauge')
+    def create_technical_analysis_gauge(symbol: str, indicators: Optional[pd.DataFrame] = None,
+                                        close: Optional[float] = None) -> None:
+        """
+        Create technical analysis gauge similar to the image
+        
+        Args:
+            symbol: Stock symbol
+            indicators: Output of TechnicalIndicators.calculate (neutral score if missing)
+            close: Latest closing price
+        """
+        signal = InvestmentAnalysis.technical_signal(indicators, close)
+        
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            st.plotly_chart(ChartGenerator.create_technical_gauge(signal['score']), use_container_width=False)
+        with col2:
+            st.markdown("#### Señal Técnica")
+            if signal['recommendation'] == "Compra":
+                # A moderate technical buy is shown in yellow, like the gauge
+                st.warning(f"🟡 **{signal['recommendation']}**")
+            else:
+                InvestmentAnalysisView._recommendation(signal['recommendation'])
+            
+            # Add score display
+            st.metric("Puntuación", f"{signal['score']}/100")
+            
+            if indicators is not None and not indicators.empty:
+                last = indicators.iloc[-1]
+                st.caption(
+                    f"RSI {last['RSI_14']:.0f} · MACD {last['MACD_Hist']:+.2f} · "
+                    f"Estocástico {last['STOCH_K']:.0f} · ATR {last['ATR_14']:.2f}"
+                )
+    
+    @staticmethod
+    @tracing.timed('analysis.sentiment')
+    def create_sentiment_widget(symbol: str) -> None:
+        """
+        Create market sentiment widget
+        
+        Args:
+            symbol: Stock symbol
+        """
+        current_sentiment = InvestmentAnalysis.simulate_sentiment()
+        
+        st.markdown("#### 📊 Sentimientos del Mercado")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if current_sentiment == "Bajista":
+                st.error("🐻 **Bajista**")
+            else:
+                st.markdown("🐻 Bajista")
+        
+        with col2:
+            if current_sentiment == "Alcista":
+                st.success("🐂 **Alcista**")
+            else:
+                st.markdown("🐂 Alcista")
+        
+        # Show current sentiment prominently
+        if current_sentiment == "Alcista":
+            st.success(f"🚀 Sentimiento actual: **{current_sentiment}**")
+        elif current_sentiment == "Bajista":
+            st.error(f"📉 Sentimiento actual: **{current_sentiment}**")
+        else:
+            st.info(f"⚖️ Sentimiento actual: **{current_sentiment}**")
+    
+    @staticmethod
+    @tracing.timed('analysis.health_card')
+    def create_company_health_card(symbol: str, metrics: FinancialMetrics) -> None:
+        """
+        Create company health assessment card
+        
+        Args:
+            symbol: Stock symbol
+            metrics: FinancialMetrics of the symbol
+        """
+        st.markdown("#### 🏥 Salud de la Empresa")
+        
+        health = InvestmentAnalysis.assess_company_health(metrics)
+        health_score = health['score']
+        
+        # Create health assessment using native Streamlit components
+        st.markdown("**Estado de Salud de la Empresa**")
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.progress(health_score/100)
+        with col2:
+            st.metric("Salud", f"{health_score:.0f}/100", delta=None)
+        
+        # Show status without background
+        if health_score >= 80:
+            st.success(f"🟢 {health['status']}")
+        elif health_score >= 60:
+            st.warning(f"🟡 {health['status']}")
+        elif health_score >= 40:
+            st.warning(f"🟠 {health['status']}")
+        else:
+            st.error(f"🔴 {health['status']}")
+    
+    @staticmethod
+    @tracing.timed('analysis.summary_card')
+    def create_investment_summary_card(symbol: str, current_price: float, metrics: FinancialMetrics) -> None:
+        """
+        Create investment summary card with key insights
+        
+        Args:
+            symbol: Stock symbol
+            current_price: Current stock price
+            metrics: FinancialMetrics of the symbol
+        """
+        st.markdown("#### 💡 Resumen de Inversión")
+        
+        # Get fair value analysis
+        fair_value_data = InvestmentAnalysis.create_fair_value_indicator(current_price)
+        
+        # Create investment summary using native Streamlit components
+        st.markdown(f"#### 🎯 {symbol} Análisis de Inversión")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Precio Actual", f"${current_price:.2f}")
+            st.metric("Valor Razonable", f"${fair_value_data['fair_value']:.2f}")
+        with col2:
+            # Show recommendation with appropriate styling
+            callout, icon = _RECOMMENDATION_STYLES.get(fair_value_data['recommendation'], (st.error, "🔴"))
+            callout(f"{icon} {fair_value_data['recommendation']}")
+            
+            # Show status
+            st.write(f"**Estado:** {fair_value_data['status']}")
+        
+        # Show difference
+        diff_percentage = fair_value_data['percentage_diff']
+        if diff_percentage > 0:
+            st.error(f"🔴 Sobrevalorado por {diff_percentage:.1f}%")
+        elif diff_percentage < -5:
+            st.success(f"🟢 Subvalorado por {abs(diff_percentage):.1f}%")
+        else:
+            st.warning(f"🟡 Cerca del valor razonable ({diff_percentage:+.1f}%)")
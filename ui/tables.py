@@ -0,0 +1,28 @@
+import pandas as pd
+import streamlit as st
+from typing import Any, Dict
+
+from utils import tracing
+
+@tracing.timed('format.history_columns')
+def history_column_config(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Display formats for the detailed data table
+    
+    The table renders the history as-is and the browser applies these formats,
+    so no formatted copy of the frame is built.
+    
+    Args:
+        df: Historical data with a 'Date' column
+        
+    Returns:
+        Column configuration for st.dataframe
+    """
+    config = {'Date': st.column_config.DateColumn('Date', format='YYYY-MM-DD')}
+    for col in df.columns:
+        if col == 'Volume':
+            config[col] = st.column_config.NumberColumn(col, format='compact')
+        elif col in ('Open', 'High', 'Low', 'Close') or col.startswith('MA_'):
+            config[col] = st.column_config.NumberColumn(col, format='%.2f')
+    
+    return config
@@ -0,0 +1,270 @@
+"""
+Headless batch analysis of many symbols, for precomputed (e.g. nightly) reports
+
+Each symbol goes through fetch -> moving averages/indicators -> metrics -> health
+score without a browser session. The histories of every symbol are synced with
+multi-ticker downloads while the info snapshots are fetched on a thread pool, then
+the indicator maths of each history runs on a process pool.
+
+Usage:
+    python -m utils.batch_analysis AAPL,MSFT,NVDA            # default period and reports
+    python -m utils.batch_analysis --popular --period 6mo --output reports
+    python -m utils.batch_analysis TSLA --formats html --cpu-workers 0
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import exports, tracing
+from utils.data_fetcher import StockDataFetcher
+from utils.financial_metrics import FinancialMetrics
+from utils.helpers import DataFormatter
+from utils.indicators import TechnicalIndicators
+from utils.investment_analysis import InvestmentAnalysis
+from utils.symbol_snapshot import SymbolSnapshot
+
+# Concurrent info downloads (network bound; histories share multi-ticker downloads)
+BATCH_IO_WORKERS = 16
+
+# Report formats written by default; 'html' is a formatted table, the others are exports.EXPORT_FORMATS keys
+DEFAULT_REPORT_FORMATS = ('parquet', 'csv', 'html')
+
+# Moving averages included in the report
+REPORT_MA_PERIODS = [20, 50, 200]
+
+# Technical columns of the report, in order
+TECHNICAL_COLUMNS = (
+    ['last_close', 'period_return']
+    + [f'MA_{period}' for period in REPORT_MA_PERIODS]
+    + ['RSI_14', 'MACD', 'MACD_Signal', 'technical_score']
+)
+
+# Display kind of the technical columns in the HTML report
+_TECHNICAL_KINDS = {
+    'last_close': 'currency',
+    'period_return': 'percentage',
+    **{f'MA_{period}': 'currency' for period in REPORT_MA_PERIODS},
+    'RSI_14': 'ratio',
+    'MACD': 'ratio',
+    'MACD_Signal': 'ratio',
+    'technical_score': 'ratio',
+    'health_score': 'ratio',
+}
+
+
+def analyze_history(history: pd.DataFrame, period: str) -> Dict[str, float]:
+    """
+    Moving averages, indicators and technical score of one symbol (CPU bound)
+
+    Averages and indicators run over the full history, like the dashboard, so their
+    latest values include the bars before the period start; only the return is
+    measured over the period. Module-level so it can be pickled to a worker process.
+
+    Args:
+        history (pd.DataFrame): Full OHLCV history with 'Date' and 'Close' columns
+        period (str): Period the return is measured over
+
+    Returns:
+        Latest value of every technical column (NaN when not enough bars)
+    """
+    close = history['Close'].to_numpy(dtype=np.float64)
+    with_averages = StockDataFetcher.calculate_moving_averages(history, REPORT_MA_PERIODS)
+    indicators = TechnicalIndicators.calculate(history)
+    period_close = StockDataFetcher.slice_period(history, period)['Close'].to_numpy(dtype=np.float64)
+
+    row = dict.fromkeys(TECHNICAL_COLUMNS, np.nan)
+    row['last_close'] = close[-1]
+    if len(period_close) and period_close[0]:
+        row['period_return'] = (close[-1] / period_close[0] - 1) * 100
+    for period in REPORT_MA_PERIODS:
+        column = f'MA_{period}'
+        if column in with_averages:
+            row[column] = with_averages[column].iloc[-1]
+    for column in ('RSI_14', 'MACD', 'MACD_Signal'):
+        row[column] = indicators[column].iloc[-1]
+    row['technical_score'] = TechnicalIndicators.calculate_score(indicators, close[-1])
+    return row
+
+
+def _process_pool(cpu_workers: Optional[int]) -> Executor:
+    """Worker processes for the indicator maths, or the calling thread when cpu_workers is 0"""
+    if cpu_workers == 0:
+        return ThreadPoolExecutor(max_workers=1)
+    # Spawned rather than forked: the fetcher keeps background threads that must not be copied mid-flight
+    return ProcessPoolExecutor(max_workers=cpu_workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+@tracing.timed('batch.run')
+def run_batch(symbols: List[str], period: str = '1y', io_workers: int = BATCH_IO_WORKERS,
+              cpu_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Analyze many symbols into one report table
+
+    Args:
+        symbols (list): Stock symbols
+        period (str): History period the return is measured over (averages and indicators use the full history)
+        io_workers (int): Concurrent info downloads
+        cpu_workers (int): Worker processes for the indicator maths (None: one per CPU, 0: in-process)
+
+    Returns:
+        DataFrame indexed by symbol: company name, sector, industry, financial metrics,
+        technical columns, health score and an 'error' column (None when the symbol succeeded)
+    """
+    symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol.strip()))
+    snapshots: Dict[str, SymbolSnapshot] = {}
+    errors: Dict[str, Optional[str]] = dict.fromkeys(symbols)
+    technical: Dict[str, Future] = {}
+    rows: Dict[str, Dict[str, float]] = {}
+
+    if symbols:
+        with ThreadPoolExecutor(max_workers=min(io_workers, len(symbols))) as io_pool, \
+                _process_pool(cpu_workers) as cpu_pool:
+            # One batched history sync runs alongside the per-symbol info downloads
+            histories_future = io_pool.submit(StockDataFetcher.get_full_histories, symbols)
+            fetches = {io_pool.submit(StockDataFetcher.get_symbol_snapshot, symbol): symbol for symbol in symbols}
+            for future in as_completed(fetches):
+                symbol = fetches[future]
+                try:
+                    snapshots[symbol] = future.result()
+                except Exception as e:
+                    errors[symbol] = str(e)
+
+            try:
+                histories = histories_future.result()
+            except Exception as e:
+                histories = {}
+                errors.update((symbol, str(e)) for symbol in snapshots)
+
+            for symbol, snapshot in snapshots.items():
+                history = histories.get(symbol)
+                if not snapshot.is_valid:
+                    errors[symbol] = snapshot.error or 'Unknown symbol'
+                elif errors[symbol] is not None:
+                    continue
+                elif history is None or history.empty:
+                    errors[symbol] = StockDataFetcher.get_history_error(symbol) or 'No history'
+                else:
+                    technical[symbol] = cpu_pool.submit(analyze_history, history, period)
+
+            for symbol, future in technical.items():
+                try:
+                    rows[symbol] = future.result()
+                except Exception as e:
+                    errors[symbol] = str(e)
+
+    valid = [snapshot.metrics for snapshot in snapshots.values()
+             if snapshot.is_valid and snapshot.metrics is not None]
+    metrics = FinancialMetrics.stack(valid, text=True)
+    # Snapshots carry the provider's symbol spelling, the report uses the requested one
+    metrics.index = metrics.index.str.upper()
+    metrics = metrics.reindex(symbols)
+    metrics.index.name = 'symbol'
+
+    technical_table = pd.DataFrame.from_dict(rows, orient='index', columns=list(TECHNICAL_COLUMNS))
+    report = metrics.join(technical_table.astype(np.float64))
+    report['health_score'] = InvestmentAnalysis.calculate_health_scores(report).to_numpy()
+    report['error'] = pd.Series(errors, dtype=object).reindex(report.index)
+    return report
+
+
+def format_report(report: pd.DataFrame) -> pd.DataFrame:
+    """
+    Format a report table for display
+
+    Args:
+        report (pd.DataFrame): Output of run_batch
+
+    Returns:
+        Table of display strings ('N/A' for missing values)
+    """
+    formatted = DataFormatter.format_metrics_table(report.drop(columns=list(_TECHNICAL_KINDS) + ['error']))
+    for column, kind in _TECHNICAL_KINDS.items():
+        formatter = getattr(DataFormatter, DataFormatter.KIND_FORMATTERS[kind])
+        formatted[column] = formatter(report[column]).to_numpy()
+    formatted['error'] = report['error'].fillna('')
+    return formatted
+
+
+def write_reports(report: pd.DataFrame, output_dir: str, stem: str,
+                  formats: Tuple[str, ...] = DEFAULT_REPORT_FORMATS) -> List[str]:
+    """
+    Write a report table in several formats
+
+    Args:
+        report (pd.DataFrame): Output of run_batch
+        output_dir (str): Directory the reports are written to (created if missing)
+        stem (str): File name without extension
+        formats (tuple): 'html' and/or keys of exports.EXPORT_FORMATS
+
+    Returns:
+        Paths of the written files
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        if fmt == 'html':
+            path = os.path.join(output_dir, f'{stem}.html')
+            with open(path, 'w', encoding='utf-8') as out:
+                out.write(format_report(report).to_html(border=0, classes='batch-analysis'))
+        else:
+            path = os.path.join(output_dir, exports.file_name(stem, fmt))
+            with open(path, 'wb') as out:
+                exports.write_frame(report.reset_index(), out, fmt)
+        paths.append(path)
+    return paths
+
+
+def _parse_list(value: str) -> list:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m utils.batch_analysis',
+                                     description='Analyze many symbols and write Parquet/CSV/HTML reports')
+    parser.add_argument('symbols', nargs='*', help='symbols, space or comma separated')
+    parser.add_argument('--popular', action='store_true', help='analyze the popular symbols list')
+    parser.add_argument('--period', default='1y', help='history period (default: %(default)s)')
+    parser.add_argument('--output', default='reports', help='output directory (default: %(default)s)')
+    parser.add_argument('--formats', type=_parse_list, default=list(DEFAULT_REPORT_FORMATS),
+                        help=f'comma-separated report formats: html, {", ".join(exports.EXPORT_FORMATS)} '
+                             f'(default: {",".join(DEFAULT_REPORT_FORMATS)})')
+    parser.add_argument('--io-workers', type=int, default=BATCH_IO_WORKERS,
+                        help='concurrent info downloads (default: %(default)s)')
+    parser.add_argument('--cpu-workers', type=int, default=None,
+                        help='worker processes for the indicators (default: one per CPU, 0: in-process)')
+    args = parser.parse_args(argv)
+
+    symbols = [symbol for value in args.symbols for symbol in _parse_list(value)]
+    if args.popular:
+        symbols += DataFormatter.get_popular_symbols()
+    if not symbols:
+        parser.error('no symbols given (pass symbols or --popular)')
+    unknown = [fmt for fmt in args.formats if fmt != 'html' and fmt not in exports.EXPORT_FORMATS]
+    if unknown:
+        parser.error(f'unknown format(s): {", ".join(unknown)}')
+
+    # Fetch errors are logged by the data layer
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(name)s: %(message)s')
+
+    report = run_batch(symbols, args.period, args.io_workers, args.cpu_workers)
+    failed = report['error'].notna()
+    for symbol, error in report.loc[failed, 'error'].items():
+        print(f'{symbol:<8} failed: {error}', file=sys.stderr)
+
+    stem = f'batch_analysis_{args.period}_{date.today():%Y%m%d}'
+    for path in write_reports(report, args.output, stem, tuple(args.formats)):
+        print(path)
+    print(f'{len(report) - failed.sum()}/{len(report)} symbols analyzed')
+    return 1 if failed.all() else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,616 @@
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import tracing
+
+logger = logging.getLogger(__name__)
+
+# Default location of the disk cache backend (can be overridden with STOCK_CACHE_DIR)
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'objects')
+
+# Every cache created with a name, for the admin view
+_registry: Dict[str, 'TTLCache'] = {}
+_registry_lock = threading.Lock()
+
+# Returned by TTLCache._load_persisted when the backend has no usable entry (None is a valid value)
+_NOT_PERSISTED = object()
+
+_backend = None
+_backend_configured = False
+_backend_lock = threading.Lock()
+
+
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """
+    Estimate the memory held by a cached value
+
+    Frames, series and arrays count their buffers; containers, dataclasses and
+    plain objects are walked recursively (shared objects are counted once).
+
+    Args:
+        value: Any cached value
+
+    Returns:
+        Approximate size in bytes
+    """
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        # Object columns are rare in the cached frames, deep introspection would be slow
+        usage = value.memory_usage(index=True, deep=False)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, pd.Index):
+        return int(value.memory_usage(deep=False))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(item, seen) for item in value)
+    if hasattr(value, 'to_plotly_json') and hasattr(value, '_data'):
+        # Plotly figures hold their traces as plain dicts of arrays (to_plotly_json() would deep-copy them)
+        return sys.getsizeof(value) + estimate_size([value._data, value._layout], seen)
+    if hasattr(value, 'items'):
+        return sys.getsizeof(value) + sum(
+            estimate_size(key, seen) + estimate_size(item, seen) for key, item in value.items()
+        )
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + estimate_size(vars(value), seen)
+    if hasattr(value, '__slots__'):
+        return sys.getsizeof(value) + sum(
+            estimate_size(getattr(value, slot, None), seen) for slot in value.__slots__
+        )
+    return sys.getsizeof(value)
+
+
+def budget_from_env(name: str, default_mb: float) -> int:
+    """
+    Read the memory budget of a cache from STOCK_CACHE_<NAME>_MB
+
+    Args:
+        name (str): Cache name
+        default_mb (float): Budget used when the variable is not set
+
+    Returns:
+        Budget in bytes
+    """
+    return int(float(os.environ.get(f'STOCK_CACHE_{name.upper()}_MB', default_mb)) * 1024 * 1024)
+
+
+def registered_caches() -> List['TTLCache']:
+    """
+    Get every named cache of the process
+
+    Returns:
+        Caches sorted by name
+    """
+    with _registry_lock:
+        return [_registry[name] for name in sorted(_registry)]
+
+
+class CacheBackend(ABC):
+    """
+    Shared second tier behind the persistent TTLCaches
+
+    Entries outlive the process, so restarts, CLI runs and worker processes reuse
+    what another process already fetched. Expiry times are wall-clock timestamps.
+    """
+
+    @abstractmethod
+    def load(self, namespace: str, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """
+        Load an entry, even if it has expired
+
+        Args:
+            namespace (str): Namespace of the cache owning the entry
+            key: Cache key
+
+        Returns:
+            Tuple of (value, expiry as a time.time() timestamp), or None if missing
+        """
+
+    @abstractmethod
+    def save(self, namespace: str, key: Hashable, value: Any, expires_at: float) -> None:
+        """
+        Store an entry
+
+        Args:
+            namespace (str): Namespace of the cache owning the entry
+            key: Cache key
+            value: Value to store (must be picklable for the disk backend)
+            expires_at (float): Expiry as a time.time() timestamp
+        """
+
+    @abstractmethod
+    def delete(self, namespace: str, key: Optional[Hashable] = None) -> None:
+        """
+        Drop one entry, or the whole namespace when no key is given
+
+        Args:
+            namespace (str): Namespace of the cache owning the entries
+            key: Cache key to drop (None clears the namespace)
+        """
+
+
+class DiskBackend(CacheBackend):
+    """Cache backend keeping one pickle file per entry (only point it at a directory you trust)"""
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Initialize the backend
+
+        Args:
+            root (str): Directory holding the entries (defaults to STOCK_CACHE_DIR or .cache/objects)
+        """
+        self.root = root or os.environ.get('STOCK_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+    def path_for(self, namespace: str, key: Hashable) -> str:
+        """
+        Get the file path of an entry
+
+        Args:
+            namespace (str): Namespace of the cache owning the entry
+            key: Cache key (its repr() names the file)
+
+        Returns:
+            Absolute path of the entry
+        """
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.root, namespace, f'{digest}.pkl')
+
+    def load(self, namespace: str, key: Hashable) -> Optional[Tuple[Any, float]]:
+        try:
+            with open(self.path_for(namespace, key), 'rb') as f:
+                stored_key, value, expires_at = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError) as e:
+            # Truncated or written by an incompatible version, treat as missing
+            logger.warning('Ignoring unreadable cache entry %s/%r: %s', namespace, key, e)
+            return None
+        return (value, expires_at) if stored_key == key else None
+
+    def save(self, namespace: str, key: Hashable, value: Any, expires_at: float) -> None:
+        path = self.path_for(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((key, value, expires_at), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, namespace: str, key: Optional[Hashable] = None) -> None:
+        if key is None:
+            shutil.rmtree(os.path.join(self.root, namespace), ignore_errors=True)
+            return
+        try:
+            os.remove(self.path_for(namespace, key))
+        except FileNotFoundError:
+            pass
+
+
+def create_backend_from_env() -> Optional[CacheBackend]:
+    """
+    Build the cache backend selected by the STOCK_CACHE_BACKEND environment variable
+
+    'memory' (default, no shared tier) or 'disk' (pickle files under STOCK_CACHE_DIR).
+
+    Returns:
+        CacheBackend instance, or None for in-memory caching only
+    """
+    kind = os.environ.get('STOCK_CACHE_BACKEND', 'memory').lower()
+
+    if kind == 'memory':
+        return None
+    if kind == 'disk':
+        return DiskBackend()
+
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+def get_backend() -> Optional[CacheBackend]:
+    """
+    Get the process-wide cache backend
+
+    Returns:
+        Active CacheBackend (created from the environment on first use), or None for memory only
+    """
+    global _backend, _backend_configured
+    with _backend_lock:
+        if not _backend_configured:
+            _backend = create_backend_from_env()
+            _backend_configured = True
+        return _backend
+
+
+def set_backend(backend: Optional[CacheBackend]) -> None:
+    """
+    Replace the process-wide cache backend (e.g. with a shared store for an API server)
+
+    Args:
+        backend (CacheBackend): Backend used from now on, None for memory only
+    """
+    global _backend, _backend_configured
+    with _backend_lock:
+        _backend = backend
+        _backend_configured = True
+
+
+class _InFlight:
+    """Result holder shared by every caller waiting on the same computation"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Thread-safe TTL cache that coalesces concurrent misses for the same key (single-flight)
+
+    Optionally bounded by a number of entries and an estimated memory budget:
+    least recently used entries are evicted first. Expired entries are kept
+    (as last known good data for peek()) until they are replaced or evicted.
+    Persistent caches also write through to the process-wide CacheBackend and
+    look entries up there before computing them.
+    """
+
+    def __init__(self, ttl: float, ttl_for: Optional[Callable[[Any], float]] = None, name: Optional[str] = None,
+                 max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 size_of: Callable[[Any], int] = estimate_size,
+                 persist_as: Optional[Callable[[], str]] = None):
+        """
+        Initialize the cache
+
+        Args:
+            ttl (float): Default time to live of an entry in seconds
+            ttl_for (callable): Optional function returning a per-value time to live
+            name (str): Name under which get_or_compute hits and misses are traced and the cache
+                is listed in the admin view (None to not trace or list)
+            max_entries (int): Maximum number of entries (None for no limit)
+            max_bytes (int): Memory budget of the entries in bytes (None for no limit)
+            size_of (callable): Function estimating the size of a value in bytes
+            persist_as (callable): Function returning the backend namespace of the entries
+                (None keeps them in memory only)
+        """
+        self.ttl = ttl
+        self.ttl_for = ttl_for
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.persist_as = persist_as
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # key -> (value, expires at, size, stored at), LRU first
+        self._in_flight: Dict[Hashable, _InFlight] = {}
+        self._lock = threading.Lock()
+
+        if name is not None:
+            with _registry_lock:
+                _registry[name] = self
+
+    def _lookup(self, key: Hashable) -> Optional[tuple]:
+        """Get a fresh entry and count the lookup (lock held)"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a fresh cached value without computing it
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._lookup(key)
+        if entry is not None:
+            return entry[0]
+
+        persisted = self._load_persisted(key, fresh_only=True)
+        return default if persisted is _NOT_PERSISTED else persisted
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value even if it has expired (last known good data, from the backend
+        when this process never held it)
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing
+
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry[0]
+
+        persisted = self._load_persisted(key, fresh_only=False)
+        return default if persisted is _NOT_PERSISTED else persisted
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting least recently used entries beyond the limits
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        ttl = self.ttl_for(value) if self.ttl_for is not None else self.ttl
+        self._store(key, value, ttl)
+
+        persistence = self._persistence()
+        if persistence is not None:
+            backend, namespace = persistence
+            try:
+                backend.save(namespace, key, value, time.time() + ttl)
+            except Exception as e:
+                # The memory tier still holds the value, only sharing it is lost
+                logger.warning('Could not persist cache entry %s/%r: %s', namespace, key, e)
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Store a value in memory and evict beyond the limits"""
+        size = self.size_of(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            now = time.monotonic()
+            self._entries[key] = (value, now + ttl, size, now)
+            self.bytes += size
+
+            # The new entry itself is kept even if it alone exceeds the budget
+            while len(self._entries) > 1 and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted[2]
+                self.evictions += 1
+
+    def _persistence(self) -> Optional[Tuple[CacheBackend, str]]:
+        """Backend and namespace of a persistent cache, or None"""
+        if self.persist_as is None:
+            return None
+        backend = get_backend()
+        return None if backend is None else (backend, self.persist_as())
+
+    def _load_persisted(self, key: Hashable, fresh_only: bool) -> Any:
+        """
+        Load an entry from the backend into memory
+
+        Args:
+            key: Cache key
+            fresh_only (bool): Ignore expired entries
+
+        Returns:
+            Stored value, or _NOT_PERSISTED if missing (or expired with fresh_only)
+        """
+        persistence = self._persistence()
+        if persistence is None:
+            return _NOT_PERSISTED
+        backend, namespace = persistence
+        try:
+            stored = backend.load(namespace, key)
+        except Exception as e:
+            logger.warning('Could not read cache entry %s/%r: %s', namespace, key, e)
+            return _NOT_PERSISTED
+        if stored is None:
+            return _NOT_PERSISTED
+
+        value, expires_at = stored
+        remaining = expires_at - time.time()
+        if fresh_only and remaining <= 0:
+            return _NOT_PERSISTED
+        self._store(key, value, remaining)
+        return value
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, computing it at most once even under concurrent misses
+
+        The first caller to miss runs compute() (unless the backend of a persistent
+        cache still holds a fresh value); every other caller asking for the same
+        key meanwhile waits for that result instead of starting its own.
+
+        Args:
+            key: Cache key
+            compute (callable): Function producing the value on a miss
+
+        Returns:
+            Cached or freshly computed value
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                flight = self._in_flight.get(key)
+                is_leader = flight is None
+                if is_leader:
+                    flight = _InFlight()
+                    self._in_flight[key] = flight
+
+        if self.name is not None:
+            tracing.record_cache(self.name, entry is not None)
+        if entry is not None:
+            return entry[0]
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        return self._compute(key, compute, flight, reuse_persisted=True)
+
+    def refresh(self, key: Hashable, compute: Callable[[], Any]) -> bool:
+        """
+        Recompute a value ahead of its expiry
+
+        Readers keep getting the current value until the new one is stored; if
+        compute() raises, the current value is kept and the error propagates.
+
+        Args:
+            key: Cache key
+            compute (callable): Function producing the new value
+
+        Returns:
+            bool: False if a computation for this key was already running
+        """
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            flight = _InFlight()
+            self._in_flight[key] = flight
+
+        self._compute(key, compute, flight)
+        return True
+
+    def _compute(self, key: Hashable, compute: Callable[[], Any], flight: _InFlight,
+                 reuse_persisted: bool = False) -> Any:
+        """Run compute() as the leader of a flight, store and hand the result to waiters"""
+        try:
+            persisted = self._load_persisted(key, fresh_only=True) if reuse_persisted else _NOT_PERSISTED
+            if persisted is not _NOT_PERSISTED:
+                flight.value = persisted
+            else:
+                flight.value = compute()
+                self.put(key, flight.value)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.done.set()
+
+        return flight.value
+
+    def expires_in(self, key: Hashable) -> Optional[float]:
+        """
+        Get the remaining lifetime of an entry
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Seconds until the entry expires (negative once expired), or None if it is missing
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[1] - time.monotonic()
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """
+        Get the time since an entry was stored (computed, refreshed or put)
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Seconds since the entry was stored, or None if it is missing
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else time.monotonic() - entry[3]
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Drop one entry, or every entry when no key is given (in the backend too)
+
+        Args:
+            key: Cache key to drop (None clears the cache)
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.bytes = 0
+            else:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self.bytes -= entry[2]
+
+        persistence = self._persistence()
+        if persistence is not None:
+            backend, namespace = persistence
+            try:
+                backend.delete(namespace, key)
+            except Exception as e:
+                logger.warning('Could not delete cache entry %s/%r: %s', namespace, key, e)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the counters and resident size of the cache
+
+        Returns:
+            Dictionary with name, entries, bytes, limits, hits, misses, hit rate and evictions
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'evictions': self.evictions
+            }
+
+    def resident(self) -> List[Dict[str, Any]]:
+        """
+        Describe the resident entries, most recently used first
+
+        Returns:
+            List of dictionaries with key, bytes and seconds until expiry (negative once expired)
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'key': key,
+                    'bytes': size,
+                    'expires_in': expires_at - now
+                }
+                for key, (_, expires_at, size, _) in reversed(self._entries.items())
+            ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -1,14 +1,110 @@
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
+import numpy as np
 import pandas as pd
-import streamlit as st
+from typing import Callable, Hashable, Optional, Union
+
+from utils import tracing
+from utils.cache import TTLCache, budget_from_env
+from utils.downsampling import DEFAULT_MAX_POINTS, downsample_line, resample_ohlc
+from utils.financial_metrics import FinancialMetrics
+
+# Ratios of the financial metrics chart: metrics table column -> axis label
+RATIO_CHART_COLUMNS = {
+    'pe_ratio': 'P/E Ratio',
+    'forward_pe': 'Forward P/E',
+    'peg_ratio': 'PEG Ratio',
+    'price_to_book': 'Price to Book',
+    'beta': 'Beta',
+    'return_on_equity': 'ROE (%)',
+    'return_on_assets': 'ROA (%)',
+}
+RATIO_CHART_PERCENT_COLUMNS = ['return_on_equity', 'return_on_assets']
+
+# Lines that can be drawn over the price: overlay name -> [(column, legend label, line style)]
+PRICE_OVERLAYS = {
+    'MA 20': [('MA_20', 'MA 20', dict(color='#ff9500', dash='dot'))],  # Naranja
+    'MA 50': [('MA_50', 'MA 50', dict(color='#9c27b0', dash='dot'))],  # Morado
+    'MA 200': [('MA_200', 'MA 200', dict(color='#00bcd4', dash='dot'))],  # Cian
+    'EMA 12': [('EMA_12', 'EMA 12', dict(color='#ffeb3b'))],
+    'EMA 26': [('EMA_26', 'EMA 26', dict(color='#e91e63'))],
+    'Bollinger Bands': [
+        ('BB_Upper', 'BB Upper', dict(color='#8d99ae', dash='dash')),
+        ('BB_Middle', 'BB Middle', dict(color='#8d99ae', dash='dot')),
+        ('BB_Lower', 'BB Lower', dict(color='#8d99ae', dash='dash'))
+    ]
+}
+
+DEFAULT_OVERLAYS = ['MA 20', 'MA 50', 'MA 200']
+
+# Line traces longer than this are drawn with WebGL (Scattergl) instead of SVG; reached when
+# decimation is off (max_points=None, the dashboard's "Full resolution" toggle) or keeps more points
+WEBGL_THRESHOLD = 5000
+
+# Built figures keyed by (symbol, chart, options), stored with the stamp of the data they show
+FIGURE_CACHE_ENTRIES = 256
+FIGURE_CACHE_MB = 128
+_figure_cache = TTLCache(
+    ttl=3600,
+    name='figure',
+    max_entries=FIGURE_CACHE_ENTRIES,
+    max_bytes=budget_from_env('figure', FIGURE_CACHE_MB)
+)
 
 class ChartGenerator:
     """Class to generate interactive charts for stock data"""
     
     @staticmethod
-    def create_price_chart(df: pd.DataFrame, symbol: str, chart_type: str = "line") -> go.Figure:
+    def data_stamp(df: Optional[pd.DataFrame]) -> Optional[tuple]:
+        """
+        Identify the data a figure is built from by its length, first and last bars
+        
+        The first close changes when a split or dividend re-adjusts the stored
+        history, even though the length and last bar stay the same.
+        
+        Args:
+            df (pd.DataFrame): Historical stock data
+            
+        Returns:
+            Tuple of (rows, first date, first close, last date, last close), or None without data
+        """
+        if df is None or df.empty:
+            return None
+        close = df['Close']
+        return len(df), df['Date'].iloc[0], float(close.iloc[0]), df['Date'].iloc[-1], float(close.iloc[-1])
+    
+    @staticmethod
+    def get_figure(key: Hashable, stamp: Hashable, build: Callable[[], go.Figure]) -> go.Figure:
+        """
+        Get a cached figure, building it only when the data it shows has changed
+        
+        Reruns that don't touch the data (e.g. unrelated widget clicks) reuse the
+        figure instead of recomputing its traces.
+        
+        Args:
+            key: Figure identity, e.g. (symbol, chart name, period, chart type, overlays)
+            stamp: Identity of the data shown, e.g. data_stamp() of the history
+            build (callable): Function building the figure on a miss
+            
+        Returns:
+            Plotly figure object (shared, must not be modified)
+        """
+        cached = _figure_cache.get(key)
+        hit = cached is not None and cached[0] == stamp
+        tracing.record_cache('figure', hit)
+        if hit:
+            return cached[1]
+        
+        fig = build()
+        _figure_cache.put(key, (stamp, fig))
+        return fig
+    
+    @staticmethod
+    @tracing.timed('chart.price')
+    def create_price_chart(df: pd.DataFrame, symbol: str, chart_type: str = "line",
+                           overlays: Optional[list] = None,
+                           max_points: Optional[int] = DEFAULT_MAX_POINTS) -> go.Figure:
         """
         Create price chart (line or candlestick)
         
@@ -16,6 +112,8 @@ class ChartGenerator:
             df (pd.DataFrame): Historical stock data
             symbol (str): Stock symbol
             chart_type (str): 'line' or 'candlestick'
+            overlays (list): Names from PRICE_OVERLAYS to draw (default: moving averages 20/50/200)
+            max_points (int): Points per trace sent to the browser (None disables decimation)
             
         Returns:
             Plotly figure object
@@ -23,6 +121,23 @@ class ChartGenerator:
         if df is None or df.empty:
             return go.Figure()
         
+        # Decimate before building the figure: candles are aggregated into coarser
+        # buckets, lines keep their shape through LTTB downsampling
+        if chart_type == "candlestick" and max_points:
+            df = resample_ohlc(df, max_points)
+        
+        def line_points(column: str) -> tuple:
+            if chart_type == "candlestick" or not max_points:
+                return df['Date'], df[column]
+            return downsample_line(df['Date'], df[column], max_points)
+        
+        # One renderer for every line of the figure, so the moving averages stay layered over the price
+        webgl = (not max_points or max_points > WEBGL_THRESHOLD) and len(df) > WEBGL_THRESHOLD
+        
+        def line_trace(x, y, **kwargs):
+            trace = go.Scattergl if webgl else go.Scatter
+            return trace(x=x, y=y, mode='lines', **kwargs)
+        
         if chart_type == "candlestick":
             fig = go.Figure(data=go.Candlestick(
                 x=df['Date'],
@@ -35,30 +150,28 @@ class ChartGenerator:
                 decreasing=dict(line=dict(color='#ff4444'))
             ))
         else:
+            x, y = line_points('Close')
             fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=df['Date'],
-                y=df['Close'],
-                mode='lines',
+            fig.add_trace(line_trace(
+                x, y,
                 name=f'{symbol} Price',
                 line=dict(color='#2962ff', width=2)  # Azul para línea
             ))
         
-        # Add moving averages with distinct colors
-        ma_colors = ['#ff9500', '#9c27b0', '#00bcd4']  # Naranja, Morado, Cian
-        ma_periods = [20, 50, 200]
-        
-        for i, period in enumerate(ma_periods):
-            ma_col = f'MA_{period}'
-            if ma_col in df.columns:
-                fig.add_trace(go.Scatter(
-                    x=df['Date'],
-                    y=df[ma_col],
-                    mode='lines',
-                    name=f'MA {period}',
-                    line=dict(color=ma_colors[i % len(ma_colors)], width=1.5, dash='dot'),
-                    opacity=0.8
-                ))
+        # Add moving averages and indicator overlays with distinct colors
+        if overlays is None:
+            overlays = DEFAULT_OVERLAYS
+        
+        for overlay in overlays:
+            for column, label, style in PRICE_OVERLAYS.get(overlay, []):
+                if column in df.columns:
+                    x, y = line_points(column)
+                    fig.add_trace(line_trace(
+                        x, y,
+                        name=label,
+                        line=dict(width=1.5, **style),
+                        opacity=0.8
+                    ))
         
         fig.update_layout(
             title=f'{symbol} Stock Price Chart',
@@ -80,13 +193,16 @@ class ChartGenerator:
         return fig
     
     @staticmethod
-    def create_volume_chart(df: pd.DataFrame, symbol: str) -> go.Figure:
+    @tracing.timed('chart.volume')
+    def create_volume_chart(df: pd.DataFrame, symbol: str,
+                            max_points: Optional[int] = DEFAULT_MAX_POINTS) -> go.Figure:
         """
         Create volume chart with price movement indicators
         
         Args:
             df (pd.DataFrame): Historical stock data
             symbol (str): Stock symbol
+            max_points (int): Bars sent to the browser; longer histories are summed into coarser buckets
             
         Returns:
             Plotly figure object
@@ -94,18 +210,22 @@ class ChartGenerator:
         if df is None or df.empty:
             return go.Figure()
         
-        # Calculate price movement
-        df['Price_Change'] = df['Close'] - df['Open']
-        df['Color'] = df['Price_Change'].apply(lambda x: '#00cc44' if x >= 0 else '#ff4444')
+        if max_points:
+            df = resample_ohlc(df[['Date', 'Open', 'Close', 'Volume']], max_points)
+        
+        # Price movement colors, computed without touching the caller's frame
+        colors = np.where(
+            df['Close'].to_numpy() - df['Open'].to_numpy() >= 0, '#00cc44', '#ff4444'
+        )
         
         fig = go.Figure()
         
         # Add volume bars
         fig.add_trace(go.Bar(
             x=df['Date'],
-            y=df['Volume'],
+            y=df['Volume'].to_numpy(),
             name='Volume',
-            marker_color=df['Color'],
+            marker_color=colors,
             opacity=0.7
         ))
         
@@ -121,52 +241,44 @@ class ChartGenerator:
         return fig
     
     @staticmethod
-    def create_financial_metrics_chart(metrics: dict) -> go.Figure:
+    @tracing.timed('chart.ratios')
+    def create_financial_metrics_chart(metrics: Union[FinancialMetrics, pd.DataFrame]) -> go.Figure:
         """
         Create a chart for key financial ratios
         
         Args:
-            metrics (dict): Financial metrics dictionary
+            metrics: FinancialMetrics of one symbol, or a metrics table of several
+                symbols (see FinancialMetrics.stack) drawn as grouped bars
             
         Returns:
             Plotly figure object
         """
-        # Extract numeric ratios for visualization
-        ratio_metrics = {
-            'P/E Ratio': metrics.get('P/E Ratio'),
-            'Forward P/E': metrics.get('Forward P/E'),
-            'PEG Ratio': metrics.get('PEG Ratio'),
-            'Price to Book': metrics.get('Price to Book'),
-            'Beta': metrics.get('Beta'),
-            'ROE (%)': metrics.get('Return on Equity'),
-            'ROA (%)': metrics.get('Return on Assets')
-        }
-        
-        # Filter out non-numeric values
-        valid_ratios = {}
-        for key, value in ratio_metrics.items():
-            if value != 'N/A' and value is not None:
-                try:
-                    if key in ['ROE (%)', 'ROA (%)'] and value:
-                        # Convert to percentage if it's a decimal
-                        numeric_value = float(value)
-                        if numeric_value < 1:
-                            numeric_value *= 100
-                        valid_ratios[key] = numeric_value
-                    else:
-                        valid_ratios[key] = float(value)
-                except (ValueError, TypeError):
-                    continue
-        
-        if not valid_ratios:
+        table = FinancialMetrics.stack([metrics]) if isinstance(metrics, FinancialMetrics) else metrics
+        
+        labels = list(RATIO_CHART_COLUMNS.values())
+        values = table[list(RATIO_CHART_COLUMNS)].to_numpy(dtype=np.float64)
+        
+        # Convert returns to percentage when they are decimals
+        percent = np.isin(list(RATIO_CHART_COLUMNS), RATIO_CHART_PERCENT_COLUMNS)
+        values = np.where(percent & (values < 1), values * 100, values)
+        
+        # Only the ratios known for at least one symbol are drawn
+        valid = np.isfinite(values)
+        shown = valid.any(axis=0)
+        if not shown.any():
             return go.Figure()
         
-        fig = go.Figure(data=go.Bar(
-            x=list(valid_ratios.keys()),
-            y=list(valid_ratios.values()),
-            marker_color='#00ff88',
-            opacity=0.8
-        ))
+        x = [label for label, keep in zip(labels, shown) if keep]
+        single = len(table) == 1
+        fig = go.Figure()
+        for symbol, row, row_valid in zip(table.index, values[:, shown], valid[:, shown]):
+            fig.add_trace(go.Bar(
+                x=[label for label, keep in zip(x, row_valid) if keep] if single else x,
+                y=row[row_valid] if single else row,
+                name=str(symbol),
+                marker_color='#00ff88' if single else None,
+                opacity=0.8
+            ))
         
         fig.update_layout(
             title='Key Financial Ratios',
@@ -174,7 +286,54 @@ class ChartGenerator:
             yaxis_title='Value',
             template='plotly_dark',
             height=400,
-            xaxis={'tickangle': -45}
+            xaxis={'tickangle': -45},
+            barmode='group',
+            showlegend=not single
+        )
+        
+        return fig
+    
+    @staticmethod
+    @tracing.timed('chart.technical_gauge')
+    def create_technical_gauge(score: float) -> go.Figure:
+        """
+        Create the technical analysis gauge
+        
+        Args:
+            score (float): Technical score between 0 and 100 (see TechnicalIndicators.calculate_score)
+            
+        Returns:
+            Plotly figure object
+        """
+        fig = go.Figure(go.Indicator(
+            mode = "gauge+number+delta",
+            value = score,
+            domain = {'x': [0, 1], 'y': [0, 1]},
+            title = {'text': "Análisis Técnico"},
+            delta = {'reference': 50},
+            gauge = {
+                'axis': {'range': [None, 100]},
+                'bar': {'color': "#262730"},
+                'steps': [
+                    {'range': [0, 30], 'color': "#ff4444"},    # Rojo
+                    {'range': [30, 70], 'color': "#ffaa00"},   # Amarillo
+                    {'range': [70, 100], 'color': "#00cc44"}  # Verde
+                ],
+                'threshold': {
+                    'line': {'color': "white", 'width': 4},
+                    'thickness': 0.75,
+                    'value': score
+                }
+            }
+        ))
+        
+        fig.update_layout(
+            height=200,
+            width=280,
+            template='plotly_dark',
+            font={'color': "white", 'family': "Arial", 'size': 12},
+            margin=dict(l=10, r=10, t=30, b=10),
+            showlegend=False
         )
         
         return fig
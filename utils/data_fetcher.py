@@ -1,43 +1,663 @@
-import yfinance as yf
+import dataclasses
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import pandas as pd
-import streamlit as st
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Mapping
 import numpy as np
 
+from utils.cache import TTLCache, budget_from_env
+from utils import providers, tracing
+from utils.financial_metrics import FinancialMetrics
+from utils.history_store import HistoryStore
+from utils.providers import MarketDataProvider
+from utils.refresh_ahead import RefreshAheadWorker
+from utils.rolling import MovingAverageState
+from utils.symbol_snapshot import Quote, SymbolSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Calendar length of the Yahoo Finance periods
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+# Period downloaded once per symbol, every shorter period is sliced from it
+BASE_HISTORY_PERIOD = 'max'
+
+# Periods measured in trading days rather than calendar time
+TRADING_DAY_PERIODS = {'1d': 1, '5d': 5}
+
+# Time to live of symbol snapshots (fundamentals); failed downloads are retried sooner
+SNAPSHOT_TTL = 6 * 3600
+SNAPSHOT_ERROR_TTL = 30
+
+# Time to live of quotes (price-only refreshes)
+QUOTE_TTL = 15
+QUOTE_ERROR_TTL = 5
+
+# Time to live of the in-memory full histories; failed loads are retried sooner
+HISTORY_TTL = 300
+HISTORY_ERROR_TTL = 30
+
+# Bounds of the in-memory caches; memory budgets can be overridden with STOCK_CACHE_<NAME>_MB
+SNAPSHOT_CACHE_ENTRIES = 1000
+QUOTE_CACHE_ENTRIES = 1000
+HISTORY_CACHE_ENTRIES = 200
+HISTORY_CACHE_MB = 256
+MA_CACHE_ENTRIES = 200
+MA_CACHE_MB = 64
+
+# Concurrent info downloads used by get_infos
+BATCH_INFO_WORKERS = 8
+
+# Threads shared by every session to load a symbol's snapshot, quote and history concurrently
+SYMBOL_FETCH_WORKERS = 8
+
+# Refresh-ahead of viewed symbols (disable with STOCK_REFRESH_AHEAD=0)
+REFRESH_AHEAD_LEAD = 30  # Seconds before expiry
+REFRESH_AHEAD_WORKERS = 2
+REFRESH_AHEAD_RATE = 1.0  # Refreshes per second across all symbols
+REFRESH_AHEAD_BURST = 5
+
+_history_store = None
+_ma_states = TTLCache(
+    ttl=3600,
+    name='moving_averages',
+    max_entries=MA_CACHE_ENTRIES,
+    max_bytes=budget_from_env('moving_averages', MA_CACHE_MB)
+)
+_snapshot_cache = TTLCache(
+    ttl=SNAPSHOT_TTL,
+    name='snapshot',
+    max_entries=SNAPSHOT_CACHE_ENTRIES,
+    ttl_for=lambda snapshot: SNAPSHOT_ERROR_TTL if snapshot.error or snapshot.stale else SNAPSHOT_TTL,
+    # Fundamentals are shared through the cache backend (STOCK_CACHE_BACKEND), one namespace per provider
+    persist_as=lambda: f'snapshot/{StockDataFetcher.get_provider().name}'
+)
+_quote_cache = TTLCache(
+    ttl=QUOTE_TTL,
+    name='quote',
+    max_entries=QUOTE_CACHE_ENTRIES,
+    ttl_for=lambda quote: QUOTE_ERROR_TTL if quote.error or quote.stale else QUOTE_TTL
+)
+_full_history_cache = TTLCache(
+    ttl=HISTORY_TTL,
+    name='full_history',
+    max_entries=HISTORY_CACHE_ENTRIES,
+    max_bytes=budget_from_env('full_history', HISTORY_CACHE_MB),
+    ttl_for=lambda df: HISTORY_ERROR_TTL if df is None else HISTORY_TTL
+)
+_history_errors: Dict[str, str] = {}  # symbol -> error of its last failed history sync
+_NOT_CACHED = object()  # get_full_histories marker of symbols missing from the cache
+_refresh_worker = None
+_symbol_fetch_pool = ThreadPoolExecutor(max_workers=SYMBOL_FETCH_WORKERS, thread_name_prefix='symbol-fetch')
+_refresh_worker_lock = threading.Lock()
+
+def _renumbered(df: pd.DataFrame) -> pd.DataFrame:
+    """New frame over the same bars with a 0..n-1 index (reset_index would copy them without Copy-on-Write)"""
+    shared = df.copy(deep=False)
+    shared.index = pd.RangeIndex(len(shared))
+    return shared
+
+def _completed(value: Any) -> Future:
+    """Future already resolved to value"""
+    future = Future()
+    future.set_result(value)
+    return future
+
 class StockDataFetcher:
-    """Class to handle stock data fetching from Yahoo Finance"""
+    """Class to handle stock data fetching from Yahoo Finance (or another market data provider)"""
     
     @staticmethod
-    @st.cache_data(ttl=300)  # Cache for 5 minutes
-    def get_stock_info(symbol: str) -> Optional[Dict[str, Any]]:
+    @tracing.timed('fetch.snapshot')
+    def get_symbol_snapshot(symbol: str) -> SymbolSnapshot:
         """
-        Fetch basic stock information
+        Fetch the immutable info/metrics/validity snapshot of a symbol
+        
+        The snapshot is downloaded at most once per TTL for the whole process:
+        concurrent requests for the same symbol wait for a single download, and
+        unknown symbols are cached too so typos don't hit the network on every rerun.
         
         Args:
             symbol (str): Stock symbol (e.g., 'AAPL')
             
         Returns:
-            Dict containing stock info or None if error
+            SymbolSnapshot for the symbol
+        """
+        key = symbol.strip().upper()
+        return _snapshot_cache.get_or_compute(key, lambda: StockDataFetcher._fetch_snapshot(key))
+    
+    @staticmethod
+    def _fetch_snapshot(symbol: str) -> SymbolSnapshot:
+        """
+        Download the info payload of a symbol and build its snapshot
+        
+        Args:
+            symbol (str): Stock symbol
+            
+        Returns:
+            SymbolSnapshot (invalid if the symbol is unknown or the download failed,
+            the last known good one marked stale if upstream is unavailable)
         """
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = StockDataFetcher.get_provider().get_info(symbol)
+        except Exception as e:
+            previous = _snapshot_cache.peek(symbol)
+            if previous is not None and previous.is_valid:
+                return dataclasses.replace(previous, stale=True)
+            return SymbolSnapshot.from_error(symbol, e)
+        
+        # Validate that we got valid data
+        if not info or 'symbol' not in info:
+            return SymbolSnapshot.from_info(symbol, None)
+        
+        return SymbolSnapshot.from_info(symbol, info, StockDataFetcher.extract_financial_metrics(symbol, info))
+    
+    @staticmethod
+    @tracing.timed('fetch.quote')
+    def get_quote(symbol: str) -> Quote:
+        """
+        Fetch the latest price of a symbol without downloading its fundamentals
+        
+        Quotes live for QUOTE_TTL seconds (fundamentals for hours), so the price
+        can be refreshed often; concurrent requests share one download.
+        
+        Args:
+            symbol (str): Stock symbol (e.g., 'AAPL')
             
-            # Validate that we got valid data
-            if not info or 'symbol' not in info:
-                return None
-                
-            return info
+        Returns:
+            Quote for the symbol (without price if unknown or the download failed)
+        """
+        key = symbol.strip().upper()
+        return _quote_cache.get_or_compute(key, lambda: StockDataFetcher._fetch_quote(key))
+    
+    @staticmethod
+    def _fetch_quote(symbol: str) -> Quote:
+        """
+        Download the quote of a symbol
+        
+        Args:
+            symbol (str): Stock symbol
+            
+        Returns:
+            Quote (the last known price marked stale, or carrying the error, if the download failed)
+        """
+        try:
+            return Quote.from_payload(symbol, StockDataFetcher.get_provider().get_quote(symbol))
         except Exception as e:
-            st.error(f"Error fetching stock info for {symbol}: {str(e)}")
+            previous = _quote_cache.peek(symbol)
+            if previous is not None and previous.price is not None:
+                return dataclasses.replace(previous, stale=True)
+            return Quote.from_error(symbol, e)
+    
+    @staticmethod
+    def fetch_symbol(symbol: str) -> Dict[str, Future]:
+        """
+        Start loading everything the dashboard shows for a symbol, concurrently
+        
+        The snapshot, the quote and the full history are independent requests, so
+        first-load latency is the slowest of them rather than their sum, and the
+        caller can render each part as soon as its future is done. A symbol whose
+        cached snapshot is invalid (a typo) only costs the cache lookup: its quote
+        and history are not requested again.
+        
+        Args:
+            symbol (str): Stock symbol
+            
+        Returns:
+            Dictionary with 'snapshot', 'quote' and 'history' futures
+        """
+        key = symbol.strip().upper()
+        snapshot = _snapshot_cache.get(key)
+        if snapshot is not None and not snapshot.is_valid:
+            return {
+                'snapshot': _completed(snapshot),
+                'quote': _completed(Quote(symbol=key, error=snapshot.error)),
+                'history': _completed(None)
+            }
+        
+        return {
+            'snapshot': tracing.submit(_symbol_fetch_pool, StockDataFetcher.get_symbol_snapshot, symbol),
+            'quote': tracing.submit(_symbol_fetch_pool, StockDataFetcher.get_quote, symbol),
+            'history': tracing.submit(_symbol_fetch_pool, StockDataFetcher.get_full_history, symbol)
+        }
+    
+    @staticmethod
+    def get_stock_info(symbol: str) -> Optional[Mapping[str, Any]]:
+        """
+        Fetch basic stock information
+        
+        Args:
+            symbol (str): Stock symbol (e.g., 'AAPL')
+            
+        Returns:
+            Read-only mapping containing stock info or None if error
+        """
+        snapshot = StockDataFetcher.get_symbol_snapshot(symbol)
+        
+        if snapshot.error:
+            logger.warning("Error fetching stock info for %s: %s", symbol, snapshot.error)
+            return None
+        
+        return snapshot.info if snapshot.is_valid else None
+    
+    @staticmethod
+    def refresh_symbol(symbol: str, max_age: Optional[float] = None) -> None:
+        """
+        Drop the cached quote and full history of a symbol so the next access fetches fresh data
+        
+        Fundamentals (the snapshot) are kept until their own TTL expires, and the
+        history is re-synced incrementally: only bars newer than the stored ones
+        are downloaded. The caches are shared by every session, so with max_age
+        only entries at least that old are dropped: sessions watching the same
+        symbol (or the refresh-ahead worker) that just refreshed it don't cause
+        another download.
+        
+        Args:
+            symbol (str): Stock symbol
+            max_age (float): Minimum age in seconds of the entries to drop (None drops them unconditionally)
+        """
+        key = symbol.strip().upper()
+        for cache in (_quote_cache, _full_history_cache):
+            age = cache.age(key)
+            if max_age is None or (age is not None and age >= max_age):
+                cache.invalidate(key)
+    
+    @staticmethod
+    def _refresh_snapshot(symbol: str) -> SymbolSnapshot:
+        """
+        Download a replacement snapshot for refresh-ahead
+        
+        Raises instead of returning an error snapshot, so a failed refresh keeps
+        serving the current (slightly stale) snapshot until it expires.
+        """
+        snapshot = StockDataFetcher._fetch_snapshot(symbol)
+        if snapshot.error:
+            raise RuntimeError(snapshot.error)
+        if snapshot.stale:
+            raise RuntimeError(f"Market data source unavailable, snapshot of {symbol} not refreshed")
+        return snapshot
+    
+    @staticmethod
+    def get_refresh_worker() -> Optional[RefreshAheadWorker]:
+        """
+        Get the process-wide refresh-ahead worker, starting it on first use
+        
+        The worker refreshes the snapshot and full history of the most viewed
+        symbols shortly before they expire, so readers never wait on a download.
+        
+        Returns:
+            Running RefreshAheadWorker, or None if disabled with STOCK_REFRESH_AHEAD=0
+        """
+        global _refresh_worker
+        if os.environ.get('STOCK_REFRESH_AHEAD', '1') == '0':
+            return None
+        
+        with _refresh_worker_lock:
+            if _refresh_worker is None:
+                _refresh_worker = RefreshAheadWorker(
+                    {
+                        'snapshot': (_snapshot_cache, StockDataFetcher._refresh_snapshot),
+                        'history': (
+                            _full_history_cache,
+                            lambda symbol: StockDataFetcher.sync_history(symbol, BASE_HISTORY_PERIOD)
+                        )
+                    },
+                    lead=REFRESH_AHEAD_LEAD,
+                    max_workers=REFRESH_AHEAD_WORKERS,
+                    rate=REFRESH_AHEAD_RATE,
+                    burst=REFRESH_AHEAD_BURST
+                )
+                _refresh_worker.start()
+            return _refresh_worker
+    
+    @staticmethod
+    def track_symbol(symbol: str) -> None:
+        """
+        Record that a symbol is being viewed, making it a refresh-ahead candidate
+        
+        Args:
+            symbol (str): Stock symbol
+        """
+        worker = StockDataFetcher.get_refresh_worker()
+        if worker is not None:
+            worker.record(symbol.strip().upper())
+    
+    @staticmethod
+    def get_provider() -> MarketDataProvider:
+        """
+        Get the market data provider used by every fetch
+        
+        Returns:
+            Active MarketDataProvider (selected with STOCK_DATA_PROVIDER, yfinance by default)
+        """
+        return providers.get_provider()
+    
+    @staticmethod
+    def set_provider(provider: MarketDataProvider) -> None:
+        """
+        Switch the market data provider and drop everything cached from the previous one
+        
+        Args:
+            provider (MarketDataProvider): Provider to use from now on
+        """
+        global _history_store
+        providers.set_provider(provider)
+        _history_store = None
+        _snapshot_cache.invalidate()
+        _quote_cache.invalidate()
+        _full_history_cache.invalidate()
+    
+    @staticmethod
+    def get_provider_stats() -> Optional[Dict[str, Any]]:
+        """
+        Get the rate limiting, retry and circuit breaker counters of the current provider
+        
+        Returns:
+            Dictionary of counters, or None if the provider calls upstream directly
+        """
+        provider = StockDataFetcher.get_provider()
+        return provider.stats() if isinstance(provider, providers.ResilientProvider) else None
+    
+    @staticmethod
+    def get_history_store() -> HistoryStore:
+        """
+        Get the process-wide on-disk history store of the active provider
+        
+        Returns:
+            Shared HistoryStore instance
+        """
+        global _history_store
+        if _history_store is None:
+            _history_store = HistoryStore(namespace=StockDataFetcher.get_provider().name)
+        return _history_store
+    
+    @staticmethod
+    def get_period_start(period: str, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+        """
+        Get the first calendar date covered by a Yahoo Finance period
+        
+        Args:
+            period (str): Time period ('1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max')
+            now (pd.Timestamp): Reference timestamp (in the exchange timezone)
+            
+        Returns:
+            Start timestamp, or None for 'max' and trading-day periods ('1d', '5d')
+        """
+        if period == 'ytd':
+            return now.normalize().replace(month=1, day=1)
+        if period in PERIOD_OFFSETS:
+            return now.normalize() - PERIOD_OFFSETS[period]
+        return None
+    
+    @staticmethod
+    def slice_period(df: pd.DataFrame, period: str) -> pd.DataFrame:
+        """
+        Cut a stored history down to the bars Yahoo Finance would return for a period
+        
+        Args:
+            df (pd.DataFrame): History with a 'Date' column, sorted by date
+            period (str): Time period
+            
+        Returns:
+            New DataFrame sharing the bars of the requested period with the input (treat it as read-only)
+        """
+        if period in TRADING_DAY_PERIODS:
+            return _renumbered(df.iloc[-TRADING_DAY_PERIODS[period]:])
+        
+        # Anchor on the last bar so stored or replayed histories slice the same way as live ones
+        start = StockDataFetcher.get_period_start(period, df['Date'].iloc[-1]) if len(df) else None
+        first_row = 0 if start is None else df['Date'].searchsorted(start)
+        return _renumbered(df.iloc[first_row:])
+    
+    @staticmethod
+    def _is_covered(stored: pd.DataFrame, covered_from: Optional[pd.Timestamp], period: str) -> bool:
+        """
+        Check whether stored bars already reach back far enough for a period
+        
+        Args:
+            stored (pd.DataFrame): Stored history
+            covered_from (pd.Timestamp): Earliest date the store is complete from (None means full history)
+            period (str): Requested time period
+            
+        Returns:
+            bool: True if only bars after the last stored one need to be downloaded
+        """
+        if covered_from is None:
+            return True
+        if period == 'max':
+            return False
+        if period in TRADING_DAY_PERIODS:
+            return len(stored) >= TRADING_DAY_PERIODS[period]
+        
+        start = StockDataFetcher.get_period_start(period, pd.Timestamp.now(tz=covered_from.tz))
+        return covered_from <= start
+    
+    @staticmethod
+    def _coverage_after_download(stored: Optional[pd.DataFrame], covered_from: Optional[pd.Timestamp],
+                                 fresh_index: pd.DatetimeIndex, period: str) -> Optional[pd.Timestamp]:
+        """
+        Work out how far back the store is complete after a full-period download
+        
+        Args:
+            stored (pd.DataFrame): Bars stored before the download
+            covered_from (pd.Timestamp): Coverage of the stored bars
+            fresh_index (pd.DatetimeIndex): Dates of the downloaded bars
+            period (str): Period that was downloaded
+            
+        Returns:
+            New coverage start (None for full history)
+        """
+        if stored is not None and covered_from is None:
+            return None
+        if period == 'max':
             return None
+        
+        # Yahoo returned everything from the period start, even if the first bar is later
+        period_start = StockDataFetcher.get_period_start(period, pd.Timestamp.now(tz=fresh_index.tz))
+        fresh_start = fresh_index[0] if period_start is None else min(period_start, fresh_index[0])
+        
+        if stored is None:
+            return fresh_start
+        return min(covered_from, fresh_start)
+    
+    @staticmethod
+    def _incremental_start(stored: pd.DataFrame) -> str:
+        """
+        Get the start date of an incremental download
+        
+        The last stored bar may have been captured mid-session, so it is downloaded
+        again together with the settled bar before it, which _needs_readjustment
+        compares against the stored copy.
+        
+        Args:
+            stored (pd.DataFrame): Stored history
+            
+        Returns:
+            Start date as 'YYYY-MM-DD'
+        """
+        return stored['Date'].iloc[max(len(stored) - 2, 0)].strftime('%Y-%m-%d')
+    
+    @staticmethod
+    def _needs_readjustment(stored: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+        """
+        Check whether an incremental download invalidates the stored bars
+        
+        Yahoo Finance adjusts the whole history for splits and dividends, so after
+        one the stored bars are on an outdated basis and must be downloaded again.
+        
+        Args:
+            stored (pd.DataFrame): Stored history
+            fresh (pd.DataFrame): Bars downloaded from _incremental_start, indexed by date
+            
+        Returns:
+            bool: True if a split or dividend falls in the new bars, or the settled
+            overlap bar no longer matches the stored one
+        """
+        if fresh.empty:
+            return False
+        
+        last_date = stored['Date'].iloc[-1]
+        fresh_dates = fresh.index
+        if fresh_dates.tz is not None and last_date.tzinfo is not None:
+            fresh_dates = fresh_dates.tz_convert(last_date.tzinfo)
+        
+        # The last stored bar is included: its split or dividend may not have been known when it was stored
+        new_bars = np.asarray(fresh_dates >= last_date)
+        for column in ('Stock Splits', 'Dividends'):
+            if column in fresh.columns:
+                events = fresh[column].to_numpy(dtype='float64')[new_bars]
+                recorded = stored[column].iloc[-1] if column in stored.columns else 0.0
+                if np.any((events != 0) & ~np.isnan(events) & (events != recorded)):
+                    return True
+        
+        if len(stored) < 2:
+            return False
+        settled_date = stored['Date'].iloc[-2]
+        overlap = np.flatnonzero(np.asarray(fresh_dates == settled_date))
+        if len(overlap) == 0:
+            return False
+        fresh_close = float(fresh['Close'].iloc[overlap[0]])
+        return not np.isclose(fresh_close, float(stored['Close'].iloc[-2]), rtol=1e-6, atol=0.0)
+    
+    @staticmethod
+    def _store_bars(symbol: str, stored: Optional[pd.DataFrame], covered_from: Optional[pd.Timestamp],
+                    fresh: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Merge downloaded bars into the stored ones and persist the result
+        
+        Args:
+            symbol (str): Stock symbol
+            stored (pd.DataFrame): Bars already on disk
+            covered_from (pd.Timestamp): Coverage of the merged bars
+            fresh (pd.DataFrame): Downloaded bars indexed by date
+            
+        Returns:
+            Every stored bar after the merge, or None if there are none
+        """
+        if not fresh.empty:
+            # Reset index to make Date a column
+            fresh = fresh.reset_index()
+            fresh = fresh.rename(columns={fresh.columns[0]: 'Date'})
+            stored_tz = getattr(stored['Date'].dtype, 'tz', None) if stored is not None else None
+            if stored_tz is not None and getattr(fresh['Date'].dtype, 'tz', None) is not None:
+                fresh['Date'] = fresh['Date'].dt.tz_convert(stored_tz)
+        
+        hist = HistoryStore.merge(stored, fresh)
+        if hist is None:
+            return None
+        
+        if not fresh.empty:
+            try:
+                StockDataFetcher.get_history_store().save(symbol, hist, covered_from)
+            except OSError:
+                # The store is an optimization, a read-only disk must not break the page
+                pass
+        
+        return hist
+    
+    @staticmethod
+    @tracing.timed('fetch.sync_history')
+    def sync_history(symbol: str, period: str = BASE_HISTORY_PERIOD) -> Optional[pd.DataFrame]:
+        """
+        Bring the on-disk history of a symbol up to date and return every stored bar
+        
+        Only the bars after the last stored timestamp are downloaded when the
+        requested period is already covered by the store.
+        
+        Args:
+            symbol (str): Stock symbol
+            period (str): Time period the store must cover ('1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max')
+            
+        Returns:
+            DataFrame with every stored bar or None if error
+        """
+        store = StockDataFetcher.get_history_store()
+        
+        with store.lock_for(symbol):
+            stored, covered_from = store.load(symbol)
+            
+            try:
+                provider = StockDataFetcher.get_provider()
+                
+                if stored is not None and StockDataFetcher._is_covered(stored, covered_from, period):
+                    fresh = provider.get_history(symbol, start=StockDataFetcher._incremental_start(stored))
+                    if StockDataFetcher._needs_readjustment(stored, fresh):
+                        # Every stored price is on the pre-split/dividend basis, replace them all
+                        full_period = BASE_HISTORY_PERIOD if covered_from is None else period
+                        fresh = provider.get_history(symbol, period=full_period)
+                        if not fresh.empty:
+                            stored = None
+                            covered_from = StockDataFetcher._coverage_after_download(None, None, fresh.index, full_period)
+                else:
+                    fresh = provider.get_history(symbol, period=period)
+                    if not fresh.empty:
+                        covered_from = StockDataFetcher._coverage_after_download(stored, covered_from, fresh.index, period)
+            except Exception as e:
+                if stored is None:
+                    logger.warning("Error fetching historical data for %s: %s", symbol, e)
+                    _history_errors[symbol.upper()] = str(e)
+                    return None
+                # Upstream is unavailable, serve the bars we already have
+                return stored
+            
+            _history_errors.pop(symbol.upper(), None)
+            return StockDataFetcher._store_bars(symbol, stored, covered_from, fresh)
     
     @staticmethod
-    @st.cache_data(ttl=300)
+    @tracing.timed('fetch.full_history')
+    def get_full_history(symbol: str) -> Optional[pd.DataFrame]:
+        """
+        Load the longest available history of a symbol once per cache period
+        
+        The returned frame is shared by every session and must not be modified.
+        Concurrent misses for the same symbol share one sync.
+        
+        Args:
+            symbol (str): Stock symbol
+            
+        Returns:
+            DataFrame with the full history or None if error
+        """
+        key = symbol.strip().upper()
+        return _full_history_cache.get_or_compute(
+            key, lambda: StockDataFetcher.sync_history(key, BASE_HISTORY_PERIOD)
+        )
+    
+    @staticmethod
+    def get_history_error(symbol: str) -> Optional[str]:
+        """
+        Get why the history of a symbol could not be loaded
+        
+        The data layer doesn't display errors itself; pages show this message
+        when get_stock_history returns None.
+        
+        Args:
+            symbol (str): Stock symbol
+            
+        Returns:
+            Error of the last failed history download, or None if the last one succeeded
+        """
+        return _history_errors.get(symbol.strip().upper())
+    
+    @staticmethod
+    @tracing.timed('fetch.history')
     def get_stock_history(symbol: str, period: str = "1y") -> Optional[pd.DataFrame]:
         """
         Fetch historical stock data
         
+        Every period is answered by slicing the cached full history, so switching
+        periods never triggers a new download.
+        
         Args:
             symbol (str): Stock symbol
             period (str): Time period ('1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max')
@@ -45,86 +665,211 @@ class StockDataFetcher:
         Returns:
             DataFrame with historical data or None if error
         """
-        try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period)
-            
-            if hist.empty:
-                return None
-                
-            # Reset index to make Date a column
-            hist.reset_index(inplace=True)
+        hist = StockDataFetcher.get_full_history(symbol)
+        if hist is None:
+            return None
+        
+        return StockDataFetcher.slice_period(hist, period)
+    
+    @staticmethod
+    def sync_histories(symbols: list) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Bring the on-disk histories of several symbols up to date (see sync_history)
+        
+        Symbols missing from the history store are downloaded in one multi-ticker
+        request; stored symbols share a second request for their newest bars only.
+        
+        Args:
+            symbols (list): Stock symbols
             
-            return hist
+        Returns:
+            Dictionary of symbol -> every stored bar (None when the symbol has no history)
+        """
+        symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol))
+        store = StockDataFetcher.get_history_store()
+        
+        stored = {symbol: store.load(symbol) for symbol in symbols}
+        cold = [symbol for symbol in symbols if stored[symbol][0] is None or stored[symbol][1] is not None]
+        warm = [symbol for symbol in symbols if symbol not in cold]
+        
+        downloads = {}
+        readjusted = []
+        error = None
+        try:
+            if cold:
+                downloads.update(StockDataFetcher.get_provider().download(cold, period=BASE_HISTORY_PERIOD))
+            if warm:
+                start = min(StockDataFetcher._incremental_start(stored[symbol][0]) for symbol in warm)
+                downloads.update(StockDataFetcher.get_provider().download(warm, start=start))
+                # Symbols re-adjusted after a split or dividend are downloaded again in full
+                readjusted = [
+                    symbol for symbol in warm
+                    if symbol in downloads and StockDataFetcher._needs_readjustment(stored[symbol][0], downloads[symbol])
+                ]
+                if readjusted:
+                    downloads.update(StockDataFetcher.get_provider().download(readjusted, period=BASE_HISTORY_PERIOD))
+                    cold.extend(readjusted)
         except Exception as e:
-            st.error(f"Error fetching historical data for {symbol}: {str(e)}")
-            return None
+            logger.warning("Error fetching historical data for %s: %s", ', '.join(symbols), e)
+            error = str(e)
+        
+        histories = {}
+        for symbol in symbols:
+            with store.lock_for(symbol):
+                # Reload under the lock, another session may have synced the symbol meanwhile
+                bars, covered_from = store.load(symbol)
+                fresh = downloads.get(symbol)
+                if fresh is not None:
+                    if symbol in readjusted and not fresh.empty:
+                        bars, covered_from = None, None
+                    if symbol in cold:
+                        covered_from = StockDataFetcher._coverage_after_download(bars, covered_from, fresh.index, BASE_HISTORY_PERIOD)
+                    bars = StockDataFetcher._store_bars(symbol, bars, covered_from, fresh)
+            
+            if error is None:
+                _history_errors.pop(symbol, None)
+            elif bars is None:
+                _history_errors[symbol] = error
+            histories[symbol] = bars
+        
+        return histories
     
     @staticmethod
-    @st.cache_data(ttl=300)
-    def get_financial_metrics(symbol: str) -> Dict[str, Any]:
+    @tracing.timed('fetch.full_histories')
+    def get_full_histories(symbols: list) -> Dict[str, Optional[pd.DataFrame]]:
         """
-        Extract key financial metrics from stock info
+        Load the full histories of several symbols, like get_full_history for each
+        
+        Cached histories are served as they are; the others are synced together
+        (see sync_histories) and cached for the next readers. The returned frames
+        are shared by every session and must not be modified.
         
         Args:
-            symbol (str): Stock symbol
+            symbols (list): Stock symbols
             
         Returns:
-            Dictionary with formatted financial metrics
+            Dictionary of symbol -> full history (None if error)
         """
-        info = StockDataFetcher.get_stock_info(symbol)
+        symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol))
+        histories = {symbol: _full_history_cache.get(symbol, _NOT_CACHED) for symbol in symbols}
         
-        if not info:
-            return {}
+        missing = [symbol for symbol, history in histories.items() if history is _NOT_CACHED]
+        if missing:
+            for symbol, history in StockDataFetcher.sync_histories(missing).items():
+                _full_history_cache.put(symbol, history)
+                histories[symbol] = history
         
-        metrics = {}
+        return histories
+    
+    @staticmethod
+    def get_histories(symbols: list, period: str = "1y") -> pd.DataFrame:
+        """
+        Fetch historical data for several symbols at once
         
-        # Basic info
-        metrics['Company Name'] = info.get('longName', 'N/A')
-        metrics['Symbol'] = info.get('symbol', symbol.upper())
-        metrics['Sector'] = info.get('sector', 'N/A')
-        metrics['Industry'] = info.get('industry', 'N/A')
+        The full histories are loaded together (see get_full_histories) and
+        sliced to the period.
         
-        # Price data
-        metrics['Current Price'] = info.get('currentPrice', info.get('regularMarketPrice', 'N/A'))
-        metrics['Previous Close'] = info.get('previousClose', 'N/A')
-        metrics['Open'] = info.get('open', 'N/A')
-        metrics['Day High'] = info.get('dayHigh', 'N/A')
-        metrics['Day Low'] = info.get('dayLow', 'N/A')
+        Args:
+            symbols (list): Stock symbols
+            period (str): Time period ('1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max')
+            
+        Returns:
+            Long-format DataFrame with 'Date' and 'Symbol' columns followed by the OHLCV columns
+        """
+        frames = []
+        for symbol, history in StockDataFetcher.get_full_histories(symbols).items():
+            if history is None:
+                continue
+            
+            sliced = StockDataFetcher.slice_period(history, period)
+            sliced.insert(1, 'Symbol', symbol)
+            frames.append(sliced)
         
-        # Volume data
-        metrics['Volume'] = info.get('volume', 'N/A')
-        metrics['Average Volume'] = info.get('averageVolume', 'N/A')
+        if not frames:
+            return pd.DataFrame(columns=['Date', 'Symbol', 'Open', 'High', 'Low', 'Close', 'Volume'])
         
-        # Market data
-        metrics['Market Cap'] = info.get('marketCap', 'N/A')
-        metrics['Enterprise Value'] = info.get('enterpriseValue', 'N/A')
+        return pd.concat(frames, ignore_index=True)
+    
+    @staticmethod
+    def get_infos(symbols: list, max_workers: int = BATCH_INFO_WORKERS) -> Dict[str, Optional[Mapping[str, Any]]]:
+        """
+        Fetch basic stock information for several symbols concurrently
         
-        # Valuation ratios
-        metrics['P/E Ratio'] = info.get('trailingPE', 'N/A')
-        metrics['Forward P/E'] = info.get('forwardPE', 'N/A')
-        metrics['PEG Ratio'] = info.get('pegRatio', 'N/A')
-        metrics['Price to Book'] = info.get('priceToBook', 'N/A')
-        metrics['Price to Sales'] = info.get('priceToSalesTrailing12Months', 'N/A')
+        Yahoo Finance has no multi-ticker info endpoint, so the snapshots are
+        fetched on a bounded thread pool (and shared with get_symbol_snapshot).
         
-        # Financial health
-        metrics['Debt to Equity'] = info.get('debtToEquity', 'N/A')
-        metrics['Return on Equity'] = info.get('returnOnEquity', 'N/A')
-        metrics['Return on Assets'] = info.get('returnOnAssets', 'N/A')
+        Args:
+            symbols (list): Stock symbols
+            max_workers (int): Maximum number of concurrent downloads
+            
+        Returns:
+            Dictionary of symbol -> read-only info mapping (None for invalid symbols)
+        """
+        symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol))
+        if not symbols:
+            return {}
         
-        # Dividend data
-        metrics['Dividend Yield'] = info.get('dividendYield', 'N/A')
-        metrics['Dividend Rate'] = info.get('dividendRate', 'N/A')
-        metrics['Payout Ratio'] = info.get('payoutRatio', 'N/A')
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as executor:
+            snapshots = list(executor.map(StockDataFetcher.get_symbol_snapshot, symbols))
         
-        # Range data
-        metrics['52 Week High'] = info.get('fiftyTwoWeekHigh', 'N/A')
-        metrics['52 Week Low'] = info.get('fiftyTwoWeekLow', 'N/A')
+        return {
+            snapshot.symbol: snapshot.info if snapshot.is_valid else None
+            for snapshot in snapshots
+        }
+    
+    @staticmethod
+    @tracing.timed('fetch.metrics')
+    def get_financial_metrics(symbol: str) -> Optional[FinancialMetrics]:
+        """
+        Get key financial metrics of a symbol
         
-        # Beta
-        metrics['Beta'] = info.get('beta', 'N/A')
+        Args:
+            symbol (str): Stock symbol
+            
+        Returns:
+            FinancialMetrics of the symbol (None if unavailable)
+        """
+        return StockDataFetcher.get_symbol_snapshot(symbol).metrics
+    
+    @staticmethod
+    @tracing.timed('fetch.metrics_table')
+    def get_metrics_table(symbols: list, max_workers: int = BATCH_INFO_WORKERS) -> pd.DataFrame:
+        """
+        Get the key financial metrics of several symbols as one columnar table
+        
+        Args:
+            symbols (list): Stock symbols
+            max_workers (int): Maximum number of concurrent downloads
+            
+        Returns:
+            DataFrame indexed by symbol with one float64 column per metric (NaN when
+            missing) plus company name, sector and industry; invalid symbols are left out
+        """
+        symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol))
+        if not symbols:
+            return FinancialMetrics.stack([], text=True)
         
-        return metrics
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as executor:
+            snapshots = list(executor.map(StockDataFetcher.get_symbol_snapshot, symbols))
+        
+        return FinancialMetrics.stack(
+            (snapshot.metrics for snapshot in snapshots if snapshot.is_valid and snapshot.metrics is not None),
+            text=True
+        )
+    
+    @staticmethod
+    def extract_financial_metrics(symbol: str, info: Mapping[str, Any]) -> FinancialMetrics:
+        """
+        Extract key financial metrics from stock info
+        
+        Args:
+            symbol (str): Stock symbol
+            info (Mapping): Stock info payload
+            
+        Returns:
+            FinancialMetrics (NaN for missing numbers, None for missing text)
+        """
+        return FinancialMetrics.from_info(symbol, info)
     
     @staticmethod
     def validate_symbol(symbol: str) -> bool:
@@ -137,15 +882,9 @@ class StockDataFetcher:
         Returns:
             bool: True if valid, False otherwise
         """
-        try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            return bool(info and 'symbol' in info)
-        except:
-            return False
+        return StockDataFetcher.get_symbol_snapshot(symbol).is_valid
     
     @staticmethod
-    @st.cache_data(ttl=300)
     def calculate_moving_averages(df: pd.DataFrame, periods: list = [20, 50, 200]) -> pd.DataFrame:
         """
         Calculate moving averages for given periods
@@ -155,12 +894,57 @@ class StockDataFetcher:
             periods (list): List of periods for moving averages
             
         Returns:
-            DataFrame with moving averages added
+            Shallow copy of the DataFrame with moving averages added (the input is not modified)
         """
-        df_copy = df.copy()
+        df_copy = df.copy(deep=False)
         
         for period in periods:
             if len(df_copy) >= period:
                 df_copy[f'MA_{period}'] = df_copy['Close'].rolling(window=period).mean()
         
         return df_copy
+    
+    @staticmethod
+    @tracing.timed('indicators.moving_averages')
+    def get_moving_averages(symbol: str, df: pd.DataFrame, periods: list = [20, 50, 200]) -> pd.DataFrame:
+        """
+        Add moving averages to a period of a symbol's history using its incremental state
+        
+        The per-symbol state follows the full history: only bars it hasn't seen are
+        pushed through the rolling windows, and a (last timestamp, bar count) check
+        replaces hashing the whole frame. Averages therefore include the bars before
+        the period start.
+        
+        Args:
+            symbol (str): Stock symbol
+            df (pd.DataFrame): Period returned by get_stock_history (a suffix of the full history)
+            periods (list): List of periods for moving averages
+            
+        Returns:
+            Shallow copy of the DataFrame with moving averages added (the input is not modified)
+        """
+        full_history = StockDataFetcher.get_full_history(symbol)
+        if full_history is None or df is None or df.empty:
+            return StockDataFetcher.calculate_moving_averages(df, periods)
+        
+        key = (symbol.strip().upper(), tuple(periods))
+        state = _ma_states.get_or_compute(key, lambda: MovingAverageState(periods))
+        
+        with state.lock:
+            if (state.last_date != full_history['Date'].iloc[-1] or state.count != len(full_history)
+                    or state.first_close != full_history['Close'].iloc[0]
+                    or state.last_close != full_history['Close'].iloc[-1]):
+                state.sync(full_history['Date'], full_history['Close'].to_numpy(dtype='float64'))
+            
+            length = state.covers(df['Date'])
+            if length is None:
+                # Not a slice of the cached history, fall back to a one-off computation
+                return StockDataFetcher.calculate_moving_averages(df, periods)
+            averages = state.tail(length)
+        
+        df_copy = df.copy(deep=False)
+        for period, values in averages.items():
+            if state.count >= period:
+                df_copy[f'MA_{period}'] = values
+        
+        return df_copy
@@ -0,0 +1,156 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Points per trace sent to the browser; about twice the width of a wide chart in pixels
+DEFAULT_MAX_POINTS = 2000
+
+# Candle aggregation ladder (pandas offset alias, approximate length in days)
+OHLC_RULES = [
+    ('h', 1 / 24),
+    ('D', 1),
+    ('W-FRI', 7),
+    ('ME', 30.44),
+    ('QE', 91.31),
+    ('YE', 365.25)
+]
+
+
+def date_values(dates) -> np.ndarray:
+    """
+    Convert dates into float64 values usable for geometry
+
+    Args:
+        dates (pd.Series | pd.DatetimeIndex): Dates (naive or tz-aware)
+
+    Returns:
+        Float array of timestamps relative to the first one
+    """
+    ticks = pd.DatetimeIndex(dates).asi8
+    return (ticks - ticks[0]).astype('float64') if len(ticks) else ticks.astype('float64')
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Pick the points that best preserve a line's shape (largest-triangle-three-buckets)
+
+    The first and last points are always kept; every bucket in between keeps the
+    point forming the largest triangle with the previously kept point and the
+    average of the next bucket.
+
+    Args:
+        x (np.ndarray): Increasing x values
+        y (np.ndarray): y values (no NaN)
+        n_out (int): Number of points to keep
+
+    Returns:
+        Sorted indices of the kept points
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    bucket_sizes = np.diff(np.append(edges, n))
+    # Averages of every bucket (the last "bucket" is the final point), computed in one pass
+    avg_x = np.add.reduceat(x, edges) / bucket_sizes
+    avg_y = np.add.reduceat(y, edges) / bucket_sizes
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        xs, ys = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x[i + 1]) * (ys - y[a]) - (x[a] - xs) * (avg_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample_line(x: pd.Series, y: pd.Series, max_points: int) -> tuple:
+    """
+    Downsample one line trace with LTTB, ignoring missing values
+
+    Args:
+        x (pd.Series): Dates
+        y (pd.Series): Values (may contain NaN, e.g. moving average warm-up)
+        max_points (int): Point budget
+
+    Returns:
+        Tuple of (x values, y values) to plot
+    """
+    # Keep dates as a DatetimeIndex: tz-aware columns would otherwise become object arrays
+    dates = pd.DatetimeIndex(x)
+    values = y.to_numpy(dtype='float64')
+    valid = ~np.isnan(values)
+    if not valid.all():
+        dates, values = dates[valid], values[valid]
+
+    if len(values) <= max_points:
+        return dates, values
+
+    keep = lttb_indices(date_values(dates), values, max_points)
+    return dates[keep], values[keep]
+
+
+def choose_ohlc_rule(dates: pd.Series, max_bars: int) -> Optional[str]:
+    """
+    Pick the finest candle size that fits the bar budget
+
+    Args:
+        dates (pd.Series): Bar dates, oldest first
+        max_bars (int): Bar budget
+
+    Returns:
+        Pandas offset alias, or None if the bars already fit
+    """
+    if len(dates) <= max_bars:
+        return None
+
+    span_days = (dates.iloc[-1] - dates.iloc[0]) / pd.Timedelta(days=1)
+    bar_days = span_days / max(len(dates) - 1, 1)
+    for rule, rule_days in OHLC_RULES:
+        if rule_days <= bar_days or span_days / rule_days > 2 * max_bars:
+            continue
+        # Count the buckets exactly: the first and last ones are usually partial
+        if len(pd.date_range(dates.iloc[0], dates.iloc[-1], freq=rule)) + 1 <= max_bars:
+            return rule
+    return OHLC_RULES[-1][0]
+
+
+def resample_ohlc(df: pd.DataFrame, max_bars: int, rule: Optional[str] = None) -> pd.DataFrame:
+    """
+    Aggregate bars into coarser candles (e.g. daily -> weekly -> monthly) to fit a budget
+
+    Open is the first open, High the highest high, Low the lowest low, Close the
+    last close and Volume the sum; any other column (moving averages,
+    indicators) keeps its last value of the bucket.
+
+    Args:
+        df (pd.DataFrame): Bars with a 'Date' column
+        max_bars (int): Bar budget
+        rule (str): Force a candle size instead of choosing one
+
+    Returns:
+        Aggregated DataFrame (the input itself if it already fits)
+    """
+    rule = rule or choose_ohlc_rule(df['Date'], max_bars)
+    if rule is None:
+        return df
+
+    aggregation = {column: 'last' for column in df.columns if column != 'Date'}
+    aggregation.update({
+        column: how
+        for column, how in (('Open', 'first'), ('High', 'max'), ('Low', 'min'), ('Close', 'last'), ('Volume', 'sum'))
+        if column in df.columns
+    })
+
+    resampled = df.resample(rule, on='Date').agg(aggregation)
+    # Weekends, holidays and market closures leave empty buckets behind
+    resampled = resampled.dropna(subset=['Close'])
+    return resampled.reset_index()
@@ -0,0 +1,234 @@
+import dataclasses
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MISSING = float('nan')
+
+
+class MetricField(NamedTuple):
+    """Numeric metric: attribute name, display label, Yahoo Finance info keys (first present wins) and display kind"""
+
+    attr: str
+    label: str
+    info_keys: Tuple[str, ...]
+    kind: str  # 'currency', 'number', 'percentage' or 'ratio'
+
+
+# Text fields: attribute name, display label, info key
+TEXT_FIELDS = (
+    ('company_name', 'Company Name', 'longName'),
+    ('sector', 'Sector', 'sector'),
+    ('industry', 'Industry', 'industry'),
+)
+
+# Numeric fields, in display order
+NUMERIC_FIELDS = (
+    # Price data
+    MetricField('current_price', 'Current Price', ('currentPrice', 'regularMarketPrice'), 'currency'),
+    MetricField('previous_close', 'Previous Close', ('previousClose',), 'currency'),
+    MetricField('open', 'Open', ('open',), 'currency'),
+    MetricField('day_high', 'Day High', ('dayHigh',), 'currency'),
+    MetricField('day_low', 'Day Low', ('dayLow',), 'currency'),
+    # Volume data
+    MetricField('volume', 'Volume', ('volume',), 'number'),
+    MetricField('average_volume', 'Average Volume', ('averageVolume',), 'number'),
+    # Market data
+    MetricField('market_cap', 'Market Cap', ('marketCap',), 'number'),
+    MetricField('enterprise_value', 'Enterprise Value', ('enterpriseValue',), 'number'),
+    # Valuation ratios
+    MetricField('pe_ratio', 'P/E Ratio', ('trailingPE',), 'ratio'),
+    MetricField('forward_pe', 'Forward P/E', ('forwardPE',), 'ratio'),
+    MetricField('peg_ratio', 'PEG Ratio', ('pegRatio',), 'ratio'),
+    MetricField('price_to_book', 'Price to Book', ('priceToBook',), 'ratio'),
+    MetricField('price_to_sales', 'Price to Sales', ('priceToSalesTrailing12Months',), 'ratio'),
+    # Financial health
+    MetricField('debt_to_equity', 'Debt to Equity', ('debtToEquity',), 'ratio'),
+    MetricField('return_on_equity', 'Return on Equity', ('returnOnEquity',), 'percentage'),
+    MetricField('return_on_assets', 'Return on Assets', ('returnOnAssets',), 'percentage'),
+    # Dividend data
+    MetricField('dividend_yield', 'Dividend Yield', ('dividendYield',), 'percentage'),
+    MetricField('dividend_rate', 'Dividend Rate', ('dividendRate',), 'currency'),
+    MetricField('payout_ratio', 'Payout Ratio', ('payoutRatio',), 'percentage'),
+    # Range data
+    MetricField('week_52_high', '52 Week High', ('fiftyTwoWeekHigh',), 'currency'),
+    MetricField('week_52_low', '52 Week Low', ('fiftyTwoWeekLow',), 'currency'),
+    # Beta
+    MetricField('beta', 'Beta', ('beta',), 'ratio'),
+)
+
+NUMERIC_ATTRS = tuple(field.attr for field in NUMERIC_FIELDS)
+
+# Quote fields overriding the (hours old) snapshot values
+_QUOTE_OVERRIDES = {
+    'current_price': 'price',
+    'previous_close': 'previous_close',
+    'open': 'open',
+    'day_high': 'day_high',
+    'day_low': 'day_low',
+    'volume': 'volume',
+}
+
+
+def _to_float(value: Any) -> float:
+    """Convert an info payload value to float, NaN when missing or not numeric"""
+    if value is None or isinstance(value, bool):
+        return MISSING
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return MISSING
+
+
+@dataclass(frozen=True, slots=True)
+class FinancialMetrics:
+    """Typed key financial metrics of one symbol; missing numbers are NaN, missing text None"""
+
+    symbol: str
+    company_name: Optional[str] = None
+    sector: Optional[str] = None
+    industry: Optional[str] = None
+    current_price: float = MISSING
+    previous_close: float = MISSING
+    open: float = MISSING
+    day_high: float = MISSING
+    day_low: float = MISSING
+    volume: float = MISSING
+    average_volume: float = MISSING
+    market_cap: float = MISSING
+    enterprise_value: float = MISSING
+    pe_ratio: float = MISSING
+    forward_pe: float = MISSING
+    peg_ratio: float = MISSING
+    price_to_book: float = MISSING
+    price_to_sales: float = MISSING
+    debt_to_equity: float = MISSING
+    return_on_equity: float = MISSING
+    return_on_assets: float = MISSING
+    dividend_yield: float = MISSING
+    dividend_rate: float = MISSING
+    payout_ratio: float = MISSING
+    week_52_high: float = MISSING
+    week_52_low: float = MISSING
+    beta: float = MISSING
+
+    @staticmethod
+    def from_info(symbol: str, info: Mapping[str, Any]) -> 'FinancialMetrics':
+        """
+        Extract the metrics from a Yahoo Finance info payload
+
+        Args:
+            symbol (str): Stock symbol
+            info (Mapping): Stock info payload
+
+        Returns:
+            FinancialMetrics (values parsed once, NaN when missing or not numeric)
+        """
+        values = {}
+        for field in NUMERIC_FIELDS:
+            value = None
+            for key in field.info_keys:
+                value = info.get(key)
+                if value is not None:
+                    break
+            values[field.attr] = _to_float(value)
+
+        for attr, _, key in TEXT_FIELDS:
+            text = info.get(key)
+            values[attr] = str(text) if text is not None else None
+
+        return FinancialMetrics(symbol=info.get('symbol', symbol.upper()), **values)
+
+    def with_quote(self, quote: Any) -> 'FinancialMetrics':
+        """
+        Overlay the fields of a fresher quote
+
+        Args:
+            quote (Quote): Latest quote of the symbol
+
+        Returns:
+            FinancialMetrics with the known quote fields replaced
+        """
+        changes = {}
+        for attr, quote_attr in _QUOTE_OVERRIDES.items():
+            value = getattr(quote, quote_attr, None)
+            if value is not None:
+                changes[attr] = float(value)
+        return dataclasses.replace(self, **changes) if changes else self
+
+    def get(self, attr: str, default: Any = None) -> Any:
+        """
+        Get a metric by attribute name, or default when it is missing
+
+        Args:
+            attr (str): Attribute name (e.g. 'day_low')
+            default: Value returned for NaN or None
+
+        Returns:
+            Metric value or default
+        """
+        value = getattr(self, attr)
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return default
+        return value
+
+    def to_array(self) -> np.ndarray:
+        """
+        Get the numeric metrics as one float64 row
+
+        Returns:
+            Array ordered like NUMERIC_FIELDS
+        """
+        return np.array([getattr(self, attr) for attr in NUMERIC_ATTRS], dtype=np.float64)
+
+    def labelled(self) -> Dict[str, Any]:
+        """
+        Get every metric under its display label, in display order
+
+        Returns:
+            Dictionary of label -> text (None if missing) or float (NaN if missing)
+        """
+        values: Dict[str, Any] = {'Company Name': self.company_name, 'Symbol': self.symbol}
+        values.update((label, getattr(self, attr)) for attr, label, _ in TEXT_FIELDS if attr != 'company_name')
+        values.update((field.label, getattr(self, field.attr)) for field in NUMERIC_FIELDS)
+        return values
+
+    @staticmethod
+    def stack(records: Iterable['FinancialMetrics'], text: bool = False) -> pd.DataFrame:
+        """
+        Stack the metrics of many symbols into one columnar table
+
+        Args:
+            records (iterable): FinancialMetrics of each symbol
+            text (bool): Also include the company name, sector and industry columns
+
+        Returns:
+            DataFrame indexed by symbol with one float64 column per numeric metric (NaN when missing)
+        """
+        records = list(records)
+        values = np.array([record.to_array() for record in records], dtype=np.float64).reshape(len(records), len(NUMERIC_ATTRS))
+        table = pd.DataFrame(
+            values,
+            index=pd.Index([record.symbol for record in records], name='symbol'),
+            columns=list(NUMERIC_ATTRS)
+        )
+        if text:
+            for position, (attr, _, _) in enumerate(TEXT_FIELDS):
+                table.insert(position, attr, [getattr(record, attr) for record in records])
+        return table
+
+
+def fields_of_kind(kind: str) -> List[MetricField]:
+    """
+    Get the numeric fields displayed with a given kind
+
+    Args:
+        kind (str): 'currency', 'number', 'percentage' or 'ratio'
+
+    Returns:
+        Matching fields, in display order
+    """
+    return [field for field in NUMERIC_FIELDS if field.kind == kind]
@@ -1,11 +1,173 @@
 import pandas as pd
-import streamlit as st
-from typing import Any, Dict
-import io
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import Any
+
+from utils import exports, tracing
+from utils.financial_metrics import NUMERIC_FIELDS, FinancialMetrics
+
+# Large number suffixes and their scales
+NUMBER_SUFFIXES = ('', 'K', 'M', 'B', 'T')
+_SUFFIX_SCALES = np.array([1.0, 1e3, 1e6, 1e9, 1e12])
+
+# Sign and decimal part strings picked by index
+_SIGNS = pa.array(['', '-'])
+_DECIMALS = pa.array([f'.{i:02d}' for i in range(100)])
+
+# Hundredths below this are exact integers in float64
+_EXACT_HUNDREDTHS = 2.0 ** 52
+
+# Relative rounding error of a float64 product: hundredths closer than this to a half may round either way
+_HALF_TOLERANCE = 2.0 ** -52
+
+# Formatted columns are Arrow-backed strings (the default string dtype of pandas 3)
+_STRING_DTYPE = pd.StringDtype('pyarrow', na_value=np.nan)
+
+# Positions of the numeric metric fields of each kind
+_KIND_POSITIONS = {
+    kind: np.array([i for i, field in enumerate(NUMERIC_FIELDS) if field.kind == kind])
+    for kind in dict.fromkeys(field.kind for field in NUMERIC_FIELDS)
+}
+
+
+def _format_fixed(values: Any, prefix: str = '', suffix: str = '', scale: bool = False,
+                  percent: bool = False, grouped: bool = False) -> pd.Series:
+    """
+    Format a column of numbers with two decimals, like the scalar formatters
+    
+    The digits are built from whole numbers of hundredths with Arrow string kernels.
+    They match the '.2f' format of the scalar formatters, which rounds the exact
+    binary value: products within float error of a half hundredth, magnitudes beyond
+    exact integers and comma-grouped values go through '.2f' itself.
+    
+    Args:
+        values: Array-like of numbers (non-numeric values and NaN become 'N/A')
+        prefix (str): Text before the digits (e.g. '$')
+        suffix (str): Text after the digits (e.g. '%')
+        scale (bool): Divide by thousands and append the K/M/B/T suffix (positive values only)
+        percent (bool): Express fractions (<= 1) as percentages
+        grouped (bool): Separate thousands with commas in values left unscaled
+        
+    Returns:
+        Series of strings (index kept from a Series input)
+    """
+    index = values.index if isinstance(values, pd.Series) else None
+    numbers = np.asarray(values)
+    if numbers.dtype.kind not in 'fiu':
+        numbers = pd.to_numeric(pd.Series(numbers.ravel()), errors='coerce').to_numpy()
+    numbers = numbers.astype(np.float64, copy=False).ravel()
+    
+    if percent:
+        # Values already in percentage form (> 1) are not multiplied by 100
+        numbers = np.where(numbers > 1, numbers, numbers * 100)
+    
+    missing = ~np.isfinite(numbers)
+    numbers = np.where(missing, 0.0, numbers)
+    codes = np.zeros(len(numbers), dtype=np.int64)
+    if scale:
+        codes = np.maximum(np.searchsorted(_SUFFIX_SCALES, numbers, side='right') - 1, 0)
+        numbers = numbers / _SUFFIX_SCALES[codes]
+    
+    hundredths = np.abs(numbers) * 100
+    exact = (hundredths < _EXACT_HUNDREDTHS) & (
+        np.abs(hundredths - np.floor(hundredths) - 0.5) > hundredths * _HALF_TOLERANCE
+    )
+    if grouped:
+        exact &= (codes != 0) | (np.abs(numbers) < 999.995)
+    cents = np.rint(np.where(exact, hundredths, 0.0)).astype(np.int64)
+    
+    # '.2f' keeps the sign of negative values rounded to zero ('-0.00')
+    signs = _SIGNS.take(pa.array((np.signbit(numbers) & exact).view(np.int8)))
+    integers = pc.cast(pa.array(cents // 100), pa.string())
+    decimals = _DECIMALS.take(pa.array(cents % 100))
+    slow = ~exact
+    if slow.any():
+        spec = ',.2f' if grouped else '.2f'
+        fallback = [format(value, spec if code == 0 else '.2f')
+                    for value, code in zip(numbers[slow].tolist(), codes[slow].tolist())]
+        mask = pa.array(slow)
+        integers = pc.replace_with_mask(integers, mask, pa.array(fallback, pa.string()))
+        decimals = pc.replace_with_mask(decimals, mask, pa.array([''] * len(fallback), pa.string()))
+    
+    parts = [prefix, signs, integers, decimals]
+    if scale:
+        parts.append(pa.array(NUMBER_SUFFIXES).take(pa.array(codes)))
+    rendered = pc.binary_join_element_wise(*parts, suffix, '')
+    if missing.any():
+        rendered = pc.if_else(pa.array(missing), 'N/A', rendered)
+    
+    return pd.Series(rendered, index=index, dtype=_STRING_DTYPE)
+
 
 class DataFormatter:
     """Class for data formatting and helper functions"""
     
+    @staticmethod
+    def is_missing(value: Any) -> bool:
+        """
+        Check if a metric value is missing
+        
+        Args:
+            value: Value to check (None, 'N/A' and NaN are missing)
+            
+        Returns:
+            True if the value is missing
+        """
+        return value is None or value == 'N/A' or (isinstance(value, float) and value != value)
+    
+    @staticmethod
+    def format_currency_column(values: Any) -> pd.Series:
+        """
+        Format a column of values as currency with K/M/B/T suffixes
+        
+        Args:
+            values: Array-like of numbers (NumPy array, Series, list)
+            
+        Returns:
+            Series of formatted strings ('N/A' for missing values)
+        """
+        return _format_fixed(values, '$', scale=True)
+    
+    @staticmethod
+    def format_number_column(values: Any) -> pd.Series:
+        """
+        Format a column of large numbers with K/M/B/T suffixes
+        
+        Args:
+            values: Array-like of numbers (NumPy array, Series, list)
+            
+        Returns:
+            Series of formatted strings ('N/A' for missing values)
+        """
+        return _format_fixed(values, scale=True, grouped=True)
+    
+    @staticmethod
+    def format_percentage_column(values: Any) -> pd.Series:
+        """
+        Format a column of values as percentages
+        
+        Args:
+            values: Array-like of fractions or percentages (values > 1 are taken as percentages)
+            
+        Returns:
+            Series of formatted strings ('N/A' for missing values)
+        """
+        return _format_fixed(values, suffix='%', percent=True)
+    
+    @staticmethod
+    def format_ratio_column(values: Any) -> pd.Series:
+        """
+        Format a column of financial ratios
+        
+        Args:
+            values: Array-like of numbers (NumPy array, Series, list)
+            
+        Returns:
+            Series of formatted strings ('N/A' for missing values)
+        """
+        return _format_fixed(values)
+    
     @staticmethod
     def format_currency(value: Any) -> str:
         """
@@ -17,7 +179,7 @@ class DataFormatter:
         Returns:
             Formatted currency string
         """
-        if value == 'N/A' or value is None:
+        if DataFormatter.is_missing(value):
             return 'N/A'
         
         try:
@@ -46,7 +208,7 @@ class DataFormatter:
         Returns:
             Formatted number string
         """
-        if value == 'N/A' or value is None:
+        if DataFormatter.is_missing(value):
             return 'N/A'
         
         try:
@@ -75,7 +237,7 @@ class DataFormatter:
         Returns:
             Formatted percentage string
         """
-        if value == 'N/A' or value is None:
+        if DataFormatter.is_missing(value):
             return 'N/A'
         
         try:
@@ -99,7 +261,7 @@ class DataFormatter:
         Returns:
             Formatted ratio string
         """
-        if value == 'N/A' or value is None:
+        if DataFormatter.is_missing(value):
             return 'N/A'
         
         try:
@@ -108,48 +270,66 @@ class DataFormatter:
         except (ValueError, TypeError):
             return str(value)
     
+    # Column formatter of each metric kind of utils.financial_metrics
+    KIND_FORMATTERS = {
+        'currency': 'format_currency_column',
+        'number': 'format_number_column',
+        'percentage': 'format_percentage_column',
+        'ratio': 'format_ratio_column',
+    }
+    
     @staticmethod
-    def create_metrics_dataframe(metrics: Dict[str, Any]) -> pd.DataFrame:
+    @tracing.timed('format.metrics')
+    def create_metrics_dataframe(metrics: FinancialMetrics) -> pd.DataFrame:
         """
-        Create a formatted DataFrame from metrics dictionary
+        Create a formatted DataFrame from the financial metrics of a symbol
         
         Args:
-            metrics: Dictionary of financial metrics
+            metrics: FinancialMetrics of the symbol
             
         Returns:
-            Formatted pandas DataFrame
+            Formatted pandas DataFrame with 'Metric' and 'Value' columns
         """
-        formatted_metrics = {}
+        labels = ['Company Name', 'Symbol', 'Sector', 'Industry'] + [field.label for field in NUMERIC_FIELDS]
+        values = [metrics.company_name or 'N/A', metrics.symbol, metrics.sector or 'N/A', metrics.industry or 'N/A']
         
-        # Format different types of metrics
-        currency_fields = ['Current Price', 'Previous Close', 'Open', 'Day High', 'Day Low', 
-                          '52 Week High', '52 Week Low', 'Dividend Rate']
+        # The fields of each kind are formatted together
+        numbers = metrics.to_array()
+        formatted = np.empty(len(NUMERIC_FIELDS), dtype=object)
+        for kind, positions in _KIND_POSITIONS.items():
+            formatter = getattr(DataFormatter, DataFormatter.KIND_FORMATTERS[kind])
+            formatted[positions] = formatter(numbers[positions]).to_numpy(dtype=object)
+        values.extend(formatted)
         
-        large_number_fields = ['Market Cap', 'Enterprise Value', 'Volume', 'Average Volume']
-        
-        percentage_fields = ['Dividend Yield', 'Return on Equity', 'Return on Assets', 'Payout Ratio']
+        return pd.DataFrame({'Metric': labels, 'Value': values})
+    
+    @staticmethod
+    @tracing.timed('format.metrics_table')
+    def format_metrics_table(table: pd.DataFrame) -> pd.DataFrame:
+        """
+        Format a stacked metrics table (see FinancialMetrics.stack) for display
         
-        ratio_fields = ['P/E Ratio', 'Forward P/E', 'PEG Ratio', 'Price to Book', 
-                       'Price to Sales', 'Debt to Equity', 'Beta']
+        Every column is formatted as a whole according to the kind of its metric,
+        so one symbol and thousands of symbols go through the same code.
         
-        for key, value in metrics.items():
-            if key in currency_fields:
-                formatted_metrics[key] = DataFormatter.format_currency(value)
-            elif key in large_number_fields:
-                formatted_metrics[key] = DataFormatter.format_number(value)
-            elif key in percentage_fields:
-                formatted_metrics[key] = DataFormatter.format_percentage(value)
-            elif key in ratio_fields:
-                formatted_metrics[key] = DataFormatter.format_ratio(value)
+        Args:
+            table: Metrics table indexed by symbol
+            
+        Returns:
+            Table of display strings ('N/A' for missing values)
+        """
+        formatted = {}
+        kinds = {field.attr: field.kind for field in NUMERIC_FIELDS}
+        for col in table.columns:
+            kind = kinds.get(col)
+            if kind is None:
+                formatted[col] = table[col].astype(_STRING_DTYPE).fillna('N/A')
             else:
-                formatted_metrics[key] = str(value) if value != 'N/A' else 'N/A'
-        
-        # Create DataFrame
-        df = pd.DataFrame.from_dict({'Metric': list(formatted_metrics.keys()), 
-                                   'Value': list(formatted_metrics.values())})
-        return df
+                formatted[col] = getattr(DataFormatter, DataFormatter.KIND_FORMATTERS[kind])(table[col])
+        return pd.DataFrame(formatted, index=table.index)
     
     @staticmethod
+    @tracing.timed('format.export_csv')
     def export_to_csv(df: pd.DataFrame, filename: str) -> bytes:
         """
         Export DataFrame to CSV bytes
@@ -161,9 +341,8 @@ class DataFormatter:
         Returns:
             CSV data as bytes
         """
-        csv_buffer = io.StringIO()
-        df.to_csv(csv_buffer, index=False)
-        return csv_buffer.getvalue().encode('utf-8')
+        # Written in chunks straight as bytes (no intermediate str copy of the whole file)
+        return exports.export_frame(df, 'csv')
     
     @staticmethod
     def get_popular_symbols() -> list:
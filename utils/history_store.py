@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+from typing import Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Default location of the on-disk history store (can be overridden with STOCK_HISTORY_DIR)
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'history')
+
+# Key used to keep store bookkeeping inside the Parquet schema metadata
+METADATA_KEY = b'stock_dashboard'
+
+
+class HistoryStore:
+    """Class to persist OHLCV history on disk as one Parquet file per symbol"""
+
+    def __init__(self, root: Optional[str] = None, namespace: Optional[str] = None):
+        """
+        Initialize the store
+
+        Args:
+            root (str): Directory holding the Parquet files (defaults to STOCK_HISTORY_DIR or .cache/history)
+            namespace (str): Optional subdirectory keeping data of different providers apart
+        """
+        self.root = root or os.environ.get('STOCK_HISTORY_DIR', DEFAULT_STORE_DIR)
+        if namespace:
+            self.root = os.path.join(self.root, namespace)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def path_for(self, symbol: str) -> str:
+        """
+        Get the Parquet file path for a symbol
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            Absolute path of the symbol partition
+        """
+        safe_symbol = symbol.upper().replace('/', '_')
+        return os.path.join(self.root, f'{safe_symbol}.parquet')
+
+    def lock_for(self, symbol: str) -> threading.Lock:
+        """
+        Get the lock guarding read-modify-write cycles of a symbol partition
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            Lock shared by every caller working on the same symbol
+        """
+        key = symbol.upper()
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def load(self, symbol: str) -> Tuple[Optional[pd.DataFrame], Optional[pd.Timestamp]]:
+        """
+        Load every stored bar for a symbol
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            Tuple of (DataFrame with a 'Date' column or None, earliest date the store is complete from).
+            A coverage of None together with a DataFrame means the full ('max') history is stored.
+        """
+        path = self.path_for(symbol)
+        if not os.path.exists(path):
+            return None, None
+
+        try:
+            table = pq.read_table(path)
+        except (OSError, pa.ArrowException):
+            # A corrupt or half-written partition is treated as missing
+            return None, None
+
+        metadata = table.schema.metadata or {}
+        bookkeeping = json.loads(metadata.get(METADATA_KEY, b'{}'))
+        covered_from = bookkeeping.get('covered_from')
+
+        df = table.to_pandas()
+        if df.empty:
+            return None, None
+
+        if covered_from is not None:
+            covered_from = pd.Timestamp(covered_from)
+        return df, covered_from
+
+    def save(self, symbol: str, df: pd.DataFrame, covered_from: Optional[pd.Timestamp]) -> None:
+        """
+        Atomically replace the stored bars for a symbol
+
+        Args:
+            symbol (str): Stock symbol
+            df (pd.DataFrame): Bars with a 'Date' column
+            covered_from (pd.Timestamp): Earliest date the data is complete from (None for full history)
+        """
+        os.makedirs(self.root, exist_ok=True)
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        bookkeeping = {'covered_from': covered_from.isoformat() if covered_from is not None else None}
+        metadata = dict(table.schema.metadata or {})
+        metadata[METADATA_KEY] = json.dumps(bookkeeping).encode('utf-8')
+        table = table.replace_schema_metadata(metadata)
+
+        path = self.path_for(symbol)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def merge(stored: Optional[pd.DataFrame], fresh: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """
+        Merge freshly downloaded bars into the stored ones
+
+        Args:
+            stored (pd.DataFrame): Bars already on disk
+            fresh (pd.DataFrame): Newly downloaded bars (they win on duplicate dates)
+
+        Returns:
+            Date-sorted DataFrame without duplicate bars
+        """
+        frames = [frame for frame in (stored, fresh) if frame is not None and not frame.empty]
+        if not frames:
+            return None
+        if len(frames) == 1:
+            return frames[0].reset_index(drop=True)
+
+        merged = pd.concat(frames, ignore_index=True)
+        merged = merged.drop_duplicates(subset='Date', keep='last')
+        merged = merged.sort_values('Date', kind='stable')
+        return merged.reset_index(drop=True)
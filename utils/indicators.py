@@ -0,0 +1,188 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils import tracing
+from utils.cache import TTLCache, budget_from_env
+
+# Indicator parameters (classic defaults)
+EMA_FAST = 12
+EMA_SLOW = 26
+MACD_SIGNAL = 9
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+BOLLINGER_PERIOD = 20
+BOLLINGER_STD = 2
+STOCH_PERIOD = 14
+STOCH_SMOOTHING = 3
+OBV_TREND_PERIOD = 20
+
+# Columns produced by TechnicalIndicators.calculate
+INDICATOR_COLUMNS = [
+    'EMA_12', 'EMA_26', 'MACD', 'MACD_Signal', 'MACD_Hist', 'RSI_14',
+    'BB_Middle', 'BB_Upper', 'BB_Lower', 'ATR_14', 'STOCH_K', 'STOCH_D', 'OBV'
+]
+
+# Indicator frames are keyed by symbol and replaced when a new bar arrives
+INDICATOR_CACHE_ENTRIES = 200
+INDICATOR_CACHE_MB = 128
+_indicator_cache = TTLCache(
+    ttl=3600,
+    name='indicators',
+    max_entries=INDICATOR_CACHE_ENTRIES,
+    max_bytes=budget_from_env('indicators', INDICATOR_CACHE_MB)
+)
+
+
+class TechnicalIndicators:
+    """Class to compute technical indicators over historical stock data"""
+
+    @staticmethod
+    @tracing.timed('indicators.calculate')
+    def calculate(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calculate every indicator in a few vectorized passes
+
+        Exponential smoothings sharing a decay are computed in one pass over a
+        multi-column frame, and window statistics share one rolling pass per window.
+
+        Args:
+            df (pd.DataFrame): Historical data with 'Open', 'High', 'Low', 'Close' and 'Volume' columns
+
+        Returns:
+            DataFrame with INDICATOR_COLUMNS, aligned with the input rows
+        """
+        close = df['Close'].to_numpy(dtype='float64')
+        high = df['High'].to_numpy(dtype='float64')
+        low = df['Low'].to_numpy(dtype='float64')
+        volume = df['Volume'].to_numpy(dtype='float64')
+
+        delta = np.diff(close, prepend=np.nan)
+        prev_close = np.concatenate(([np.nan], close[:-1]))
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+        # Pass 1: Wilder smoothing (alpha = 1/14) of gains, losses and true range
+        wilder = pd.DataFrame({
+            'gain': np.clip(delta, 0, None),
+            'loss': np.clip(-delta, 0, None),
+            'tr': true_range
+        }).ewm(alpha=1 / RSI_PERIOD, adjust=False).mean().to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - 100 / (1 + wilder[:, 0] / wilder[:, 1])
+        rsi = np.where(wilder[:, 1] == 0, 100.0, rsi)
+
+        # Pass 2: exponential moving averages of the close and of the MACD line
+        ema_fast = pd.Series(close).ewm(span=EMA_FAST, adjust=False).mean().to_numpy()
+        ema_slow = pd.Series(close).ewm(span=EMA_SLOW, adjust=False).mean().to_numpy()
+        macd = ema_fast - ema_slow
+        macd_signal = pd.Series(macd).ewm(span=MACD_SIGNAL, adjust=False).mean().to_numpy()
+
+        # Pass 3: rolling window statistics
+        bollinger = pd.Series(close).rolling(BOLLINGER_PERIOD)
+        bb_middle = bollinger.mean().to_numpy()
+        bb_std = bollinger.std(ddof=0).to_numpy()
+
+        extremes = pd.DataFrame({'low': low, 'high': high}).rolling(STOCH_PERIOD)
+        lowest = extremes.min()['low'].to_numpy()
+        highest = extremes.max()['high'].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stoch_k = np.where(highest > lowest, (close - lowest) / (highest - lowest) * 100, 50.0)
+        stoch_k[np.isnan(lowest)] = np.nan
+        stoch_d = pd.Series(stoch_k).rolling(STOCH_SMOOTHING).mean().to_numpy()
+
+        # On-balance volume: signed volume accumulated over time
+        obv = np.cumsum(np.sign(np.nan_to_num(delta)) * volume)
+
+        return pd.DataFrame({
+            'EMA_12': ema_fast,
+            'EMA_26': ema_slow,
+            'MACD': macd,
+            'MACD_Signal': macd_signal,
+            'MACD_Hist': macd - macd_signal,
+            'RSI_14': rsi,
+            'BB_Middle': bb_middle,
+            'BB_Upper': bb_middle + BOLLINGER_STD * bb_std,
+            'BB_Lower': bb_middle - BOLLINGER_STD * bb_std,
+            'ATR_14': wilder[:, 2],
+            'STOCH_K': stoch_k,
+            'STOCH_D': stoch_d,
+            'OBV': obv
+        }, index=df.index)
+
+    @staticmethod
+    @tracing.timed('indicators.get')
+    def get_indicators(symbol: str, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Get indicators for a symbol, recomputing them only when its bars change
+
+        Args:
+            symbol (str): Stock symbol
+            df (pd.DataFrame): Historical data with a 'Date' column
+
+        Returns:
+            Indicator DataFrame (shared, must not be modified) or None without data
+        """
+        if df is None or df.empty:
+            return None
+
+        # Both ends of the closes: a revised last bar keeps the date and length, and a
+        # split/dividend re-adjusted re-download also changes the earliest prices
+        close = df['Close']
+        stamp = (len(df), df['Date'].iloc[0], float(close.iloc[0]), df['Date'].iloc[-1], float(close.iloc[-1]))
+        cached = _indicator_cache.get(symbol)
+        hit = cached is not None and cached[0] == stamp
+        tracing.record_cache('indicators', hit)
+        if hit:
+            return cached[1]
+
+        indicators = TechnicalIndicators.calculate(df)
+        _indicator_cache.put(symbol, (stamp, indicators))
+        return indicators
+
+    @staticmethod
+    def calculate_score(indicators: Optional[pd.DataFrame], close: Optional[float] = None) -> float:
+        """
+        Derive a 0-100 technical score from the latest indicator values
+
+        Every indicator votes buy (+1), neutral (0) or sell (-1); the score maps
+        the average vote from -1..1 onto 0..100 (50 is neutral).
+
+        Args:
+            indicators (pd.DataFrame): Output of calculate
+            close (float): Latest close (defaults to the middle Bollinger band)
+
+        Returns:
+            Technical score between 0 and 100
+        """
+        if indicators is None or indicators.empty:
+            return 50.0
+
+        last = indicators.iloc[-1]
+        if close is None:
+            close = last['BB_Middle']
+
+        votes = []
+
+        def vote(condition_buy: bool, condition_sell: bool) -> None:
+            votes.append(1 if condition_buy else -1 if condition_sell else 0)
+
+        if not np.isnan(last['EMA_12']):
+            vote(close > last['EMA_12'], close < last['EMA_12'])
+        if not np.isnan(last['EMA_26']):
+            vote(close > last['EMA_26'], close < last['EMA_26'])
+        if not np.isnan(last['MACD_Signal']):
+            vote(last['MACD'] > last['MACD_Signal'], last['MACD'] < last['MACD_Signal'])
+        if not np.isnan(last['RSI_14']):
+            vote(last['RSI_14'] < 30, last['RSI_14'] > 70)
+        if not np.isnan(last['STOCH_K']):
+            vote(last['STOCH_K'] < 20, last['STOCH_K'] > 80)
+        if not np.isnan(last['BB_Lower']):
+            vote(close < last['BB_Lower'], close > last['BB_Upper'])
+        if len(indicators) > OBV_TREND_PERIOD:
+            obv_change = last['OBV'] - indicators['OBV'].iloc[-OBV_TREND_PERIOD - 1]
+            vote(obv_change > 0, obv_change < 0)
+
+        if not votes:
+            return 50.0
+        return float(50 + 50 * np.mean(votes))
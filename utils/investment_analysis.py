@@ -1,16 +1,17 @@
-import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Optional, Union
 import random
 
+from utils import tracing
+from utils.financial_metrics import FinancialMetrics
+from utils.indicators import TechnicalIndicators
+
 class InvestmentAnalysis:
-    """Class to generate investment analysis components similar to trading platforms"""
+    """Class computing the investment analysis shown by trading platforms (rendered by ui.investment_analysis)"""
     
     @staticmethod
+    @tracing.timed('analysis.fair_value')
     def create_fair_value_indicator(current_price: float, fair_value: Optional[float] = None) -> dict:
         """
         Create fair value assessment
@@ -61,122 +62,58 @@ class InvestmentAnalysis:
         }
     
     @staticmethod
-    def create_price_range_widget(symbol: str, current_price: float, day_low: float, day_high: float, 
-                                week52_low: float, week52_high: float) -> None:
+    def range_position(price: float, low: float, high: float) -> float:
         """
-        Create price range indicators similar to the image
+        Locate a price within a range
         
         Args:
-            symbol: Stock symbol
-            current_price: Current price
-            day_low: Day's low price
-            day_high: Day's high price
-            week52_low: 52-week low
-            week52_high: 52-week high
-        """
-        st.markdown("#### 📊 Rangos de Precio")
-        
-        # Daily range
-        st.markdown("**Rango diario**")
-        day_progress = (current_price - day_low) / (day_high - day_low) if day_high > day_low else 0.5
-        
-        col1, col2, col3 = st.columns([1, 3, 1])
-        with col1:
-            st.write(f"${day_low:.2f}")
-        with col2:
-            st.progress(day_progress)
-        with col3:
-            st.write(f"${day_high:.2f}")
+            price: Price to locate
+            low: Bottom of the range
+            high: Top of the range
         
-        # 52-week range
-        st.markdown("**52 semanas**")
-        year_progress = (current_price - week52_low) / (week52_high - week52_low) if week52_high > week52_low else 0.5
-        
-        col1, col2, col3 = st.columns([1, 3, 1])
-        with col1:
-            st.write(f"${week52_low:.2f}")
-        with col2:
-            st.progress(year_progress)
-        with col3:
-            st.write(f"${week52_high:.2f}")
+        Returns:
+            Position from 0 (low) to 1 (high), 0.5 for an empty range
+        """
+        return (price - low) / (high - low) if high > low else 0.5
     
     @staticmethod
-    def create_analyst_opinion_widget(symbol: str, current_price: float) -> None:
+    def simulate_analyst_opinion(current_price: float) -> dict:
         """
-        Create analyst opinion widget
+        Simulate the analyst consensus of a stock
         
         Args:
-            symbol: Stock symbol
             current_price: Current stock price
+        
+        Returns:
+            Dictionary with target price, upside (%) and recommendation
         """
-        # Simulate analyst data
         target_price = current_price * (1.05 + random.random() * 0.1)
         upside = ((target_price - current_price) / current_price) * 100
         
         recommendations = ["Compra fuerte", "Compra", "Mantener", "Venta", "Venta fuerte"]
         weights = [0.3, 0.4, 0.2, 0.08, 0.02]  # Bias towards buy recommendations
-        recommendation = np.random.choice(recommendations, p=weights)
-        
-        st.markdown("#### 📈 Opinión de los Analistas")
+        recommendation = str(np.random.choice(recommendations, p=weights))
         
-        col1, col2 = st.columns([2, 1])
-        with col1:
-            if recommendation in ["Compra fuerte", "Compra"]:
-                st.success(f"🟢 **{recommendation}**")
-            elif recommendation == "Mantener":
-                st.warning(f"🟡 **{recommendation}**")
-            else:
-                st.error(f"🔴 **{recommendation}**")
-        
-        st.markdown("**Precio objetivo**")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Precio objetivo", f"${target_price:.2f}")
-        with col2:
-            st.metric("Al alza", f"+{upside:.2f}%", delta=f"+{upside:.1f}%")
+        return {
+            'target_price': target_price,
+            'upside': upside,
+            'recommendation': recommendation
+        }
     
     @staticmethod
-    def create_technical_analysis_gauge(symbol: str) -> None:
+    def technical_signal(indicators: Optional[pd.DataFrame] = None, close: Optional[float] = None) -> dict:
         """
-        Create technical analysis gauge similar to the image
+        Derive the technical signal from the indicators
         
         Args:
-            symbol: Stock symbol
-        """
-        # Simulate technical analysis score (0-100)
-        tech_score = random.randint(60, 85)  # Bias towards positive
-        
-        # Create gauge chart
-        fig = go.Figure(go.Indicator(
-            mode = "gauge+number+delta",
-            value = tech_score,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "Análisis Técnico"},
-            delta = {'reference': 50},
-            gauge = {
-                'axis': {'range': [None, 100]},
-                'bar': {'color': "#262730"},
-                'steps': [
-                    {'range': [0, 30], 'color': "#ff4444"},    # Rojo
-                    {'range': [30, 70], 'color': "#ffaa00"},   # Amarillo
-                    {'range': [70, 100], 'color': "#00cc44"}  # Verde
-                ],
-                'threshold': {
-                    'line': {'color': "white", 'width': 4},
-                    'thickness': 0.75,
-                    'value': tech_score
-                }
-            }
-        ))
+            indicators: Output of TechnicalIndicators.calculate (neutral score if missing)
+            close: Latest closing price
         
-        fig.update_layout(
-            height=200,
-            width=280,
-            template='plotly_dark',
-            font={'color': "white", 'family': "Arial", 'size': 12},
-            margin=dict(l=10, r=10, t=30, b=10),
-            showlegend=False
-        )
+        Returns:
+            Dictionary with score (0-100), recommendation and color
+        """
+        # Technical analysis score (0-100) voted by the indicators
+        tech_score = round(TechnicalIndicators.calculate_score(indicators, close))
         
         if tech_score >= 70:
             recommendation = "Compra fuerte"
@@ -188,110 +125,77 @@ class InvestmentAnalysis:
             recommendation = "Precaución"
             color = "#ff4444"  # Rojo
         
-        col1, col2 = st.columns([1, 1])
-        with col1:
-            st.plotly_chart(fig, use_container_width=False)
-        with col2:
-            st.markdown("#### Señal Técnica")
-            if recommendation == "Compra fuerte":
-                st.success(f"🟢 **{recommendation}**")
-            elif recommendation == "Compra":
-                st.warning(f"🟡 **{recommendation}**")
-            else:
-                st.error(f"🔴 **{recommendation}**")
-            
-            # Add score display
-            st.metric("Puntuación", f"{tech_score}/100")
+        return {
+            'score': tech_score,
+            'recommendation': recommendation,
+            'color': color
+        }
     
     @staticmethod
-    def create_sentiment_widget(symbol: str) -> None:
+    def simulate_sentiment() -> str:
         """
-        Create market sentiment widget
+        Simulate the market sentiment of a stock
         
-        Args:
-            symbol: Stock symbol
+        Returns:
+            "Bajista", "Neutral" or "Alcista"
         """
-        # Simulate sentiment data
         sentiments = ["Bajista", "Neutral", "Alcista"]
         weights = [0.2, 0.3, 0.5]
-        current_sentiment = np.random.choice(sentiments, p=weights)
+        return str(np.random.choice(sentiments, p=weights))
+    
+    @staticmethod
+    @tracing.timed('analysis.health_scores')
+    def calculate_health_scores(metrics: Union[FinancialMetrics, pd.DataFrame]) -> pd.Series:
+        """
+        Score the financial health of one or many companies
         
-        st.markdown("#### 📊 Sentimientos del Mercado")
+        Debt to Equity (lower is better) and ROE (higher is better) are each scored
+        30-90 and averaged; the whole table is scored at once.
+        
+        Args:
+            metrics: FinancialMetrics of one symbol or a metrics table (see FinancialMetrics.stack)
         
-        col1, col2 = st.columns(2)
+        Returns:
+            Health score (0-100) per symbol, NaN when neither metric is known
+        """
+        table = FinancialMetrics.stack([metrics]) if isinstance(metrics, FinancialMetrics) else metrics
         
-        with col1:
-            if current_sentiment == "Bajista":
-                st.error("🐻 **Bajista**")
-            else:
-                st.markdown("🐻 Bajista")
+        de_ratio = table['debt_to_equity'].to_numpy(dtype=np.float64)
+        de_factor = np.select(
+            [de_ratio < 0.3, de_ratio < 0.6, de_ratio < 1.0, de_ratio >= 1.0],
+            [90, 70, 50, 30],
+            default=np.nan
+        )
         
-        with col2:
-            if current_sentiment == "Alcista":
-                st.success("🐂 **Alcista**")
-            else:
-                st.markdown("🐂 Alcista")
-                
-        # Show current sentiment prominently
-        if current_sentiment == "Alcista":
-            st.success(f"🚀 Sentimiento actual: **{current_sentiment}**")
-        elif current_sentiment == "Bajista":
-            st.error(f"📉 Sentimiento actual: **{current_sentiment}**")
-        else:
-            st.info(f"⚖️ Sentimiento actual: **{current_sentiment}**")
+        roe_value = table['return_on_equity'].to_numpy(dtype=np.float64)
+        roe_value = np.where(roe_value < 0, roe_value * 100, roe_value)  # Convert to percentage if needed
+        roe_factor = np.select(
+            [roe_value > 15, roe_value > 10, roe_value > 5, roe_value <= 5],
+            [90, 70, 50, 30],
+            default=np.nan
+        )
+        
+        factors = np.column_stack([de_factor, roe_factor])
+        known = np.isfinite(factors).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = np.where(known > 0, np.nansum(factors, axis=1) / known, np.nan)
+        
+        return pd.Series(scores, index=table.index, name='health_score')
     
     @staticmethod
-    def create_company_health_card(symbol: str, metrics: Dict[str, Any]) -> None:
+    def assess_company_health(metrics: FinancialMetrics) -> dict:
         """
-        Create company health assessment card
+        Assess the financial health of one company
         
         Args:
-            symbol: Stock symbol
-            metrics: Financial metrics dictionary
-        """
-        st.markdown("#### 🏥 Salud de la Empresa")
+            metrics: FinancialMetrics of the symbol
         
+        Returns:
+            Dictionary with score (0-100), status and color
+        """
         # Calculate health score based on available metrics
-        health_factors = []
-        
-        # Debt to Equity (lower is better)
-        debt_to_equity = metrics.get('Debt to Equity', 'N/A')
-        if debt_to_equity != 'N/A' and debt_to_equity is not None:
-            try:
-                de_ratio = float(debt_to_equity)
-                if de_ratio < 0.3:
-                    health_factors.append(90)
-                elif de_ratio < 0.6:
-                    health_factors.append(70)
-                elif de_ratio < 1.0:
-                    health_factors.append(50)
-                else:
-                    health_factors.append(30)
-            except:
-                pass
-        
-        # ROE (higher is better)
-        roe = metrics.get('Return on Equity', 'N/A')
-        if roe != 'N/A' and roe is not None:
-            try:
-                roe_value = float(roe)
-                if roe_value < 0:
-                    roe_value = roe_value * 100  # Convert to percentage if needed
-                if roe_value > 15:
-                    health_factors.append(90)
-                elif roe_value > 10:
-                    health_factors.append(70)
-                elif roe_value > 5:
-                    health_factors.append(50)
-                else:
-                    health_factors.append(30)
-            except:
-                pass
-        
-        # Calculate overall health score
-        if health_factors:
-            health_score = sum(health_factors) / len(health_factors)
-        else:
+        health_score = float(InvestmentAnalysis.calculate_health_scores(metrics).iloc[0])
+        if np.isnan(health_score):
             health_score = random.randint(60, 85)  # Default if no data
         
         # Health status
@@ -308,64 +212,8 @@ class InvestmentAnalysis:
             status = "Preocupante"
             color = "#ff4444"  # Rojo
         
-        # Create health assessment using native Streamlit components
-        st.markdown("**Estado de Salud de la Empresa**")
-        
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            st.progress(health_score/100)
-        with col2:
-            st.metric("Salud", f"{health_score:.0f}/100", delta=None)
-        
-        # Show status without background
-        if health_score >= 80:
-            st.success(f"🟢 {status}")
-        elif health_score >= 60:
-            st.warning(f"🟡 {status}")
-        elif health_score >= 40:
-            st.warning(f"🟠 {status}")
-        else:
-            st.error(f"🔴 {status}")
-    
-    @staticmethod
-    def create_investment_summary_card(symbol: str, current_price: float, metrics: Dict[str, Any]) -> None:
-        """
-        Create investment summary card with key insights
-        
-        Args:
-            symbol: Stock symbol
-            current_price: Current stock price
-            metrics: Financial metrics dictionary
-        """
-        st.markdown("#### 💡 Resumen de Inversión")
-        
-        # Get fair value analysis
-        fair_value_data = InvestmentAnalysis.create_fair_value_indicator(current_price)
-        
-        # Create investment summary using native Streamlit components
-        st.markdown(f"#### 🎯 {symbol} Análisis de Inversión")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Precio Actual", f"${current_price:.2f}")
-            st.metric("Valor Razonable", f"${fair_value_data['fair_value']:.2f}")
-        with col2:
-            # Show recommendation with appropriate styling
-            if fair_value_data['recommendation'] in ["Compra fuerte", "Compra"]:
-                st.success(f"🟢 {fair_value_data['recommendation']}")
-            elif fair_value_data['recommendation'] == "Mantener":
-                st.warning(f"🟡 {fair_value_data['recommendation']}")
-            else:
-                st.error(f"🔴 {fair_value_data['recommendation']}")
-                
-            # Show status
-            st.write(f"**Estado:** {fair_value_data['status']}")
-        
-        # Show difference
-        diff_percentage = fair_value_data['percentage_diff']
-        if diff_percentage > 0:
-            st.error(f"🔴 Sobrevalorado por {diff_percentage:.1f}%")
-        elif diff_percentage < -5:
-            st.success(f"🟢 Subvalorado por {abs(diff_percentage):.1f}%")
-        else:
-            st.warning(f"🟡 Cerca del valor razonable ({diff_percentage:+.1f}%)")
\ No newline at end of file
+        return {
+            'score': health_score,
+            'status': status,
+            'color': color
+        }
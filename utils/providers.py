@@ -0,0 +1,607 @@
+import json
+import os
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from curl_cffi import requests as curl_requests
+from yfinance.exceptions import (
+    YFInvalidPeriodError, YFNotImplementedError, YFPricesMissingError,
+    YFRateLimitError, YFTickerMissingError, YFTzMissingError
+)
+
+from utils.rate_limit import TokenBucket
+from utils.resilience import ResilientCaller
+
+# Columns returned by every provider, in the order used by yfinance
+HISTORY_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+
+# Timezone of the exchanges the synthetic and replay providers pretend to be
+DEFAULT_TIMEZONE = 'America/New_York'
+
+# Ticker objects kept by YFinanceProvider for history requests (least recently used are dropped)
+TICKER_CACHE_SIZE = 256
+
+# yfinance errors describing the request rather than the health of Yahoo Finance: never retried
+NON_RETRYABLE_ERRORS = (
+    YFInvalidPeriodError, YFNotImplementedError, YFPricesMissingError,
+    YFTickerMissingError, YFTzMissingError, KeyError, ValueError
+)
+
+
+def _period_offset(period: str) -> Optional[pd.DateOffset]:
+    """
+    Convert a Yahoo Finance period string into a calendar offset
+
+    Args:
+        period (str): Time period ('1mo', '6mo', '1y', '5y', ...)
+
+    Returns:
+        DateOffset, or None for 'max' and periods counted in trading days
+    """
+    if period.endswith('mo'):
+        return pd.DateOffset(months=int(period[:-2]))
+    if period.endswith('y') and period != 'ytd':
+        return pd.DateOffset(years=int(period[:-1]))
+    return None
+
+
+def _slice_bars(bars: pd.DataFrame, period: Optional[str], start: Optional[str], now: pd.Timestamp) -> pd.DataFrame:
+    """
+    Cut a date-indexed frame the way Yahoo Finance answers period/start requests
+
+    Args:
+        bars (pd.DataFrame): Bars indexed by date
+        period (str): Time period (ignored when start is given)
+        start (str): First date to return ('YYYY-MM-DD')
+        now (pd.Timestamp): Reference timestamp for periods
+
+    Returns:
+        Sliced DataFrame
+    """
+    if bars.empty:
+        return bars
+    if start is not None:
+        start_ts = pd.Timestamp(start)
+        if bars.index.tz is not None and start_ts.tz is None:
+            start_ts = start_ts.tz_localize(bars.index.tz)
+        return bars[bars.index >= start_ts]
+    if period is None or period == 'max':
+        return bars
+    if period == 'ytd':
+        return bars[bars.index >= now.normalize().replace(month=1, day=1)]
+    if period.endswith('d'):
+        return bars.iloc[-int(period[:-1]):]
+
+    offset = _period_offset(period)
+    if offset is None:
+        return bars
+    return bars[bars.index >= now.normalize() - offset]
+
+
+class MarketDataProvider(ABC):
+    """Base class for the sources StockDataFetcher reads market data from"""
+
+    # Short identifier, also used to keep each provider's on-disk history apart
+    name = 'base'
+
+    @abstractmethod
+    def get_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the info payload of a symbol
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            Info dictionary in the yfinance format, or None/{} for unknown symbols
+        """
+
+    @abstractmethod
+    def get_history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        """
+        Fetch daily bars of a symbol
+
+        Args:
+            symbol (str): Stock symbol
+            period (str): Time period ('1d', '5d', '1mo', ..., 'max')
+            start (str): First date to return ('YYYY-MM-DD'), takes precedence over period
+
+        Returns:
+            DataFrame indexed by 'Date' with the OHLCV columns (empty if no data)
+        """
+
+    def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the latest price of a symbol without its fundamentals
+
+        The default implementation reads the last two daily bars.
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            Dictionary with 'price', 'previous_close', 'open', 'day_high', 'day_low',
+            'volume' and 'currency' (None values when unknown), or None without data
+        """
+        bars = self.get_history(symbol, period='5d')
+        if bars.empty:
+            return None
+
+        last = bars.iloc[-1]
+        return {
+            'price': float(last['Close']),
+            'previous_close': float(bars['Close'].iloc[-2]) if len(bars) > 1 else None,
+            'open': float(last['Open']),
+            'day_high': float(last['High']),
+            'day_low': float(last['Low']),
+            'volume': float(last['Volume']),
+            'currency': None
+        }
+
+    def download(self, symbols: list, period: Optional[str] = None, start: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch daily bars of several symbols
+
+        Args:
+            symbols (list): Stock symbols
+            period (str): Time period
+            start (str): First date to return ('YYYY-MM-DD')
+
+        Returns:
+            Dictionary of symbol -> bars indexed by date (symbols without data are left out)
+        """
+        frames = {}
+        for symbol in symbols:
+            bars = self.get_history(symbol, period=period, start=start)
+            if not bars.empty:
+                frames[symbol] = bars
+        return frames
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Provider backed by the live Yahoo Finance API"""
+
+    name = 'yfinance'
+
+    # Quote fields read from Ticker.fast_info (a chart request instead of the full info payload)
+    FAST_INFO_FIELDS = {
+        'previous_close': 'previous_close',
+        'open': 'open',
+        'day_high': 'day_high',
+        'day_low': 'day_low',
+        'volume': 'last_volume',
+        'currency': 'currency'
+    }
+
+    def __init__(self, session: Optional[curl_requests.Session] = None, max_tickers: int = TICKER_CACHE_SIZE):
+        """
+        Initialize the provider
+
+        Args:
+            session (curl_cffi.requests.Session): HTTP session shared by every request
+                (defaults to a new browser-impersonating session)
+            max_tickers (int): Number of Ticker objects kept for history requests
+        """
+        # One pooled session: cookies, crumb and open TLS connections are reused by every call
+        self.session = session or curl_requests.Session(impersonate='chrome')
+        self.max_tickers = max_tickers
+        self._tickers: 'OrderedDict[str, yf.Ticker]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ticker(self, symbol: str) -> yf.Ticker:
+        """
+        Get the shared Ticker of a symbol, creating it on first use
+
+        Reused tickers keep their exchange timezone and session, so repeated
+        history calls skip those lookups. Only get_history uses them: see
+        unshared_ticker for info and quotes.
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            yfinance Ticker bound to the pooled session
+        """
+        key = symbol.upper()
+        with self._lock:
+            ticker = self._tickers.get(key)
+            if ticker is not None:
+                self._tickers.move_to_end(key)
+                return ticker
+
+            ticker = yf.Ticker(key, session=self.session)
+            self._tickers[key] = ticker
+            if len(self._tickers) > self.max_tickers:
+                self._tickers.popitem(last=False)
+            return ticker
+
+    def unshared_ticker(self, symbol: str) -> yf.Ticker:
+        """
+        Get a new Ticker of a symbol on the pooled session
+
+        A Ticker memoizes its info and fast_info payloads for its whole life, and
+        yfinance has no public way to expire them. The callers' TTL caches
+        (snapshot, quote) only call get_info and get_quote when they want fresh
+        data, so a reused Ticker would always be stale by then: these calls build
+        a new one and only share the session (cookies, crumb, open connections).
+        Building it costs about 0.04 ms; the per-Ticker exchange timezone lookup
+        is not saved for them.
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            yfinance Ticker bound to the pooled session
+        """
+        return yf.Ticker(symbol.upper(), session=self.session)
+
+    def get_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.unshared_ticker(symbol).info
+
+    def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        fast_info = self.unshared_ticker(symbol).fast_info
+        price = fast_info.last_price
+        if price is None or pd.isna(price):
+            return None
+
+        quote = {'price': float(price)}
+        for key, attribute in self.FAST_INFO_FIELDS.items():
+            try:
+                value = getattr(fast_info, attribute)
+            except Exception:
+                # Secondary fields are optional, the price above already proved the symbol works
+                value = None
+            if isinstance(value, (int, float)):
+                value = None if pd.isna(value) else float(value)
+            quote[key] = value
+        return quote
+
+    def get_history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        ticker = self.ticker(symbol)
+        if start is not None:
+            return ticker.history(start=start)
+        return ticker.history(period=period or '1mo')
+
+    def download(self, symbols: list, period: Optional[str] = None, start: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch daily bars of several symbols with one multi-ticker request
+
+        Args:
+            symbols (list): Stock symbols
+            period (str): Time period
+            start (str): First date to return ('YYYY-MM-DD')
+
+        Returns:
+            Dictionary of symbol -> bars indexed by date (symbols without data are left out)
+        """
+        kwargs = {'start': start} if start is not None else {'period': period or '1mo'}
+        data = yf.download(
+            symbols,
+            group_by='ticker',
+            auto_adjust=True,
+            actions=True,
+            ignore_tz=False,
+            threads=True,
+            progress=False,
+            session=self.session,
+            **kwargs
+        )
+
+        if data is None or data.empty:
+            return {}
+
+        frames = {}
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                bars = data[symbol]
+            else:
+                bars = data
+
+            # Tickers trading on different calendars leave empty rows in the shared index
+            bars = bars.dropna(how='all', subset=[col for col in ('Open', 'High', 'Low', 'Close') if col in bars.columns])
+            if not bars.empty:
+                frames[symbol] = bars.rename_axis(columns=None)
+
+        return frames
+
+
+class ReplayProvider(MarketDataProvider):
+    """Provider replaying info payloads and histories recorded on disk"""
+
+    name = 'replay'
+
+    def __init__(self, root: str):
+        """
+        Initialize the provider
+
+        Args:
+            root (str): Directory with <SYMBOL>.info.json and <SYMBOL>.history.parquet fixtures
+        """
+        self.root = root
+        self._histories: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str, suffix: str) -> str:
+        return os.path.join(self.root, f'{symbol.upper()}.{suffix}')
+
+    def get_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        path = self._path(symbol, 'info.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def get_history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        key = symbol.upper()
+        with self._lock:
+            bars = self._histories.get(key)
+
+        if bars is None:
+            path = self._path(key, 'history.parquet')
+            if not os.path.exists(path):
+                return pd.DataFrame(columns=HISTORY_COLUMNS)
+            bars = pd.read_parquet(path)
+            with self._lock:
+                self._histories[key] = bars
+
+        # Periods are replayed relative to the last recorded bar, not to today
+        return _slice_bars(bars, period, start, bars.index[-1] if not bars.empty else pd.Timestamp.now())
+
+    @staticmethod
+    def record(source: MarketDataProvider, symbols: list, root: str, period: str = 'max') -> None:
+        """
+        Record fixtures for the replay provider from another provider
+
+        Args:
+            source (MarketDataProvider): Provider to record from
+            symbols (list): Stock symbols
+            root (str): Output directory
+            period (str): Length of the recorded histories
+        """
+        os.makedirs(root, exist_ok=True)
+        for symbol in symbols:
+            symbol = symbol.upper()
+            info = source.get_info(symbol)
+            with open(os.path.join(root, f'{symbol}.info.json'), 'w', encoding='utf-8') as f:
+                json.dump(info or {}, f, default=str)
+
+            bars = source.get_history(symbol, period=period)
+            bars.to_parquet(os.path.join(root, f'{symbol}.history.parquet'))
+
+
+class SyntheticProvider(MarketDataProvider):
+    """Provider generating deterministic random-walk OHLCV data (no network access)"""
+
+    name = 'synthetic'
+
+    def __init__(self, seed: int = 42, bars: int = 5000, end: Optional[str] = None,
+                 volatility: float = 0.02, latency: float = 0.0, freq: str = 'B'):
+        """
+        Initialize the provider
+
+        Args:
+            seed (int): Base seed; each symbol derives its own stream from it
+            bars (int): Number of daily bars in the full ('max') history
+            end (str): Date of the last bar ('YYYY-MM-DD', defaults to today)
+            volatility (float): Daily volatility of the random walk
+            latency (float): Seconds to sleep per call, to mimic network round trips
+            freq (str): Bar frequency ('B' for business days; use e.g. 'min' for very long series)
+        """
+        self.seed = seed
+        self.bars = bars
+        self.end = end
+        self.volatility = volatility
+        self.latency = latency
+        self.freq = freq
+
+    def _rng(self, symbol: str, stream: int) -> np.random.Generator:
+        # crc32 keeps the per-symbol seed stable across processes (unlike hash())
+        return np.random.default_rng([self.seed, zlib.crc32(symbol.upper().encode('utf-8')), stream])
+
+    def _end(self) -> pd.Timestamp:
+        end = pd.Timestamp(self.end) if self.end is not None else pd.Timestamp.now()
+        return end.normalize()
+
+    def generate(self, symbol: str) -> pd.DataFrame:
+        """
+        Generate the full history of a symbol
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            DataFrame indexed by 'Date' with the OHLCV columns
+        """
+        rng = self._rng(symbol, 0)
+        n = self.bars
+        end = self._end().tz_localize(DEFAULT_TIMEZONE)
+        if self.freq == 'B':
+            # Calendar days minus weekends: same dates as freq='B', without its slow per-day offset logic
+            days = pd.date_range(end=end, periods=n * 7 // 5 + 7, freq='D', name='Date')
+            dates = days[days.dayofweek < 5][-n:]
+        else:
+            dates = pd.date_range(end=end, periods=n, freq=self.freq, name='Date')
+
+        base_price = rng.random() * 200 + 50  # $50-$250 range
+        vol = self.volatility
+        close = base_price * np.cumprod(1 + (rng.random(n) - 0.5) * vol)
+        open_ = close * (1 + (rng.random(n) - 0.5) * vol * 0.5)
+        high = np.maximum(open_, close) * (1 + rng.random(n) * vol * 0.5)
+        low = np.minimum(open_, close) * (1 - rng.random(n) * vol * 0.5)
+        volume = rng.integers(100_000, 10_100_000, n)
+
+        return pd.DataFrame({
+            'Open': open_,
+            'High': high,
+            'Low': low,
+            'Close': close,
+            'Volume': volume,
+            'Dividends': 0.0,
+            'Stock Splits': 0.0
+        }, index=dates)
+
+    def get_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        if self.latency:
+            time.sleep(self.latency)
+
+        symbol = symbol.upper()
+        bars = self.generate(symbol).iloc[-260:]
+        last, previous = bars.iloc[-1], bars.iloc[-2]
+        rng = self._rng(symbol, 1)
+        shares = int(rng.integers(100_000_000, 10_000_000_000))
+
+        return {
+            'symbol': symbol,
+            'longName': f'{symbol} Synthetic Corp.',
+            'sector': 'Technology',
+            'industry': 'Synthetic Data',
+            'currentPrice': float(last['Close']),
+            'previousClose': float(previous['Close']),
+            'open': float(last['Open']),
+            'dayHigh': float(last['High']),
+            'dayLow': float(last['Low']),
+            'volume': int(last['Volume']),
+            'averageVolume': int(bars['Volume'].mean()),
+            'marketCap': int(last['Close'] * shares),
+            'enterpriseValue': int(last['Close'] * shares * (0.9 + rng.random() * 0.3)),
+            'trailingPE': float(15 + rng.random() * 20),
+            'forwardPE': float(12 + rng.random() * 20),
+            'pegRatio': float(0.5 + rng.random() * 2),
+            'priceToBook': float(1 + rng.random() * 10),
+            'priceToSalesTrailing12Months': float(1 + rng.random() * 8),
+            'debtToEquity': float(rng.random() * 200),
+            'returnOnEquity': float(0.05 + rng.random() * 0.2),
+            'returnOnAssets': float(0.02 + rng.random() * 0.15),
+            'dividendYield': float(rng.random() * 5),
+            'dividendRate': float(rng.random() * 4),
+            'payoutRatio': float(rng.random() * 0.6),
+            'fiftyTwoWeekHigh': float(bars['High'].max()),
+            'fiftyTwoWeekLow': float(bars['Low'].min()),
+            'beta': float(0.5 + rng.random() * 1.5)
+        }
+
+    def get_history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        if self.latency:
+            time.sleep(self.latency)
+
+        bars = self.generate(symbol)
+        return _slice_bars(bars, period, start, bars.index[-1])
+
+
+_provider: Optional[MarketDataProvider] = None
+_provider_lock = threading.Lock()
+
+
+class ResilientProvider(MarketDataProvider):
+    """Wraps a provider so every call goes through a ResilientCaller (rate budget, retries, circuit breaker)"""
+
+    def __init__(self, provider: MarketDataProvider, caller: Optional[ResilientCaller] = None):
+        """
+        Initialize the wrapper
+
+        Args:
+            provider (MarketDataProvider): Provider doing the actual requests
+            caller (ResilientCaller): Caller shared by every request (defaults tuned for Yahoo Finance)
+        """
+        self.provider = provider
+        self.caller = caller or ResilientCaller(
+            non_retryable=NON_RETRYABLE_ERRORS,
+            throttle_errors=(YFRateLimitError,)
+        )
+
+    @property
+    def name(self) -> str:
+        return self.provider.name
+
+    def get_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.caller.call(f'info of {symbol}', self.provider.get_info, symbol)
+
+    def get_history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        return self.caller.call(f'history of {symbol}', self.provider.get_history, symbol, period=period, start=start)
+
+    def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.caller.call(f'quote of {symbol}', self.provider.get_quote, symbol)
+
+    def download(self, symbols: list, period: Optional[str] = None, start: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        return self.caller.call(
+            f'download of {len(symbols)} symbols', self.provider.download, symbols, period=period, start=start
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the rate limiting, retry and circuit breaker counters
+
+        Returns:
+            Dictionary of counters (see ResilientCaller.stats)
+        """
+        return self.caller.stats()
+
+
+def create_provider_from_env() -> MarketDataProvider:
+    """
+    Build the provider selected by the STOCK_DATA_PROVIDER environment variable
+
+    'yfinance' (default), 'replay' (fixtures in STOCK_REPLAY_DIR) or
+    'synthetic' (seeded with STOCK_SYNTHETIC_SEED, STOCK_SYNTHETIC_BARS bars).
+    Yahoo Finance calls share a rate budget of STOCK_RATE_LIMIT calls per
+    second (bursts of STOCK_RATE_BURST), with retries and a circuit breaker.
+
+    Returns:
+        MarketDataProvider instance
+    """
+    kind = os.environ.get('STOCK_DATA_PROVIDER', 'yfinance').lower()
+
+    if kind == 'replay':
+        return ReplayProvider(os.environ.get('STOCK_REPLAY_DIR', 'fixtures'))
+    if kind == 'synthetic':
+        return SyntheticProvider(
+            seed=int(os.environ.get('STOCK_SYNTHETIC_SEED', '42')),
+            bars=int(os.environ.get('STOCK_SYNTHETIC_BARS', '5000'))
+        )
+    if kind == 'yfinance':
+        bucket = TokenBucket(
+            rate=float(os.environ.get('STOCK_RATE_LIMIT', '2')),
+            capacity=float(os.environ.get('STOCK_RATE_BURST', '5'))
+        )
+        return ResilientProvider(YFinanceProvider(), ResilientCaller(
+            bucket=bucket,
+            non_retryable=NON_RETRYABLE_ERRORS,
+            throttle_errors=(YFRateLimitError,)
+        ))
+
+    raise ValueError(f"Unknown market data provider: {kind}")
+
+
+def get_provider() -> MarketDataProvider:
+    """
+    Get the process-wide market data provider
+
+    Returns:
+        Active MarketDataProvider
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = create_provider_from_env()
+        return _provider
+
+
+def set_provider(provider: MarketDataProvider) -> None:
+    """
+    Replace the process-wide market data provider
+
+    Args:
+        provider (MarketDataProvider): Provider to use from now on
+    """
+    global _provider
+    with _provider_lock:
+        _provider = provider
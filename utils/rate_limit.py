@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket (full)
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Maximum number of stored tokens (defaults to one second worth, at least 1)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        Take tokens if they are available, without waiting
+
+        Args:
+            tokens (float): Number of tokens to take
+
+        Returns:
+            bool: True if the tokens were taken
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, waiting until they are available
+
+        Args:
+            tokens (float): Number of tokens to take
+            timeout (float): Maximum wait in seconds (None waits as long as needed)
+
+        Returns:
+            bool: True if the tokens were taken, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    @property
+    def available(self) -> float:
+        """Tokens currently available"""
+        with self._lock:
+            self._refill()
+            return self._tokens
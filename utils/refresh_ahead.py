@@ -0,0 +1,184 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.cache import TTLCache
+from utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshAheadWorker:
+    """
+    Process-wide background worker keeping the caches of frequently viewed symbols warm
+
+    Every view is recorded with an exponentially decaying score. Periodically the
+    hottest symbols whose cache entries are about to expire (or are missing) are
+    refreshed on a bounded thread pool, within a global rate budget; readers keep
+    getting the current entry while it is being replaced.
+    """
+
+    def __init__(self, targets: Dict[str, Tuple[TTLCache, Callable[[str], Any]]],
+                 lead: float = 30.0, poll_interval: float = 5.0, max_workers: int = 2,
+                 rate: float = 1.0, burst: float = 5.0, half_life: float = 600.0,
+                 idle_after: float = 900.0, max_symbols: int = 50):
+        """
+        Initialize the worker (not started)
+
+        Args:
+            targets (dict): Name -> (cache keyed by symbol, function computing the fresh value of a symbol)
+            lead (float): Refresh entries expiring within this many seconds
+            poll_interval (float): Seconds between two scheduling rounds
+            max_workers (int): Size of the refresh thread pool
+            rate (float): Refreshes per second allowed across all symbols
+            burst (float): Refreshes allowed at once after an idle period
+            half_life (float): Seconds after which a view counts half as much in the ranking
+            idle_after (float): Symbols not viewed for this many seconds are no longer refreshed
+            max_symbols (int): Number of hottest symbols considered per round
+        """
+        self.targets = targets
+        self.lead = lead
+        self.poll_interval = poll_interval
+        self.max_workers = max_workers
+        self.half_life = half_life
+        self.idle_after = idle_after
+        self.max_symbols = max_symbols
+        self.budget = TokenBucket(rate, burst)
+
+        self.refreshes = 0
+        self.failures = 0
+        self.throttled = 0
+
+        self._scores: Dict[str, Tuple[float, float]] = {}  # symbol -> (score, last view)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def record(self, symbol: str) -> None:
+        """
+        Record a view of a symbol
+
+        Args:
+            symbol (str): Normalized stock symbol (the key of the target caches)
+        """
+        now = time.monotonic()
+        with self._lock:
+            score, last = self._scores.get(symbol, (0.0, now))
+            self._scores[symbol] = (self._decay(score, now - last) + 1.0, now)
+
+    def _decay(self, score: float, elapsed: float) -> float:
+        return score * 0.5 ** (elapsed / self.half_life)
+
+    def hot_symbols(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Rank recently viewed symbols by decayed view count
+
+        Args:
+            limit (int): Maximum number of symbols (defaults to max_symbols)
+
+        Returns:
+            Symbols, most viewed first
+        """
+        now = time.monotonic()
+        with self._lock:
+            for symbol in [s for s, (_, last) in self._scores.items() if now - last > self.idle_after]:
+                del self._scores[symbol]
+            ranked = sorted(
+                self._scores,
+                key=lambda s: self._decay(self._scores[s][0], now - self._scores[s][1]),
+                reverse=True
+            )
+        return ranked[:limit or self.max_symbols]
+
+    def run_once(self) -> int:
+        """
+        Schedule the refreshes that are due, hottest symbols first
+
+        Stops at the first refresh the rate budget doesn't allow, so colder symbols
+        wait for the next round.
+
+        Returns:
+            Number of refreshes submitted
+        """
+        submitted = 0
+        for symbol in self.hot_symbols():
+            for name, (cache, compute) in self.targets.items():
+                remaining = cache.expires_in(symbol)
+                if remaining is not None and remaining > self.lead:
+                    continue
+
+                job = (name, symbol)
+                with self._lock:
+                    if job in self._pending:
+                        continue
+                    if not self.budget.try_acquire():
+                        self.throttled += 1
+                        return submitted
+                    self._pending.add(job)
+
+                self._executor.submit(self._refresh, job, cache, compute)
+                submitted += 1
+        return submitted
+
+    def _refresh(self, job: Tuple[str, str], cache: TTLCache, compute: Callable[[str], Any]) -> None:
+        name, symbol = job
+        try:
+            cache.refresh(symbol, lambda: compute(symbol))
+            with self._lock:
+                self.refreshes += 1
+        except Exception as e:
+            logger.warning("Refresh-ahead of %s for %s failed: %s", name, symbol, e)
+            with self._lock:
+                self.failures += 1
+        finally:
+            with self._lock:
+                self._pending.discard(job)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Refresh-ahead round failed")
+
+    def start(self) -> None:
+        """Start the scheduling thread and the refresh pool (no-op if running)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='refresh-ahead')
+            self._thread = threading.Thread(target=self._loop, name='refresh-ahead-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop scheduling and wait for running refreshes"""
+        with self._lock:
+            thread, executor = self._thread, self._executor
+            self._thread = self._executor = None
+        self._stop.set()
+        if thread is not None:
+            thread.join()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the worker counters
+
+        Returns:
+            Dictionary with tracked symbols, pending/completed/failed/throttled refreshes and budget
+        """
+        with self._lock:
+            return {
+                'tracked_symbols': len(self._scores),
+                'pending': len(self._pending),
+                'refreshes': self.refreshes,
+                'failures': self.failures,
+                'throttled': self.throttled,
+                'budget_tokens': round(self.budget.available, 2)
+            }
@@ -0,0 +1,244 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling upstream while the circuit breaker is open"""
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when the rate budget has no token for a call within the allowed wait"""
+
+
+class CircuitBreaker:
+    """
+    Stops calling an unhealthy upstream for a while after repeated failures
+
+    Closed: calls go through and consecutive failures are counted. Open: calls
+    are rejected until reset_timeout has elapsed. Half-open: one trial call goes
+    through; its success closes the breaker, its failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the breaker (closed)
+
+        Args:
+            failure_threshold (int): Consecutive failures opening the breaker
+            reset_timeout (float): Seconds the breaker stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.opened = 0
+        self.rejected = 0
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state ('closed', 'open' or 'half_open')"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go upstream
+
+        Returns:
+            bool: False while open (and while a half-open trial call is running)
+        """
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._trial_running = False
+
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        """Record a call that reached upstream, closing the breaker"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial that never reached upstream"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the breaker past the threshold or after a failed trial"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened += 1
+                    logger.warning("Circuit breaker opened after %d failures", self._failures)
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n waits uniform(0, min(max_delay, base_delay * 2**n))"""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        """
+        Initialize the policy
+
+        Args:
+            attempts (int): Total attempts per call (1 disables retries)
+            base_delay (float): Backoff before the first retry, in seconds
+            max_delay (float): Upper bound of a single backoff, in seconds
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """
+        Backoff before retrying a failed attempt
+
+        Args:
+            attempt (int): Index of the failed attempt (0 for the first)
+
+        Returns:
+            Seconds to wait
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class ResilientCaller:
+    """
+    Runs calls to an upstream under a shared rate budget, retries and a circuit breaker
+
+    Every call first takes a token from the bucket (waiting up to acquire_timeout),
+    transient errors are retried with jittered exponential backoff, and once
+    upstream keeps failing the breaker rejects calls immediately with
+    CircuitOpenError so callers can serve their last known good data.
+    """
+
+    def __init__(self, bucket: Optional[TokenBucket] = None, retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None, acquire_timeout: float = 10.0,
+                 non_retryable: Tuple[type, ...] = (), throttle_errors: Tuple[type, ...] = ()):
+        """
+        Initialize the caller
+
+        Args:
+            bucket (TokenBucket): Rate budget shared by every call (default 2 calls/s, bursts of 5)
+            retry (RetryPolicy): Retry policy (default 3 attempts)
+            breaker (CircuitBreaker): Circuit breaker (default opens after 5 failed calls for 30 s)
+            acquire_timeout (float): Longest wait for a token, in seconds
+            non_retryable (tuple): Errors describing the request itself (raised at once, upstream counts as healthy)
+            throttle_errors (tuple): Errors meaning upstream is rate limiting us
+        """
+        self.bucket = bucket or TokenBucket(rate=2.0, capacity=5)
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.acquire_timeout = acquire_timeout
+        self.non_retryable = non_retryable
+        self.throttle_errors = throttle_errors
+
+        self.calls = 0
+        self.throttled = 0  # Calls that had to wait for the rate budget
+        self.upstream_throttled = 0  # Rate limit errors returned by upstream
+        self.retries = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def call(self, operation: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run one upstream call
+
+        Args:
+            operation (str): Description used in errors and log messages
+            fn (callable): Function doing the request; extra arguments are passed to it
+
+        Returns:
+            Result of fn
+
+        Raises:
+            CircuitOpenError: The breaker is open
+            RateLimitTimeout: No token became available in time
+        """
+        self._count('calls')
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Market data source unavailable, {operation} skipped")
+
+        for attempt in range(self.retry.attempts):
+            if not self.bucket.try_acquire():
+                self._count('throttled')
+                if not self.bucket.acquire(timeout=self.acquire_timeout):
+                    self.breaker.release_trial()
+                    raise RateLimitTimeout(f"Rate budget exhausted, {operation} skipped")
+
+            try:
+                result = fn(*args, **kwargs)
+            except self.non_retryable:
+                # Upstream answered, the request itself is wrong
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                if isinstance(e, self.throttle_errors):
+                    self._count('upstream_throttled')
+                if attempt + 1 >= self.retry.attempts:
+                    self._count('failures')
+                    self.breaker.record_failure()
+                    raise
+                self._count('retries')
+                delay = self.retry.delay(attempt)
+                logger.info("%s failed (%s), retry %d in %.2fs", operation, e, attempt + 1, delay)
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the resilience counters
+
+        Returns:
+            Dictionary with calls, throttles, retries, failures and breaker state
+        """
+        with self._lock:
+            counters = {
+                'calls': self.calls,
+                'throttled': self.throttled,
+                'upstream_throttled': self.upstream_throttled,
+                'retries': self.retries,
+                'failures': self.failures
+            }
+        counters.update({
+            'breaker_state': self.breaker.state,
+            'breaker_opened': self.breaker.opened,
+            'breaker_rejected': self.breaker.rejected,
+            'rate_tokens': round(self.bucket.available, 2)
+        })
+        return counters
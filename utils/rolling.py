@@ -0,0 +1,212 @@
+import threading
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class GrowableArray:
+    """Append-only float64 array with amortized O(1) appends (capacity doubling)"""
+
+    def __init__(self, capacity: int = 256):
+        self._data = np.empty(capacity, dtype='float64')
+        self._size = 0
+
+    def extend(self, values: np.ndarray) -> None:
+        """
+        Append values
+
+        Args:
+            values (np.ndarray): Values to append
+        """
+        needed = self._size + len(values)
+        if needed > len(self._data):
+            grown = np.empty(max(needed, 2 * len(self._data)), dtype='float64')
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = values
+        self._size = needed
+
+    def set_last(self, value: float) -> None:
+        """
+        Overwrite the last value
+
+        Args:
+            value (float): New last value
+        """
+        self._data[self._size - 1] = value
+
+    def view(self) -> np.ndarray:
+        """
+        Get the stored values without copying
+
+        Returns:
+            Read-only view of the stored values
+        """
+        values = self._data[:self._size]
+        values.flags.writeable = False
+        return values
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class RollingMean:
+    """Running mean over a fixed window, kept in a ring buffer so new values cost O(1) each"""
+
+    def __init__(self, window: int):
+        """
+        Initialize the rolling mean
+
+        Args:
+            window (int): Number of values averaged
+        """
+        self.window = window
+        self._buffer = np.zeros(window, dtype='float64')
+        self._pos = 0  # Slot the next value is written to
+        self._count = 0
+        self._total = 0.0
+
+    def _ordered(self) -> np.ndarray:
+        """Buffered values from oldest to newest"""
+        if self._count < self.window:
+            return self._buffer[:self._count]
+        return np.roll(self._buffer, -self._pos)
+
+    def extend(self, values: np.ndarray) -> np.ndarray:
+        """
+        Push a batch of values
+
+        The batch is processed in one vectorized pass: the buffered tail and the new
+        values are prefix-summed, and window sums are differences of that prefix sum.
+
+        Args:
+            values (np.ndarray): New values, oldest first
+
+        Returns:
+            Mean after each pushed value (NaN until the window is full)
+        """
+        values = np.asarray(values, dtype='float64')
+        if len(values) == 0:
+            return values
+
+        tail = self._ordered()
+        series = np.concatenate((tail, values))
+        prefix = np.concatenate(([0.0], np.cumsum(series)))
+
+        # Window ending at series[j] covers series[j - window + 1 .. j]
+        ends = np.arange(len(tail), len(series)) + 1
+        starts = ends - self.window
+        means = np.full(len(values), np.nan)
+        full = starts >= 0
+        means[full] = (prefix[ends[full]] - prefix[starts[full]]) / self.window
+
+        # Keep the last `window` values in the ring buffer
+        kept = series[-self.window:]
+        self._buffer[:len(kept)] = kept
+        self._count = len(kept)
+        self._pos = len(kept) % self.window
+        self._total = float(kept.sum())
+        return means
+
+    def revise_last(self, value: float) -> float:
+        """
+        Replace the most recent value (e.g. a bar captured mid-session)
+
+        Args:
+            value (float): Corrected value
+
+        Returns:
+            Updated mean (NaN until the window is full)
+        """
+        last = (self._pos - 1) % self.window
+        self._total += value - self._buffer[last]
+        self._buffer[last] = value
+        return self._total / self.window if self._count == self.window else np.nan
+
+
+class MovingAverageState:
+    """Incrementally maintained moving averages of one symbol's close prices"""
+
+    def __init__(self, periods: Iterable[int]):
+        """
+        Initialize the state
+
+        Args:
+            periods (Iterable[int]): Moving average windows
+        """
+        self.periods = tuple(periods)
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.first_date = None
+        self.first_close = None
+        self.last_date = None
+        self.last_close = None
+        self.count = 0
+        self._means = {period: RollingMean(period) for period in self.periods}
+        self._values = {period: GrowableArray() for period in self.periods}
+
+    def sync(self, dates: pd.Series, closes: np.ndarray) -> None:
+        """
+        Bring the state up to date with a history, processing only the bars it hasn't seen
+
+        Args:
+            dates (pd.Series): Bar dates, oldest first
+            closes (np.ndarray): Close prices aligned with dates
+        """
+        n = len(dates)
+        if n == 0:
+            return
+
+        if self.count:
+            same_origin = dates.iloc[0] == self.first_date and closes[0] == self.first_close
+            if not same_origin or n < self.count or dates.iloc[self.count - 1] != self.last_date:
+                # The history was re-downloaded (e.g. re-adjusted after a split or dividend), start over
+                self._reset()
+
+        if self.count:
+            # The last synced bar may have been captured mid-session and revised since
+            revised_close = closes[self.count - 1]
+            if revised_close != self.last_close:
+                for period in self.periods:
+                    self._values[period].set_last(self._means[period].revise_last(revised_close))
+                self.last_close = revised_close
+
+        if n > self.count:
+            new_closes = closes[self.count:]
+            for period in self.periods:
+                self._values[period].extend(self._means[period].extend(new_closes))
+            if self.first_date is None:
+                self.first_date = dates.iloc[0]
+                self.first_close = closes[0]
+            self.last_date = dates.iloc[-1]
+            self.last_close = closes[-1]
+            self.count = n
+
+    def tail(self, length: int) -> Dict[int, np.ndarray]:
+        """
+        Get the moving averages of the last `length` bars
+
+        Args:
+            length (int): Number of bars
+
+        Returns:
+            Dictionary of period -> read-only array of moving averages
+        """
+        return {period: values.view()[self.count - length:self.count] for period, values in self._values.items()}
+
+    def covers(self, dates: pd.Series) -> Optional[int]:
+        """
+        Check that a frame is a suffix of the synced history
+
+        Args:
+            dates (pd.Series): Dates of the frame
+
+        Returns:
+            Number of rows of the frame if it ends on the last synced bar, otherwise None
+        """
+        if len(dates) == 0 or len(dates) > self.count or dates.iloc[-1] != self.last_date:
+            return None
+        return len(dates)
@@ -0,0 +1,121 @@
+import time
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+from utils.financial_metrics import FinancialMetrics
+
+_EMPTY = MappingProxyType({})
+
+# Fields of a provider quote payload
+_QUOTE_FIELDS = ('price', 'previous_close', 'open', 'day_high', 'day_low', 'volume', 'currency')
+
+
+@dataclass(frozen=True)
+class SymbolSnapshot:
+    """Immutable per-symbol view of the Yahoo Finance info payload and the metrics derived from it"""
+
+    symbol: str
+    is_valid: bool
+    info: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+    metrics: Optional[FinancialMetrics] = None
+    error: Optional[str] = None
+    fetched_at: float = field(default_factory=time.time)
+    stale: bool = False  # Last known good snapshot served while upstream is unavailable
+
+    @staticmethod
+    def from_info(symbol: str, info: Optional[dict], metrics: Optional[FinancialMetrics] = None) -> 'SymbolSnapshot':
+        """
+        Build a snapshot from a raw info payload
+
+        Args:
+            symbol (str): Stock symbol
+            info (dict): Payload returned by yfinance (None or without 'symbol' for unknown symbols)
+            metrics (FinancialMetrics): Financial metrics extracted from the payload
+
+        Returns:
+            SymbolSnapshot with a read-only info mapping
+        """
+        if not info or 'symbol' not in info:
+            return SymbolSnapshot(symbol=symbol, is_valid=False)
+
+        return SymbolSnapshot(
+            symbol=symbol,
+            is_valid=True,
+            info=MappingProxyType(dict(info)),
+            metrics=metrics
+        )
+
+    @staticmethod
+    def from_error(symbol: str, error: Exception) -> 'SymbolSnapshot':
+        """
+        Build a snapshot recording a failed fetch
+
+        Args:
+            symbol (str): Stock symbol
+            error (Exception): Error raised while fetching
+
+        Returns:
+            Invalid SymbolSnapshot carrying the error message
+        """
+        return SymbolSnapshot(symbol=symbol, is_valid=False, error=str(error))
+
+    def __reduce__(self):
+        # Read-only mappings can't be pickled: the info payload travels as a dict (disk cache, worker processes)
+        state = {f.name: getattr(self, f.name) for f in fields(self)}
+        state['info'] = dict(self.info)
+        return _restore_snapshot, (state,)
+
+
+def _restore_snapshot(state: dict) -> SymbolSnapshot:
+    """Rebuild a pickled SymbolSnapshot with a read-only info mapping"""
+    state['info'] = MappingProxyType(state['info']) if state['info'] else _EMPTY
+    return SymbolSnapshot(**state)
+
+
+@dataclass(frozen=True)
+class Quote:
+    """Latest price of a symbol, refreshed far more often than its SymbolSnapshot"""
+
+    symbol: str
+    price: Optional[float] = None
+    previous_close: Optional[float] = None
+    open: Optional[float] = None
+    day_high: Optional[float] = None
+    day_low: Optional[float] = None
+    volume: Optional[float] = None
+    currency: Optional[str] = None
+    error: Optional[str] = None
+    fetched_at: float = field(default_factory=time.time)
+    stale: bool = False  # Last known good quote served while upstream is unavailable
+
+    @staticmethod
+    def from_payload(symbol: str, payload: Optional[Mapping[str, Any]]) -> 'Quote':
+        """
+        Build a quote from a provider's get_quote payload
+
+        Args:
+            symbol (str): Stock symbol
+            payload (Mapping): Quote fields (None if the symbol has no price)
+
+        Returns:
+            Quote (without price if the payload is empty)
+        """
+        if not payload:
+            return Quote(symbol=symbol)
+
+        return Quote(symbol=symbol, **{key: payload.get(key) for key in _QUOTE_FIELDS})
+
+    @staticmethod
+    def from_error(symbol: str, error: Exception) -> 'Quote':
+        """
+        Build a quote recording a failed fetch
+
+        Args:
+            symbol (str): Stock symbol
+            error (Exception): Error raised while fetching
+
+        Returns:
+            Quote without price carrying the error message
+        """
+        return Quote(symbol=symbol, error=str(error))
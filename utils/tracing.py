@@ -0,0 +1,366 @@
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Structured per-run log (one JSON object per line), enabled by STOCK_TRACE_LOG=<path>
+trace_logger = logging.getLogger('stock.trace')
+
+# Prometheus text exposition file, enabled by STOCK_METRICS_FILE=<path>
+METRICS_FILE_ENV = 'STOCK_METRICS_FILE'
+TRACE_LOG_ENV = 'STOCK_TRACE_LOG'
+
+# Minimum seconds between two rewrites of the metrics file (runs in between are written by the next one, or at exit)
+METRICS_WRITE_INTERVAL = 15
+
+# Prefix of every exported metric
+METRIC_PREFIX = 'stock_dashboard'
+
+
+class Trace:
+    """Timings and cache hits/misses recorded during one run (a script rerun or a fragment rerun)"""
+
+    def __init__(self, name: str, **fields):
+        """
+        Initialize the trace (started now)
+
+        Args:
+            name (str): Run name, e.g. 'app' or a fragment name
+            **fields: Context stored with the trace (symbol, period, ...)
+        """
+        self.name = name
+        self.fields = fields
+        self.started_at = time.time()
+        self.stages: List[Dict[str, Any]] = []
+        self.cache: List[Dict[str, Any]] = []
+        self.total_ms: Optional[float] = None
+        self._start = time.perf_counter()
+
+    @property
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the run started"""
+        return (time.perf_counter() - self._start) * 1000
+
+    def finish(self) -> None:
+        self.total_ms = self.elapsed_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Express the trace as a JSON-serializable dictionary
+
+        Returns:
+            Dictionary with run name, fields, total time, stages and cache lookups
+        """
+        return {
+            'run': self.name,
+            'started_at': self.started_at,
+            'total_ms': None if self.total_ms is None else round(self.total_ms, 3),
+            **self.fields,
+            'stages': self.stages,
+            'cache': self.cache
+        }
+
+
+class MetricsRegistry:
+    """Process-wide aggregates of stage timings, runs and cache lookups"""
+
+    def __init__(self):
+        self._stages: Dict[str, List[float]] = {}  # stage -> [count, total seconds, max seconds]
+        self._runs: Dict[str, List[float]] = {}
+        self._cache: Dict[tuple, int] = {}  # (cache, 'hit' | 'miss') -> count
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _observe(series: Dict[str, List[float]], name: str, seconds: float) -> None:
+        entry = series.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._observe(self._stages, stage, seconds)
+
+    def observe_run(self, run: str, seconds: float) -> None:
+        with self._lock:
+            self._observe(self._runs, run, seconds)
+
+    def observe_cache(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            key = (cache, 'hit' if hit else 'miss')
+            self._cache[key] = self._cache.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a copy of every aggregate
+
+        Returns:
+            Dictionary with 'stages' and 'runs' (name -> count/total/max seconds) and 'cache' ((cache, result) -> count)
+        """
+        with self._lock:
+            return {
+                'stages': {name: tuple(values) for name, values in self._stages.items()},
+                'runs': {name: tuple(values) for name, values in self._runs.items()},
+                'cache': dict(self._cache)
+            }
+
+    def render_prometheus(self) -> str:
+        """
+        Render the aggregates in the Prometheus text exposition format
+
+        Returns:
+            Metrics text
+        """
+        data = self.snapshot()
+        lines = []
+
+        for series, label in (('stages', 'stage'), ('runs', 'run')):
+            metric = f'{METRIC_PREFIX}_{series[:-1]}_seconds'
+            lines.append(f'# HELP {metric} Time spent per {label}')
+            lines.append(f'# TYPE {metric} summary')
+            for name, (count, total, _) in sorted(data[series].items()):
+                lines.append(f'{metric}_count{{{label}="{name}"}} {int(count)}')
+                lines.append(f'{metric}_sum{{{label}="{name}"}} {total:.6f}')
+            lines.append(f'# HELP {metric}_max Slowest {label} since start')
+            lines.append(f'# TYPE {metric}_max gauge')
+            for name, (_, _, slowest) in sorted(data[series].items()):
+                lines.append(f'{metric}_max{{{label}="{name}"}} {slowest:.6f}')
+
+        metric = f'{METRIC_PREFIX}_cache_requests_total'
+        lines.append(f'# HELP {metric} Cache lookups by result')
+        lines.append(f'# TYPE {metric} counter')
+        for (cache, result), count in sorted(data['cache'].items()):
+            lines.append(f'{metric}{{cache="{cache}",result="{result}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Atomically rewrite a Prometheus text file (for node_exporter's textfile collector or a local scrape)
+
+        Args:
+            path (str): Output file
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.render_prometheus())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._runs.clear()
+            self._cache.clear()
+
+
+metrics = MetricsRegistry()
+_current: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar('stock_trace', default=None)
+# Nesting level of the running stage; per context, so stages on pool threads nest under the stage that submitted them
+_depth: contextvars.ContextVar[int] = contextvars.ContextVar('stock_trace_depth', default=0)
+_metrics_written_at: Optional[float] = None
+_metrics_write_lock = threading.Lock()
+_trace_log_configured = False
+_trace_log_lock = threading.Lock()
+
+
+def current_trace() -> Optional[Trace]:
+    """
+    Get the trace of the run executing in this context
+
+    Returns:
+        Active Trace, or None outside of a run (e.g. on background pools)
+    """
+    return _current.get()
+
+
+def submit(executor: Executor, fn: Callable, *args, **kwargs) -> Future:
+    """
+    Submit a call to a pool in a copy of the current context
+
+    Pool threads don't inherit context variables, so the call's stages and cache
+    lookups are recorded in the submitting run's trace only when submitted this way.
+
+    Args:
+        executor (Executor): Thread pool
+        fn (Callable): Function to call
+        *args, **kwargs: Arguments of the call
+
+    Returns:
+        Future of the call
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+@contextmanager
+def stage(name: str, **fields) -> Iterator[None]:
+    """
+    Time a block as a stage of the current run
+
+    Stages nest; the process-wide metrics are updated even outside of a run.
+
+    Args:
+        name (str): Stage name, e.g. 'fetch.history' or 'chart.price'
+        **fields: Extra values stored with the stage in the trace
+    """
+    trace = _current.get()
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        _depth.reset(token)
+        metrics.observe_stage(name, seconds)
+        if trace is not None:
+            trace.stages.append({
+                'stage': name,
+                'at_ms': round((start - trace._start) * 1000, 3),
+                'ms': round(seconds * 1000, 3),
+                'depth': depth,
+                **fields
+            })
+
+
+def timed(name: str) -> Callable:
+    """
+    Decorator timing every call of a function as a stage
+
+    Args:
+        name (str): Stage name
+
+    Returns:
+        Decorator
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """
+    Record a cache lookup in the current run and the process-wide metrics
+
+    Args:
+        cache (str): Cache name
+        hit (bool): True if the value was served from the cache
+    """
+    metrics.observe_cache(cache, hit)
+    trace = _current.get()
+    if trace is not None:
+        trace.cache.append({'cache': cache, 'hit': hit})
+
+
+def _configure_trace_log() -> None:
+    global _trace_log_configured
+    with _trace_log_lock:
+        if _trace_log_configured:
+            return
+        _trace_log_configured = True
+        path = os.environ.get(TRACE_LOG_ENV)
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            handler = logging.FileHandler(path, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            trace_logger.addHandler(handler)
+            trace_logger.setLevel(logging.INFO)
+            trace_logger.propagate = False
+
+
+def write_metrics_file(force: bool = False) -> bool:
+    """
+    Rewrite the STOCK_METRICS_FILE Prometheus file, at most once per METRICS_WRITE_INTERVAL
+
+    Args:
+        force (bool): Write even if the file was rewritten less than METRICS_WRITE_INTERVAL ago
+
+    Returns:
+        True if the file was written
+    """
+    global _metrics_written_at
+    path = os.environ.get(METRICS_FILE_ENV)
+    if not path:
+        return False
+
+    # Another run writing right now already covers this one
+    if not _metrics_write_lock.acquire(blocking=force):
+        return False
+    try:
+        now = time.monotonic()
+        if not force and _metrics_written_at is not None and now - _metrics_written_at < METRICS_WRITE_INTERVAL:
+            return False
+        metrics.write_prometheus(path)
+        _metrics_written_at = now
+        return True
+    except OSError as e:
+        logger.warning("Could not write metrics file %s: %s", path, e)
+        return False
+    finally:
+        _metrics_write_lock.release()
+
+
+# Runs published since the last interval write are not lost on shutdown
+atexit.register(write_metrics_file, force=True)
+
+
+def _publish(trace: Trace) -> None:
+    """Export a finished root run: aggregates, JSON log line and (throttled) Prometheus file"""
+    metrics.observe_run(trace.name, trace.total_ms / 1000)
+
+    _configure_trace_log()
+    if trace_logger.isEnabledFor(logging.INFO):
+        trace_logger.info(json.dumps(trace.as_dict(), default=str))
+
+    write_metrics_file()
+
+
+@contextmanager
+def run(name: str, **fields) -> Iterator[Trace]:
+    """
+    Trace a run, or time it as a stage when a run is already active
+
+    A full script rerun and a fragment rerun each get their own trace; a
+    fragment executed as part of a full rerun is a stage of that rerun.
+
+    Args:
+        name (str): Run name
+        **fields: Context stored with the trace
+
+    Yields:
+        Trace receiving the stages (the enclosing one for nested runs)
+    """
+    parent = _current.get()
+    if parent is not None:
+        with stage(name):
+            yield parent
+        return
+
+    trace = Trace(name, **fields)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        trace.finish()
+        _publish(trace)